@@ -0,0 +1,30 @@
+"""
+Compares decoding a bulk reply in the text and the binary wire format.
+
+The replies are produced by the reference EA server, so the script runs without
+a MetaTrader terminal:
+
+    python examples/benchmark_wire_format.py
+"""
+import timeit
+from metatrader5ext.ea import ReferenceEAServer, TICK_DTYPE, parse_ticks
+from metatrader5ext.ea.binary import decode_binary_reply
+from metatrader5ext.ea.codec import parse_response_message
+
+COUNT = 100_000
+server = ReferenceEAServer()
+text = server.handle_request(f"F021^4^EURUSD^{COUNT}").encode()
+binary = server.handle_request(f"F021^B4^EURUSD^{COUNT}")
+
+
+def decode_text():
+    return parse_ticks(parse_response_message(text.decode())['data'])
+
+
+def decode_binary():
+    return decode_binary_reply(binary, 'F021', TICK_DTYPE)
+
+
+for name, decode, payload in (("text", decode_text, text), ("binary", decode_binary, binary)):
+    seconds = min(timeit.repeat(decode, number=1, repeat=5))
+    print(f"{name:>6}: {len(payload) / 1e6:6.2f} MB, {seconds * 1e3:8.3f} ms for {COUNT} ticks")
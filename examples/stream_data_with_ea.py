@@ -16,19 +16,18 @@
 """
 
 import asyncio
-from metatrader5ext.ea.client import EAClient
+from metatrader5ext.ea.client import EAClient, EAClientConfig
 
 def handle_stream_data(data: str) -> None:
     """Callback function to handle received streaming data."""
     print("Streamed data:", data)
 
 async def main():
-    client = EAClient()
+    client = EAClient(EAClientConfig())
 
-    # Start streaming updates
-    client.start_stream(callback=handle_stream_data)
-    input("Press Enter to stop streaming...")
-    client.stop_stream()
+    # Consume streaming updates on the event loop, stop with Ctrl+C
+    async for data in client.stream():
+        handle_stream_data(data)
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -10,6 +10,7 @@ UNSET_DOUBLE = sys.float_info.max
 UNSET_LONG = 2**63 - 1
 UNSET_DECIMAL = Decimal(2**127 - 1)
 DOUBLE_INFINITY = math.inf
+INFINITY_STR = "Infinity"
 
 class Mode(Enum):
     """Mode type.
@@ -1,5 +1,22 @@
 from metatrader5ext.ea.client import EAClientConfig, EAClient
+from metatrader5ext.ea.sync_client import SyncEAClient
 from metatrader5ext.ea.connection import Connection
+from metatrader5ext.ea.pool import ConnectionPool
+from metatrader5ext.ea.framing import Framing, FrameBuffer, FramedReader, StreamDecoder
+from metatrader5ext.ea.multiplex import MultiplexedConnection
+from metatrader5ext.ea.reference_server import ReferenceEAServer
+from metatrader5ext.ea.stream_queue import OverflowPolicy, StreamQueue
+from metatrader5ext.ea.conflation import ConflatingSubscriber, StreamTick, parse_stream_tick
+from metatrader5ext.ea.batching import tick_columns
+from metatrader5ext.ea.parsers import (TICK_DTYPE, RATE_DTYPE, SYMBOL_RATE_DTYPE, POSITION_DTYPE, parse_ticks, parse_rates,
+                                       parse_symbol_rates, parse_positions)
+from metatrader5ext.ea.binary import WireFormat
+from metatrader5ext.ea.symbols import SymbolRegistry, SYMBOLS
+from metatrader5ext.ea.fanout import BatchResult
+from metatrader5ext.ea.bar_cache import BarCache
+from metatrader5ext.ea.records import LazyRecord, materialize
+from metatrader5ext.ea.prices import PriceMode, to_points, from_points, to_points_array
+from metatrader5ext.ea.timestamps import broker_offset_ms, to_datetime64, to_polars_datetime
 from metatrader5ext.ea.errors import ERROR_DICT
 from metatrader5ext.ea.models import *
 from metatrader5ext.ea.utils import *
@@ -19,7 +36,43 @@ from metatrader5ext.ea.utils import *
 __all__ = [
     "EAClientConfig",
     "EAClient",
+    "SyncEAClient",
     "Connection",
+    "ConnectionPool",
+    "Framing",
+    "FrameBuffer",
+    "FramedReader",
+    "StreamDecoder",
+    "MultiplexedConnection",
+    "ReferenceEAServer",
+    "OverflowPolicy",
+    "StreamQueue",
+    "ConflatingSubscriber",
+    "StreamTick",
+    "parse_stream_tick",
+    "tick_columns",
+    "TICK_DTYPE",
+    "RATE_DTYPE",
+    "SYMBOL_RATE_DTYPE",
+    "POSITION_DTYPE",
+    "parse_ticks",
+    "parse_rates",
+    "parse_symbol_rates",
+    "parse_positions",
+    "WireFormat",
+    "SymbolRegistry",
+    "SYMBOLS",
+    "BatchResult",
+    "BarCache",
+    "LazyRecord",
+    "materialize",
+    "broker_offset_ms",
+    "to_datetime64",
+    "to_polars_datetime",
+    "PriceMode",
+    "to_points",
+    "from_points",
+    "to_points_array",
     "ERROR_DICT",
     # "MetaTrader5Streamer",
 ]
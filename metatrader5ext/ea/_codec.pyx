@@ -0,0 +1,82 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+"""
+Compiled implementation of the EA protocol codec, see codec.py for the reference
+implementation and documentation of each function.
+"""
+
+from libc.stdlib cimport strtod
+import numpy as np
+from ..errors import BAD_MESSAGE
+from .utils import BadMessage
+
+
+cdef extern from "Python.h":
+    const char* PyUnicode_AsUTF8AndSize(object unicode, Py_ssize_t* size) except NULL
+
+
+cdef inline bint _is_space(char c):
+    # The C locale whitespace skipped around fields by NumPy's parser
+    return c == b' ' or b'\t' <= c <= b'\r'
+
+
+cpdef str make_message(str command, str sub_command, object parameters):
+    return command + '^' + sub_command + '^' + '^'.join(parameters)
+
+
+cpdef dict parse_response_message(str message):
+    cdef list parts = message.split('^')
+    cdef Py_ssize_t end = len(parts)
+    if end < 3:
+        raise ValueError("Invalid format. Expected at least three parts separated by '^'.")
+
+    while end > 2 and not parts[end - 1]:
+        end -= 1
+    cdef list data = parts[2:end]
+    if '' in data:
+        raise ValueError("Invalid format. Hidden '^' delimiters detected in data.")
+    return {'command': parts[0], 'sub_command': parts[1], 'data': data}
+
+
+cpdef list split_records(list data):
+    return [(<str>record).split('$') for record in data]
+
+
+def parse_record_matrix(list records, Py_ssize_t fields):
+    # Accepts the same fields as codec.parse_record_matrix: decimal numbers and inf/nan
+    # spellings surrounded by whitespace, but not the hexadecimal numbers strtod reads
+    cdef Py_ssize_t count = len(records)
+    out = np.empty((count, fields), dtype=np.float64)
+    cdef double[:, ::1] values = out
+    cdef Py_ssize_t row, column, size = 0
+    cdef const char* cursor
+    cdef const char* digits
+    cdef const char* record_end
+    cdef char* end = NULL
+
+    for row in range(count):
+        record = records[row]
+        if not isinstance(record, str):
+            raise BadMessage(f"{BAD_MESSAGE.msg()}: record {row} is not a string")
+        # Zero-copy for ASCII strings, whose UTF-8 form is their storage
+        cursor = PyUnicode_AsUTF8AndSize(record, &size)
+        record_end = cursor + size
+        for column in range(fields):
+            while _is_space(cursor[0]):
+                cursor += 1
+            digits = cursor + 1 if cursor[0] == b'+' or cursor[0] == b'-' else cursor
+            if digits[0] == b'0' and (digits[1] == b'x' or digits[1] == b'X'):
+                raise BadMessage(f"{BAD_MESSAGE.msg()}: could not parse field {column} of record {row}")
+            values[row, column] = strtod(cursor, &end)
+            if end == cursor:
+                raise BadMessage(f"{BAD_MESSAGE.msg()}: could not parse field {column} of record {row}")
+            cursor = end
+            while _is_space(cursor[0]):
+                cursor += 1
+            if column < fields - 1:
+                if cursor[0] != b'$':
+                    raise BadMessage(f"{BAD_MESSAGE.msg()}: expected {fields} fields per record")
+                cursor += 1
+        # Also rejects NUL characters, which end the C string before the record does
+        if cursor != record_end:
+            raise BadMessage(f"{BAD_MESSAGE.msg()}: expected {fields} fields per record")
+    return out
@@ -0,0 +1,134 @@
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+import numpy as np
+from .symbols import SYMBOLS
+
+
+class BarSeries:
+    """
+    Bars of one symbol and timeframe in a growable NumPy array, oldest first.
+
+    Attributes:
+        size (int): Number of bars held.
+        limit (int): Number of bars kept when the series is trimmed, the largest count requested so far.
+        fetched_at (float): Monotonic time of the last update.
+    """
+    size: int
+    limit: int
+    fetched_at: float
+
+    def __init__(self, dtype: np.dtype, capacity: int = 256) -> None:
+        self._data = np.empty(capacity, dtype=dtype)
+        self.size = 0
+        self.limit = 0
+        self.fetched_at = 0.0
+
+    @property
+    def bars(self) -> np.ndarray:
+        """ The bars, a view that is only valid until the next merge. """
+        return self._data[:self.size]
+
+    @property
+    def nbytes(self) -> int:
+        return self._data.nbytes
+
+    @property
+    def last_time(self) -> Optional[int]:
+        return int(self._data['time'][self.size - 1]) if self.size else None
+
+    def merge(self, rates: np.ndarray) -> None:
+        """
+        Merges freshly fetched bars, oldest first.
+
+        Cached bars from the first fetched bar on are replaced, which updates the
+        still-forming bar in place and appends the new ones.
+        """
+        if not len(rates):
+            return
+        start = int(np.searchsorted(self.bars['time'], rates['time'][0]))
+        end = start + len(rates)
+        if end > len(self._data):
+            capacity = len(self._data)
+            while capacity < end:
+                capacity *= 2
+            data = np.empty(capacity, dtype=self._data.dtype)
+            data[:start] = self._data[:start]
+            self._data = data
+        self._data[start:end] = rates
+        self.size = end
+        if self.limit and self.size > 2 * self.limit:
+            self._data[:self.limit] = self._data[self.size - self.limit:self.size]
+            self.size = self.limit
+        self.fetched_at = time.monotonic()
+
+
+class BarCache:
+    """
+    Per (symbol, timeframe) bar series, evicted least recently used first under a memory budget.
+
+    Attributes:
+        memory_budget (int): Maximum bytes held by all series, the most recently used series is always kept.
+        hits (int): Number of requests served by an incremental fetch.
+        misses (int): Number of requests that needed a full fetch.
+        evictions (int): Number of series evicted.
+    """
+    memory_budget: int
+    hits: int
+    misses: int
+    evictions: int
+
+    def __init__(self, memory_budget: int = 64 * 2 ** 20) -> None:
+        self.memory_budget = memory_budget
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._series: "OrderedDict[Tuple[int, int], BarSeries]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._series)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(series.nbytes for series in self._series.values())
+
+    def get(self, symbol: str, timeframe: int) -> Optional[BarSeries]:
+        """ Returns the series of a symbol and timeframe, marking it as recently used. """
+        key = (SYMBOLS.intern(symbol), timeframe)
+        series = self._series.get(key)
+        if series is not None:
+            self._series.move_to_end(key)
+        return series
+
+    def merge(self, symbol: str, timeframe: int, rates: np.ndarray, limit: int = 0) -> BarSeries:
+        """
+        Merges fetched bars into the series of a symbol and timeframe, creating it if needed.
+
+        :param symbol: The instrument.
+        :param timeframe: The timeframe in MT5 format.
+        :param rates: The bars, oldest first.
+        :param limit: The number of bars requested, raising the series limit.
+        :return: The series.
+        """
+        key = (SYMBOLS.intern(symbol), timeframe)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = BarSeries(rates.dtype, max(256, len(rates)))
+        self._series.move_to_end(key)
+        series.limit = max(series.limit, limit)
+        series.merge(rates)
+        self._evict()
+        return series
+
+    def invalidate(self, symbol: Optional[str] = None, timeframe: Optional[int] = None) -> None:
+        """ Drops the series of a symbol (and timeframe), every series by default. """
+        sym_id = None if symbol is None else SYMBOLS.id(symbol)
+        for key in [key for key in self._series if (symbol is None or key[0] == sym_id) and (timeframe is None or key[1] == timeframe)]:
+            del self._series[key]
+
+    def _evict(self) -> None:
+        total = self.nbytes
+        while total > self.memory_budget and len(self._series) > 1:
+            _, series = self._series.popitem(last=False)
+            total -= series.nbytes
+            self.evictions += 1
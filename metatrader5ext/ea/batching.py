@@ -0,0 +1,29 @@
+from typing import Any, Dict, List
+from .conflation import parse_stream_tick
+
+TICK_COLUMNS = ('symbol', 'sym_id', 'time', 'bid', 'ask', 'last', 'volume')
+
+
+def tick_columns(messages: List[str], default_symbol: str = '') -> Dict[str, List[Any]]:
+    """
+    Converts a batch of stream tick messages into columns.
+
+    Messages that are not well-formed ticks are left out.
+
+    :param messages: The stream messages, see parse_stream_tick() for the accepted layouts.
+    :param default_symbol: The instrument of ticks without an instrument field.
+    :return: A dict of equally long lists, keyed by TICK_COLUMNS, with times in epoch milliseconds like StreamTick.time.
+    """
+    symbols, sym_ids, times, bids, asks, lasts, volumes = [], [], [], [], [], [], []
+    for message in messages:
+        tick = parse_stream_tick(message, default_symbol)
+        if tick is None:
+            continue
+        symbols.append(tick.symbol)
+        sym_ids.append(tick.sym_id)
+        times.append(tick.time)
+        bids.append(tick.bid)
+        asks.append(tick.ask)
+        lasts.append(tick.last)
+        volumes.append(tick.volume)
+    return dict(zip(TICK_COLUMNS, (symbols, sym_ids, times, bids, asks, lasts, volumes)))
@@ -0,0 +1,72 @@
+"""
+Binary wire format for bulk EA replies.
+
+Bulk replies (ticks, bars, positions) can be sent as fixed-width little-endian
+records instead of `$`-delimited text. The records have the layout of the NumPy
+dtypes in parsers.py, so a reply is decoded with np.frombuffer without copying or
+parsing, and prices keep their full double precision.
+
+The format is negotiated with the connection check: a client that supports it
+sends 'F000^1^BINARY' and an EA that supports it lists 'BINARY' in its reply.
+Binary requests are then marked by a 'B' in front of the sub-command, e.g.
+'F021^B4^EURUSD^1000', and answered with 'F021^B^' followed by the records.
+EAs without binary support ignore the capability and the client keeps using text.
+"""
+
+from enum import Enum
+from typing import Optional
+import numpy as np
+from ..errors import BAD_LENGTH
+from .utils import BadMessage
+
+BINARY_CAPABILITY = 'BINARY'
+BINARY_SUB_COMMAND = 'B'
+
+
+class WireFormat(Enum):
+    """Wire format type.
+
+    Includes 2 wire formats: TEXT and BINARY.
+
+    TEXT: Every reply is `^`/`$`-delimited text.
+    BINARY: Bulk replies are fixed-width binary records, if the EA supports it.
+    """
+    TEXT = "text"
+    BINARY = "binary"
+
+    def to_str(self) -> str:
+        """Returns the string representation of the enum value."""
+        return self.value
+
+
+def binary_reply_prefix(code: str) -> bytes:
+    return f"{code}^{BINARY_SUB_COMMAND}^".encode()
+
+
+def encode_binary_reply(code: str, records: np.ndarray) -> bytes:
+    """
+    Encodes records as a binary reply, the reference for EA implementations.
+
+    :param code: The command code, e.g. 'F021'.
+    :param records: The records, a structured array with a little-endian dtype from parsers.py.
+    :return: The reply.
+    """
+    return binary_reply_prefix(code) + np.ascontiguousarray(records).tobytes()
+
+
+def decode_binary_reply(payload: bytes, code: str, dtype: np.dtype) -> Optional[np.ndarray]:
+    """
+    Decodes a binary reply without copying the records.
+
+    :param payload: The reply.
+    :param code: The expected command code.
+    :param dtype: The record layout.
+    :return: A read-only view of the records over the payload, or None if the reply is not binary (e.g. a text error).
+    """
+    prefix = binary_reply_prefix(code)
+    if not payload.startswith(prefix):
+        return None
+    body = memoryview(payload)[len(prefix):]
+    if len(body) % dtype.itemsize:
+        raise BadMessage(f"{BAD_LENGTH.msg()}: {len(body)} bytes is not a multiple of the {dtype.itemsize} byte record size")
+    return np.frombuffer(body, dtype=dtype)
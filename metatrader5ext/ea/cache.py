@@ -0,0 +1,83 @@
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional, Tuple
+
+
+class TTLCache:
+    """
+    Size-bounded LRU cache whose entries expire after a per-entry time to live.
+
+    Attributes:
+        maxsize (int): Maximum number of entries, the least recently used entry is evicted beyond it.
+        hits (int): Number of lookups answered from the cache.
+        misses (int): Number of lookups not found or expired.
+        evictions (int): Number of entries evicted to stay within maxsize.
+        expirations (int): Number of entries dropped because their time to live passed.
+    """
+    maxsize: int
+    hits: int
+    misses: int
+    evictions: int
+    expirations: int
+
+    def __init__(self, maxsize: int = 256, clock: Callable[[], float] = time.monotonic) -> None:
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1.")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        """
+        Looks up an entry.
+
+        :param key: The key.
+        :return: (True, value) on a hit, (False, None) on a miss.
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry[0] > self._clock():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, entry[1]
+            del self._entries[key]
+            self.expirations += 1
+        self.misses += 1
+        return False, None
+
+    def set(self, key: Hashable, value: Any, ttl: float) -> None:
+        """
+        Stores an entry.
+
+        :param key: The key.
+        :param value: The value.
+        :param ttl: Seconds until the entry expires.
+        """
+        self._entries[key] = (self._clock() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, predicate: Optional[Callable[[Hashable], bool]] = None) -> int:
+        """
+        Drops entries.
+
+        :param predicate: Selects the keys to drop, every entry by default.
+        :return: The number of entries dropped.
+        """
+        if predicate is None:
+            count = len(self._entries)
+            self._entries.clear()
+            return count
+        keys = [key for key in self._entries if predicate(key)]
+        for key in keys:
+            del self._entries[key]
+        return len(keys)
@@ -1,7 +1,25 @@
-from typing import Callable, Optional, Dict, Any, List
+from typing import AsyncIterator, Awaitable, Callable, Optional, Dict, Any, List, Hashable, Sequence, Set, Union
 from datetime import datetime
 from dataclasses import dataclass
+import asyncio
+import copy
+import time
+import numpy as np
+from ..common import MAX_MSG_LEN
 from .connection import Connection
+from .framing import Framing, MESSAGE_TERMINATOR
+from .binary import BINARY_CAPABILITY, BINARY_SUB_COMMAND, WireFormat, decode_binary_reply
+from .compression import COMPRESSION_CAPABILITY, COMPRESSION_SUB_COMMAND
+from .timestamps import broker_offset_ms
+from .prices import PriceMode, symbol_digits, to_points_array
+from .fanout import BatchResult, chunk_instruments, fan_out, to_columns
+from .cache import TTLCache
+from .bar_cache import BarCache
+from .history import HISTORY_CHUNK_SIZE, PAGED_CAPABILITY, PAGED_SUB_COMMAND, page_history, to_polars
+from .parsers import RATE_DTYPE
+from .utils import timeframe_seconds
+from .stream_queue import OverflowPolicy
+from .commands import COMMANDS, HISTORY_PAGES, CommandSpec, ResponseKind
 from .errors import ERROR_DICT
 
 @dataclass 
@@ -18,6 +36,37 @@ class EAClientConfig:
         enable_stream (bool): Flag to enable or disable streaming. Default is True.
         callback (Optional[Callable]): Callback function to handle streamed data. Default is None.
         debug (bool): Whether to enable debug messages. Default is False.
+        keep_alive (bool): Whether to reuse REST sockets across requests. Reuse requires Framing.TERMINATOR or Framing.LENGTH_PREFIX, with Framing.NONE every reply is read until the EA closes the socket, so each request opens a new one. Default is True.
+        pool_size (int): Maximum number of open REST sockets, only reused with Framing.TERMINATOR or Framing.LENGTH_PREFIX (see keep_alive). Default is 4.
+        pool_idle_timeout (float): Seconds an idle REST socket is kept open. Default is 30.0.
+        connect_timeout (float): Seconds to wait for a REST socket to connect. Default is 5.0.
+        framing (Framing): How message boundaries are marked on the wire. Default is Framing.NONE (the EA closes the socket after each reply).
+        terminator (bytes): Message terminator used with Framing.TERMINATOR. Default is b"\r\n".
+        max_message_length (int): Largest accepted message, in bytes. Default is MAX_MSG_LEN.
+        stream_buffer_limit (int): Bytes buffered by the asyncio stream reader before it pauses reading. Default is 65536.
+        multiplex (bool): Whether to pipeline all REST requests over one socket using correlation IDs. Requires framing. Default is False.
+        max_in_flight (int): Maximum number of pipelined requests awaiting a reply. Default is 64.
+        stream_queue_size (int): Size of the queue between the stream reader and the callback, 0 calls the callback inline. Default is 0.
+        stream_overflow_policy (OverflowPolicy): What to do with stream messages when the queue is full. Default is OverflowPolicy.BLOCK.
+        stream_conflate_key (Optional[Callable]): Conflation key of a stream message for OverflowPolicy.CONFLATE. Default is None (command and instrument).
+        stream_conflation_slots (int): Number of symbols tracked when only the latest tick per symbol is delivered, 0 delivers every message. Default is 0.
+        stream_symbol (str): Instrument of streamed ticks that carry none, i.e. the chart symbol of the EA. Default is ''.
+        stream_batch_size (int): Maximum number of stream messages per callback call, 0 calls the callback per message. Default is 0.
+        stream_batch_interval (float): Seconds a queued batch waits to fill up before being delivered. Default is 0.0.
+        stream_batch_columns (bool): Delivers batches as a dict of tick columns instead of a list of messages. Default is False.
+        stream_reconnect (bool): Reopens the stream socket when it drops or stalls. Default is True.
+        stream_reconnect_delay (float): Seconds before the first reconnect attempt, doubled after each attempt. Default is 0.5.
+        stream_reconnect_max_delay (float): Longest delay between reconnect attempts. Default is 30.0.
+        stream_idle_timeout (float): Seconds without stream data after which the stream is reconnected, 0 disables the check. Default is 0.0.
+        wire_format (WireFormat): Format requested for bulk replies (ticks, bars, positions) with as_array=True. WireFormat.BINARY is negotiated with the EA on first use and falls back to text if the EA does not support it or framing is Framing.TERMINATOR. Default is WireFormat.TEXT.
+        compression (bool): Whether to accept zlib compressed replies to record requests (history, positions, orders), negotiated like wire_format. The EA compresses replies above its size threshold only. Default is False.
+        lazy_records (bool): Whether record replies (positions, orders, bars, ...) are returned as LazyRecords, decoding each field when it is first read. Default is False.
+        price_mode (PriceMode): Representation of prices in tick and bar arrays (as_array=True), PriceMode.POINTS returns int64 points scaled by the instrument's digits. Default is PriceMode.FLOAT.
+        batch_concurrency (int): Maximum number of requests in flight for batch methods like get_last_ticks(). Default is 4.
+        cache_size (int): Number of replies of slow-changing data (static account info, instrument info, instruments, terminal type, license) kept in an LRU cache, 0 disables the cache. Default is 0.
+        cache_ttls (Optional[Dict[str, float]]): Seconds each command's reply is cached, keyed by method name (e.g. {'get_instrument_info': 10.0}), overriding the command defaults. A TTL also enables caching of other commands. Default is None.
+        coalesce_requests (bool): Whether identical concurrent read requests share one round trip to the EA. Requests that change state are always sent. Default is True.
+        bar_cache_bytes (int): Memory budget in bytes of the local bar cache, which keeps the bars of get_last_x_bars_from_now(as_array=True) per instrument and timeframe and only fetches the bars newer than the cached ones, 0 disables the cache. Default is 0.
     """
     host: str = "127.0.0.1"
     rest_port: int = 15556
@@ -27,7 +76,38 @@ class EAClientConfig:
     enable_stream: bool = True
     callback: Optional[Callable] = None
     debug: bool = False
-    
+    keep_alive: bool = True
+    pool_size: int = 4
+    pool_idle_timeout: float = 30.0
+    connect_timeout: float = 5.0
+    framing: Framing = Framing.NONE
+    terminator: bytes = MESSAGE_TERMINATOR
+    max_message_length: int = MAX_MSG_LEN
+    stream_buffer_limit: int = 2 ** 16
+    multiplex: bool = False
+    max_in_flight: int = 64
+    stream_queue_size: int = 0
+    stream_overflow_policy: OverflowPolicy = OverflowPolicy.BLOCK
+    stream_conflate_key: Optional[Callable[[str], Hashable]] = None
+    stream_conflation_slots: int = 0
+    stream_symbol: str = ''
+    stream_batch_size: int = 0
+    stream_batch_interval: float = 0.0
+    stream_batch_columns: bool = False
+    stream_reconnect: bool = True
+    stream_reconnect_delay: float = 0.5
+    stream_reconnect_max_delay: float = 30.0
+    stream_idle_timeout: float = 0.0
+    wire_format: WireFormat = WireFormat.TEXT
+    compression: bool = False
+    lazy_records: bool = False
+    price_mode: PriceMode = PriceMode.FLOAT
+    batch_concurrency: int = 4
+    cache_size: int = 0
+    cache_ttls: Optional[Dict[str, float]] = None
+    coalesce_requests: bool = True
+    bar_cache_bytes: int = 0
+
 class EAClient(Connection):
     """
     Extends the Connection class to provide specific methods for interacting with the EA server.
@@ -35,12 +115,37 @@ class EAClient(Connection):
     Attributes:
         return_error (str): Stores the error message for the last command.
         ok (bool): Indicates if the last command was successful.
+        capabilities (Optional[Set[str]]): The optional protocol features agreed with the EA, None until negotiate() ran.
+        wire_format (Optional[WireFormat]): The negotiated format of bulk replies, None until negotiate() ran.
+        broker_offset (int): Offset of the broker's server time from UTC in milliseconds, set by sync_broker_offset().
+        cache (Optional[TTLCache]): The reply cache, with its hit/miss counters, None if disabled.
+        coalesced (int): Number of requests answered by an identical request already in flight.
+        bar_cache (Optional[BarCache]): The local bar cache, with its hit/miss counters, None if disabled.
+        price_digits (Dict[str, int]): Digits of each instrument used by PriceMode.POINTS, queried on first use or set from SymbolInfo.digits.
     """
     def __init__(self, config: EAClientConfig) -> None:
-        super().__init__(config.host, config.rest_port, config.stream_port, config.encoding, config.debug)
+        super().__init__(config.host, config.rest_port, config.stream_port, config.encoding, config.debug,
+                         config.keep_alive, config.pool_size, config.pool_idle_timeout, config.connect_timeout,
+                         config.framing, config.terminator, config.max_message_length,
+                         config.stream_buffer_limit, config.multiplex, config.max_in_flight,
+                         config.stream_queue_size, config.stream_overflow_policy, config.stream_conflate_key,
+                         config.stream_conflation_slots, config.stream_symbol, config.stream_batch_size,
+                         config.stream_batch_interval, config.stream_batch_columns, config.stream_reconnect,
+                         config.stream_reconnect_delay, config.stream_reconnect_max_delay, config.stream_idle_timeout)
         self.config = config
         self.return_error = ''
         self.ok = False
+        self.capabilities: Optional[Set[str]] = None
+        self.wire_format: Optional[WireFormat] = None
+        self.broker_offset = 0
+        self.price_digits: Dict[str, int] = {}
+        self.cache = TTLCache(config.cache_size) if config.cache_size else None
+        self.coalesced = 0
+        self.bar_cache = BarCache(config.bar_cache_bytes) if config.bar_cache_bytes else None
+        self._in_flight: Dict[bytes, asyncio.Task] = {}
+        self._cache_ttls = {(spec.code, spec.sub_command): spec.ttl for spec in COMMANDS.values() if spec.ttl}
+        for name, ttl in (config.cache_ttls or {}).items():
+            self._cache_ttls[(COMMANDS[name].code, COMMANDS[name].sub_command)] = ttl
 
     def _process_response(self, response: str, expected_code: str) -> Optional[Dict[str, Any]]:
         """
@@ -70,29 +175,184 @@ class EAClient(Connection):
         self.ok = True
         return parsed_response
 
+    async def _execute(self, spec: CommandSpec, *args: Any, as_array: bool = False, paged: bool = False) -> Any:
+        """
+        Sends a command described by a CommandSpec and decodes the reply.
+
+        :param spec: The command, see commands.COMMANDS.
+        :param args: The command arguments, encoded by the spec.
+        :param as_array: Decodes the reply with the spec's array decoder, or as binary records if negotiated.
+        :param paged: Marks the request as a paged history request, see history.PAGED_CAPABILITY.
+        :return: The decoded reply, or the spec default if the EA did not reply or replied with an error.
+        """
+        self.return_error = ''
+        cache_key = None
+        if self.cache is not None and not as_array:
+            ttl = self._cache_ttls.get((spec.code, spec.sub_command))
+            if ttl:
+                cache_key = (spec.code, spec.sub_command, args)
+                try:
+                    hit, value = self.cache.get(cache_key)
+                except TypeError:
+                    hit, cache_key = False, None
+                if hit:
+                    self.ok = True
+                    return copy.copy(value)
+
+        try:
+            if self.capabilities is None and (self.config.wire_format == WireFormat.BINARY or self.config.compression):
+                await self.negotiate()
+            binary = as_array and spec.binary_dtype is not None and self.wire_format == WireFormat.BINARY
+            markers = ''
+            if spec.kind == ResponseKind.RECORDS and COMPRESSION_CAPABILITY in (self.capabilities or ()):
+                markers += COMPRESSION_SUB_COMMAND
+            if paged:
+                markers += PAGED_SUB_COMMAND
+            if binary:
+                markers += BINARY_SUB_COMMAND
+            request = spec.encode_bytes(args, markers, self.encoding)
+            if self.debug:
+                print(f"Constructed message: {request.decode(self.encoding)}")
+
+            if binary:
+                payload = await self._send_once(request, self.send_raw_message, spec)
+                records = decode_binary_reply(payload, spec.code, spec.binary_dtype)
+                if records is not None:
+                    self.ok = True
+                    return await self._array_result(spec, records, args)
+                # Not a binary reply, e.g. an error, which is handled like a text reply
+                response = payload.decode(self.encoding)
+            else:
+                response = await self._send_once(request, self.send_encoded, spec)
+            if not response:
+                self.ok = False
+                return spec.default
+
+            if self.debug:
+                print(response)
+
+            parsed_response = self._process_response(response, spec.code)
+            if parsed_response is None:
+                return spec.default
+            if as_array:
+                return await self._array_result(spec, spec.array_decoder(parsed_response['data']), args)
+            if self.config.lazy_records:
+                return spec.lazy_decode(parsed_response['data'], args)
+            result = spec.decode(parsed_response['data'], args)
+            if cache_key is not None:
+                self.cache.set(cache_key, copy.copy(result), ttl)
+            return result
+        except Exception as error:
+            self.return_error = ERROR_DICT['00001']
+            self.ok = False
+            raise Exception(f"Failed to {spec.description}: {error}")
+
+    async def _array_result(self, spec: CommandSpec, records: np.ndarray, args: tuple) -> np.ndarray:
+        """ Applies the configured price mode to an array reply. """
+        if self.config.price_mode != PriceMode.POINTS or spec.instrument_arg is None:
+            return records
+        instruments = args[spec.instrument_arg]
+        if isinstance(instruments, str):
+            return to_points_array(records, await self._price_digits(instruments))
+        digits = {instrument: await self._price_digits(instrument) for instrument in instruments}
+        return to_points_array(records, symbol_digits(records['symbol'], digits))
+
+    async def _price_digits(self, instrument: str) -> int:
+        """ Returns the digits of an instrument, queried once per instrument. """
+        digits = self.price_digits.get(instrument)
+        if digits is None:
+            info = await self.get_instrument_info(instrument)
+            if info is None:
+                raise ValueError(f"Unknown digits of {instrument}")
+            digits = self.price_digits[instrument] = info['digits']
+        return digits
+
+    async def _send_once(self, request: bytes, send: Callable[[bytes], Awaitable[Any]], spec: CommandSpec) -> Any:
+        """
+        Sends a request, sharing the reply with identical requests already in flight.
+
+        The exchange runs in its own task, so a cancelled caller does not cancel it
+        for the callers sharing it. Every caller decodes the shared raw reply itself.
+        """
+        if spec.mutating or not self.config.coalesce_requests:
+            return await send(request)
+        task = self._in_flight.get(request)
+        if task is None:
+            task = asyncio.ensure_future(send(request))
+            self._in_flight[request] = task
+            task.add_done_callback(lambda done: self._request_done(request, done))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _request_done(self, request: bytes, task: asyncio.Task) -> None:
+        if self._in_flight.get(request) is task:
+            del self._in_flight[request]
+        if not task.cancelled():
+            task.exception()
+
+    async def close(self) -> None:
+        """ Cancels the requests still in flight, e.g. pages prefetched by an abandoned iter_ticks(), and closes the sockets. """
+        tasks = list(self._in_flight.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await super().close()
+
+    def invalidate_cache(self, command: Optional[str] = None, *args: Any) -> int:
+        """
+        Drops cached replies, e.g. after changing a setting the cached data depends on.
+
+        :param command: The method name whose replies are dropped, every reply by default.
+        :param args: The arguments of the one reply to drop, every reply of the command by default.
+        :return: The number of replies dropped.
+        """
+        if self.cache is None:
+            return 0
+        if command is None:
+            return self.cache.invalidate()
+        spec = COMMANDS[command]
+        if args:
+            return self.cache.invalidate(lambda key: key == (spec.code, spec.sub_command, args))
+        return self.cache.invalidate(lambda key: key[:2] == (spec.code, spec.sub_command))
+
+    async def negotiate(self) -> Set[str]:
+        """
+        Agrees on the optional protocol features with the EA through the connection check.
+
+        The configured features (WireFormat.BINARY, compression) are only requested
+        if replies are not delimited by a terminator, which could occur inside binary
+        or compressed replies. Paged history requests (see iter_ticks()) are always
+        requested. EAs without them reply to the check as usual and the plain text
+        protocol is used.
+
+        :return: The capabilities supported by both sides, also stored in capabilities.
+        """
+        requested = [PAGED_CAPABILITY]
+        if self.framing != Framing.TERMINATOR:
+            if self.config.wire_format == WireFormat.BINARY:
+                requested.append(BINARY_CAPABILITY)
+            if self.config.compression:
+                requested.append(COMPRESSION_CAPABILITY)
+
+        capabilities = set()
+        response = await self.send_message(f"F000^1^{'^'.join(requested)}")
+        parsed_response = self.parse_response_message(response)
+        if parsed_response.get('command') == 'F000':
+            capabilities = set(requested) & set(parsed_response['data'])
+        self.capabilities = capabilities
+        self.wire_format = WireFormat.BINARY if BINARY_CAPABILITY in capabilities else WireFormat.TEXT
+        if self.debug:
+            print(f"Negotiated capabilities: {sorted(capabilities)}, wire format: {self.wire_format.to_str()}")
+        return capabilities
+
     async def check_connection(self) -> bool:
         """
         Checks the connection to the server.
 
         :return: True if the connection is successful, otherwise False.
         """
-        message = self.make_message('F000', '1', [])
-        self.return_error = ''
-
-        try:
-            response = await self.send_message(message)
-            if not response:
-                self.ok = False
-                return False
-
-            if self.debug:
-                print(response)
-
-            return self._process_response(response, 'F000') is not None
-        except Exception as error:
-            self.return_error = ERROR_DICT['00001']
-            self.ok = False
-            raise Exception(f"Connection check failed: {error}")
+        return await self._execute(COMMANDS['check_connection'])
 
     async def get_static_account_info(self) -> Optional[Dict[str, Any]]:
         """
@@ -100,37 +360,7 @@ class EAClient(Connection):
 
         :return: A dictionary containing static account information if successful, otherwise None.
         """
-        message = self.make_message('F001', '1', [])
-        self.return_error = ''
-
-        try:
-            response = await self.send_message(message)
-            if not response:
-                self.ok = False
-                return None
-
-            if self.debug:
-                print(response)
-
-            parsed_response = self._process_response(response, 'F001')
-            if parsed_response:
-                return {
-                    "name": parsed_response['data'][0],
-                    "login": parsed_response['data'][1],
-                    "currency": parsed_response['data'][2],
-                    "type": parsed_response['data'][3],
-                    "leverage": parsed_response['data'][4],
-                    "trade_allowed": parsed_response['data'][5],
-                    "limit_orders": parsed_response['data'][6],
-                    "margin_call": parsed_response['data'][7],
-                    "margin_close": parsed_response['data'][8],
-                    "company": parsed_response['data'][9]
-                }
-            return None
-        except Exception as error:
-            self.return_error = ERROR_DICT['00001']
-            self.ok = False
-            raise Exception(f"Failed to get static account info: {error}")
+        return await self._execute(COMMANDS['get_static_account_info'])
 
     async def get_dynamic_account_info(self) -> Optional[Dict[str, Any]]:
         """
@@ -138,33 +368,7 @@ class EAClient(Connection):
 
         :return: A dictionary containing dynamic account information if successful, otherwise None.
         """
-        message = self.make_message('F002', '1', [])
-        self.return_error = ''
-
-        try:
-            response = await self.send_message(message)
-            if not response:
-                self.ok = False
-                return None
-
-            if self.debug:
-                print(response)
-
-            parsed_response = self._process_response(response, 'F002')
-            if parsed_response:
-                return {
-                    "balance": parsed_response['data'][0],
-                    "equity": parsed_response['data'][1],
-                    "profit": parsed_response['data'][2],
-                    "margin": parsed_response['data'][3],
-                    "margin_level": parsed_response['data'][4],
-                    "margin_free": parsed_response['data'][5]
-                }
-            return None
-        except Exception as error:
-            self.return_error = ERROR_DICT['00001']
-            self.ok = False
-            raise Exception(f"Failed to get dynamic account info: {error}")
+        return await self._execute(COMMANDS['get_dynamic_account_info'])
 
     async def get_last_tick_info(self, instrument_name: str = 'EURUSD') -> Optional[Dict[str, Any]]:
         """
@@ -173,72 +377,29 @@ class EAClient(Connection):
         :param instrument_name: The name of the instrument.
         :return: A dictionary containing the last tick information if successful, otherwise None.
         """
-        message = self.make_message('F020', '2', [instrument_name])
-        self.return_error = ''
-
-        try:
-            response = await self.send_message(message)
-            if not response:
-                self.ok = False
-                return None
-
-            if self.debug:
-                print(response)
-
-            parsed_response = self._process_response(response, 'F020')
-            if parsed_response:
-                return {
-                    "instrument": instrument_name,
-                    "date": datetime.fromtimestamp(int(parsed_response['data'][0])).strftime('%Y-%m-%d %H:%M:%S'),
-                    "bid": float(parsed_response['data'][1]),
-                    "ask": float(parsed_response['data'][2]),
-                    "last": float(parsed_response['data'][3]),
-                    "volume": int(parsed_response['data'][4]),
-                    "spread": float(parsed_response['data'][5]),
-                    "date_in_ms": int(parsed_response['data'][6])
-                }
-            return None
-        except Exception as error:
-            self.return_error = ERROR_DICT['00001']
-            self.ok = False
-            raise Exception(f"Failed to get last tick info: {error}")
+        return await self._execute(COMMANDS['get_last_tick_info'], instrument_name)
 
     async def get_broker_server_time(self) -> Optional[Dict[str, int]]:
         """
         Retrieves the broker server time.
 
-        :return: A dictionary containing the broker server time if successful, otherwise None.
+        :return: A dictionary containing the broker server time, broken down and as epoch milliseconds ('timestamp'), if successful, otherwise None.
         """
-        message = self.make_message('F005', '1', [])
-        self.return_error = ''
+        return await self._execute(COMMANDS['get_broker_server_time'])
 
-        try:
-            response = await self.send_message(message)
-            if not response:
-                self.ok = False
-                return None
+    async def sync_broker_offset(self) -> int:
+        """
+        Measures the offset of the broker's server time from UTC and stores it in broker_offset.
 
-            if self.debug:
-                print(response)
+        Times returned by the EA are in server time, pass the offset to
+        timestamps.to_datetime64() / to_polars_datetime() to convert them to UTC.
 
-            parsed_response = self._process_response(response, 'F005')
-            if parsed_response:
-                timestamp = int(parsed_response['data'][0])
-                dt = datetime.fromtimestamp(timestamp)
-                my_date = {
-                    "year": dt.year,
-                    "month": dt.month,
-                    "day": dt.day,
-                    "hour": dt.hour,
-                    "minute": dt.minute,
-                    "second": dt.second
-                }
-                return my_date
-            return None
-        except Exception as error:
-            self.return_error = ERROR_DICT['00001']
-            self.ok = False
-            raise Exception(f"Failed to get broker server time: {error}")
+        :return: The offset in milliseconds, server time minus UTC.
+        """
+        server_time = await self.get_broker_server_time()
+        if server_time is not None:
+            self.broker_offset = broker_offset_ms(server_time['timestamp'])
+        return self.broker_offset
 
     async def get_instrument_info(self, instrument_name: str = 'EURUSD') -> Optional[Dict[str, Any]]:
         """
@@ -247,39 +408,7 @@ class EAClient(Connection):
         :param instrument_name: The name of the instrument.
         :return: A dictionary containing the instrument information if successful, otherwise None.
         """
-        message = self.make_message('F003', '2', [instrument_name])
-        self.return_error = ''
-
-        try:
-            response = await self.send_message(message)
-            if not response:
-                self.ok = False
-                return None
-
-            if self.debug:
-                print(response)
-
-            parsed_response = self._process_response(response, 'F003')
-            if (parsed_response):
-                return {
-                    "instrument": instrument_name,
-                    "digits": int(parsed_response['data'][0]),  # SYMBOL_DIGITS (Integer)
-                    "max_lotsize": float(parsed_response['data'][1]),  # SYMBOL_VOLUME_MAX (Double)
-                    "min_lotsize": float(parsed_response['data'][2]),  # SYMBOL_VOLUME_MIN (Double)
-                    "lot_step": float(parsed_response['data'][3]),  # SYMBOL_VOLUME_STEP (Double)
-                    "point": float(parsed_response['data'][4]),  # SYMBOL_POINT (Double)
-                    "tick_size": float(parsed_response['data'][5]),  # SYMBOL_TRADE_TICK_SIZE (Double)
-                    "tick_value": float(parsed_response['data'][6]),  # SYMBOL_TRADE_TICK_VALUE (Double)
-                    "swap_long": float(parsed_response['data'][7]),  # SYMBOL_SWAP_LONG (Double)
-                    "swap_short": float(parsed_response['data'][8]),  # SYMBOL_SWAP_SHORT (Double)
-                    "stop_level": int(parsed_response['data'][9]),  # SYMBOL_TRADE_STOPS_LEVEL (Integer)
-                    "contract_size": float(parsed_response['data'][10])  # SYMBOL_TRADE_CONTRACT_SIZE (Double)
-                }
-            return None
-        except Exception as error:
-            self.return_error = ERROR_DICT['00001']
-            self.ok = False
-            raise Exception(f"Failed to get instrument info: {error}")
+        return await self._execute(COMMANDS['get_instrument_info'], instrument_name)
 
     async def check_terminal_server_connection(self) -> bool:
         """
@@ -287,24 +416,7 @@ class EAClient(Connection):
 
         :return: True if connected, otherwise False.
         """
-        message = self.make_message('F011', '1', [])
-        self.return_error = ''
-
-        try:
-            response = await self.send_message(message)
-            if not response:
-                self.ok = False
-                return False
-
-            if self.debug:
-                print(response)
-
-            parsed_response = self._process_response(response, 'F011')
-            return parsed_response is not None and parsed_response['data'][0] == '1'
-        except Exception as error:
-            self.return_error = ERROR_DICT['00001']
-            self.ok = False
-            raise Exception(f"Failed to check terminal server connection: {error}")
+        return await self._execute(COMMANDS['check_terminal_server_connection'])
 
     async def check_terminal_type(self) -> Optional[str]:
         """
@@ -312,26 +424,7 @@ class EAClient(Connection):
 
         :return: 'MT4' or 'MT5' if successful, otherwise None.
         """
-        message = self.make_message('F012', '1', [])
-        self.return_error = ''
-
-        try:
-            response = await self.send_message(message)
-            if not response:
-                self.ok = False
-                return None
-
-            if self.debug:
-                print(response)
-
-            parsed_response = self._process_response(response, 'F012')
-            if parsed_response:
-                return 'MT4' if parsed_response['data'][0] == '1' else 'MT5'
-            return None
-        except Exception as error:
-            self.return_error = ERROR_DICT['00001']
-            self.ok = False
-            raise Exception(f"Failed to check terminal type: {error}")
+        return await self._execute(COMMANDS['check_terminal_type'])
 
     async def check_license(self) -> Optional[str]:
         """
@@ -339,26 +432,7 @@ class EAClient(Connection):
 
         :return: 'Demo' or 'Licensed' if successful, otherwise None.
         """
-        message = self.make_message('F006', '1', [])
-        self.return_error = ''
-
-        try:
-            response = await self.send_message(message)
-            if not response:
-                self.ok = False
-                return None
-
-            if self.debug:
-                print(response)
-
-            parsed_response = self._process_response(response, 'F006')
-            if parsed_response:
-                return parsed_response['data'][2]
-            return None
-        except Exception as error:
-            self.return_error = ERROR_DICT['00001']
-            self.ok = False
-            raise Exception(f"Failed to check license: {error}")
+        return await self._execute(COMMANDS['check_license'])
 
     async def check_trading_allowed(self, instrument_name: str = 'EURUSD') -> bool:
         """
@@ -367,24 +441,7 @@ class EAClient(Connection):
         :param instrument_name: The name of the instrument.
         :return: True if trading is allowed, otherwise False.
         """
-        message = self.make_message('F008', '2', [instrument_name])
-        self.return_error = ''
-
-        try:
-            response = await self.send_message(message)
-            if not response:
-                self.ok = False
-                return False
-
-            if self.debug:
-                print(response)
-
-            parsed_response = self._process_response(response, 'F008')
-            return parsed_response is not None and parsed_response['data'][1] == 'OK'
-        except Exception as error:
-            self.return_error = ERROR_DICT['00001']
-            self.ok = False
-            raise Exception(f"Failed to check trading allowed: {error}")
+        return await self._execute(COMMANDS['check_trading_allowed'], instrument_name)
 
     async def get_instruments(self) -> Optional[List[str]]:
         """
@@ -392,65 +449,18 @@ class EAClient(Connection):
 
         :return: A list of instrument names if successful, otherwise None.
         """
-        message = self.make_message('F007', '2', [])
-        self.return_error = ''
+        return await self._execute(COMMANDS['get_instruments'])
 
-        try:
-            response = await self.send_message(message)
-            if not response:
-                self.ok = False
-                return None
-
-            if self.debug:
-                print(response)
-
-            parsed_response = self._process_response(response, 'F007')
-            if parsed_response:
-                return parsed_response['data'][1:]
-            return None
-        except Exception as error:
-            self.return_error = ERROR_DICT['00001']
-            self.ok = False
-            raise Exception(f"Failed to get instruments: {error}")
-
-    async def get_last_x_ticks_from_now(self, instrument_name: str = 'EURUSD', nbrofticks: int = 2000) -> Optional[List[Dict[str, Any]]]:
+    async def get_last_x_ticks_from_now(self, instrument_name: str = 'EURUSD', nbrofticks: int = 2000, as_array: bool = False) -> Optional[Union[List[Dict[str, Any]], np.ndarray]]:
         """
         Retrieves the last x ticks from an instrument.
 
         :param instrument_name: The name of the instrument.
         :param nbrofticks: The number of ticks to retrieve.
+        :param as_array: Returns a structured array laid out like MetaTrader5.copy_ticks_from (see parsers.TICK_DTYPE).
         :return: A list of tick data if successful, otherwise None.
         """
-        message = self.make_message('F021', '4', [instrument_name, str(nbrofticks)])
-        self.return_error = ''
-
-        try:
-            response = await self.send_message(message)
-            if not response:
-                self.ok = False
-                return None
-
-            if self.debug:
-                print(response)
-
-            parsed_response = self._process_response(response, 'F021')
-            if parsed_response:
-                ticks = []
-                for tick in parsed_response['data']:
-                    tick_data = tick.split('$')
-                    ticks.append({
-                        "date": int(tick_data[0]),
-                        "ask": float(tick_data[1]),
-                        "bid": float(tick_data[2]),
-                        "last": float(tick_data[3]),
-                        "volume": int(tick_data[4])
-                    })
-                return ticks
-            return None
-        except Exception as error:
-            self.return_error = ERROR_DICT['00001']
-            self.ok = False
-            raise Exception(f"Failed to get last x ticks: {error}")
+        return await self._execute(COMMANDS['get_last_x_ticks_from_now'], instrument_name, nbrofticks, as_array=as_array)
 
     async def get_actual_bar_info(self, instrument_name: str = 'EURUSD', timeframe: int = 16408) -> Optional[Dict[str, Any]]:
         """
@@ -460,164 +470,215 @@ class EAClient(Connection):
         :param timeframe: The timeframe in MT5 format.
         :return: A dictionary containing the bar information if successful, otherwise None.
         """
-        message = self.make_message('F041', '3', [instrument_name, str(timeframe)])
-        self.return_error = ''
-
-        try:
-            response = await self.send_message(message)
-            if not response:
-                self.ok = False
-                return None
-
-            if self.debug:
-                print(response)
+        bar = await self._execute(COMMANDS['get_actual_bar_info'], instrument_name, timeframe)
+        if bar is not None and self.bar_cache is not None:
+            await self._update_forming_bar(instrument_name, timeframe, bar)
+        return bar
 
-            parsed_response = self._process_response(response, 'F041')
-            if parsed_response:
-                return {
-                    "instrument": instrument_name,
-                    "date": int(parsed_response['data'][0]),
-                    "open": float(parsed_response['data'][1]),
-                    "high": float(parsed_response['data'][2]),
-                    "low": float(parsed_response['data'][3]),
-                    "close": float(parsed_response['data'][4]),
-                    "volume": int(parsed_response['data'][5])
-                }
-            return None
-        except Exception as error:
-            self.return_error = ERROR_DICT['00001']
-            self.ok = False
-            raise Exception(f"Failed to get actual bar info: {error}")
-
-    async def get_specific_bar(self, instrument_list: List[str], specific_bar_index: int = 1, timeframe: int = 16408) -> Optional[List[Dict[str, Any]]]:
+    async def get_specific_bar(self, instrument_list: List[str], specific_bar_index: int = 1, timeframe: int = 16408, as_array: bool = False) -> Optional[Union[List[Dict[str, Any]], np.ndarray]]:
         """
         Retrieves information for a specific bar for a list of instruments.
 
         :param instrument_list: A list of instrument names.
         :param specific_bar_index: The index of the specific bar.
         :param timeframe: The timeframe in MT5 format.
+        :param as_array: Returns a structured array of the bars, see parsers.SYMBOL_RATE_DTYPE.
         :return: A list of dictionaries containing the bar information if successful, otherwise None.
         """
-        instruments = '$'.join(instrument_list)
-        message = self.make_message('F045', '3', [instruments, str(specific_bar_index), str(timeframe)])
-        self.return_error = ''
+        return await self._execute(COMMANDS['get_specific_bar'], instrument_list, specific_bar_index, timeframe, as_array=as_array)
 
-        try:
-            response = await self.send_message(message)
-            if not response:
-                self.ok = False
-                return None
+    async def get_last_x_bars_from_now(self, instrument_name: str = 'EURUSD', timeframe: int = 16408, nbrofbars: int = 1000, as_array: bool = False) -> Optional[Union[List[Dict[str, Any]], np.ndarray]]:
+        """
+        Retrieves the last x bars from an instrument.
 
-            if self.debug:
-                print(response)
+        :param instrument_name: The name of the instrument.
+        :param timeframe: The timeframe in MT5 format.
+        :param nbrofbars: The number of bars to retrieve.
+        :param as_array: Returns a structured array laid out like MetaTrader5.copy_rates_from (see parsers.RATE_DTYPE), served from the bar cache if enabled (see EAClientConfig.bar_cache_bytes).
+        :return: A list of bar data if successful, otherwise None.
+        """
+        if as_array and self.bar_cache is not None:
+            return await self._cached_bars(instrument_name, timeframe, nbrofbars)
+        return await self._execute(COMMANDS['get_last_x_bars_from_now'], instrument_name, timeframe, nbrofbars, as_array=as_array)
 
-            parsed_response = self._process_response(response, 'F045')
-            if parsed_response:
-                bars = []
-                for bar in parsed_response['data']:
-                    bar_data = bar.split('$')
-                    bars.append({
-                        "instrument": bar_data[0],
-                        "date": int(bar_data[1]),
-                        "open": float(bar_data[2]),
-                        "high": float(bar_data[3]),
-                        "low": float(bar_data[4]),
-                        "close": float(bar_data[5]),
-                        "volume": int(bar_data[6])
-                    })
-                return bars
-            return None
-        except Exception as error:
-            self.return_error = ERROR_DICT['00001']
-            self.ok = False
-            raise Exception(f"Failed to get specific bar info: {error}")
+    async def _cached_bars(self, instrument_name: str, timeframe: int, nbrofbars: int) -> Optional[np.ndarray]:
+        """
+        Returns the last bars from the bar cache, fetching only the bars newer than the cached ones.
 
-    async def get_last_x_bars_from_now(self, instrument_name: str = 'EURUSD', timeframe: int = 16408, nbrofbars: int = 1000) -> Optional[List[Dict[str, Any]]]:
+        The number of new bars is estimated from the time elapsed since the last fetch
+        and doubled until the fetched bars overlap the cached ones, so gaps in the
+        history (weekends, a stale server clock) cost a few more round trips at worst.
+        The fetched bars replace the cached ones from the first fetched bar on, which
+        updates the still-forming bar in place.
         """
-        Retrieves the last x bars from an instrument.
+        spec = COMMANDS['get_last_x_bars_from_now']
+        series = self.bar_cache.get(instrument_name, timeframe)
+        if series is None or not series.size or series.limit < nbrofbars:
+            rates = await self._execute(spec, instrument_name, timeframe, nbrofbars, as_array=True)
+            if rates is None:
+                return None
+            self.bar_cache.misses += 1
+            self.bar_cache.invalidate(instrument_name, timeframe)
+            series = self.bar_cache.merge(instrument_name, timeframe, rates, nbrofbars)
+            return series.bars[-nbrofbars:].copy()
+
+        last_time = series.last_time
+        elapsed_bars = int((time.monotonic() - series.fetched_at) // timeframe_seconds(timeframe))
+        count = min(nbrofbars, elapsed_bars + 2)
+        while True:
+            rates = await self._execute(spec, instrument_name, timeframe, count, as_array=True)
+            if rates is None:
+                return None
+            if not len(rates) or rates['time'][0] <= last_time or count >= nbrofbars:
+                break
+            count = min(2 * count, nbrofbars)
+        if len(rates) and rates['time'][0] > last_time:
+            # No overlap within nbrofbars bars, the cached bars are too old to be continued
+            self.bar_cache.misses += 1
+            self.bar_cache.invalidate(instrument_name, timeframe)
+        else:
+            self.bar_cache.hits += 1
+        series = self.bar_cache.merge(instrument_name, timeframe, rates, nbrofbars)
+        return series.bars[-nbrofbars:].copy()
+
+    async def _update_forming_bar(self, instrument_name: str, timeframe: int, bar: Dict[str, Any]) -> None:
+        """ Updates a cached bar series with the current bar returned by get_actual_bar_info(). """
+        series = self.bar_cache.get(instrument_name, timeframe)
+        if series is None or not series.size or bar['date'] // 1000 < series.last_time:
+            return
+        rates = np.zeros(1, dtype=RATE_DTYPE)
+        rates[0] = (bar['date'] // 1000, bar['open'], bar['high'], bar['low'], bar['close'], bar['volume'], 0, 0)
+        rates = await self._array_result(COMMANDS['get_last_x_bars_from_now'], rates, (instrument_name,))
+        # A gap between the cached bars and the current one is filled by the next get_last_x_bars_from_now()
+        if rates['time'][0] <= series.last_time + timeframe_seconds(timeframe):
+            fetched_at = series.fetched_at
+            series.merge(rates)
+            series.fetched_at = fetched_at
+
+    async def iter_ticks(self, instrument_name: str = 'EURUSD', nbrofticks: int = 2000, chunk_size: int = HISTORY_CHUNK_SIZE,
+                         as_polars: bool = False) -> AsyncIterator[Any]:
+        """
+        Retrieves the last x ticks of an instrument in pages, fetching the next pages while the current one is processed.
+
+        Paging needs an EA offering history.PAGED_CAPABILITY, the shipped EA always sends
+        the newest ticks of F021. Without it the ticks are retrieved in one request, like
+        get_last_x_ticks_from_now(), and yielded in pages of chunk_size ticks.
+
+        Usage:
+            async for ticks in client.iter_ticks('EURUSD', 1_000_000):
+                ...
+
+        :param instrument_name: The name of the instrument.
+        :param nbrofticks: The number of ticks to retrieve.
+        :param chunk_size: The maximum number of ticks per page.
+        :param as_polars: Yields polars DataFrames instead of structured arrays (see parsers.TICK_DTYPE).
+        :return: The ticks in pages, oldest first.
+        """
+        async for page in self._iter_history(HISTORY_PAGES['iter_ticks'], COMMANDS['get_last_x_ticks_from_now'], (instrument_name,),
+                                             nbrofticks, chunk_size, 'time_msc'):
+            yield to_polars(page) if as_polars else page
+
+    async def iter_bars(self, instrument_name: str = 'EURUSD', timeframe: int = 16408, nbrofbars: int = 1000,
+                        chunk_size: int = HISTORY_CHUNK_SIZE, as_polars: bool = False) -> AsyncIterator[Any]:
+        """
+        Retrieves the last x bars of an instrument in pages, see iter_ticks().
+
+        Like ticks, bars are only requested in pages from an EA offering history.PAGED_CAPABILITY,
+        otherwise they are retrieved in one request, like get_last_x_bars_from_now().
 
         :param instrument_name: The name of the instrument.
         :param timeframe: The timeframe in MT5 format.
         :param nbrofbars: The number of bars to retrieve.
-        :return: A list of bar data if successful, otherwise None.
+        :param chunk_size: The maximum number of bars per page.
+        :param as_polars: Yields polars DataFrames instead of structured arrays (see parsers.RATE_DTYPE).
+        :return: The bars in pages, oldest first.
         """
-        message = self.make_message('F042', '5', [instrument_name, str(timeframe), '0', str(nbrofbars)])
-        self.return_error = ''
+        async for page in self._iter_history(HISTORY_PAGES['iter_bars'], COMMANDS['get_last_x_bars_from_now'], (instrument_name, timeframe),
+                                             nbrofbars, chunk_size, 'time'):
+            yield to_polars(page) if as_polars else page
+
+    async def _iter_history(self, spec: CommandSpec, fallback: CommandSpec, args: tuple, count: int, chunk_size: int,
+                            key: str) -> AsyncIterator[np.ndarray]:
+        """ Pages through a paged history command, see history.page_history(), or slices the reply of `fallback` if the EA cannot page. """
+        if self.capabilities is None:
+            await self.negotiate()
+        if PAGED_CAPABILITY not in self.capabilities:
+            if chunk_size < 1:
+                raise ValueError("chunk_size must be at least 1.")
+            records = await self._execute(fallback, *args, count, as_array=True)
+            if records is None:
+                raise Exception(f"Failed to {fallback.description}: {self.return_error or 'no reply'}")
+            for offset in range(0, len(records), chunk_size):
+                yield records[offset:offset + chunk_size]
+            return
 
+        async def fetch(start: int, size: int) -> np.ndarray:
+            page = await self._execute(spec, *args, start, size, as_array=True, paged=True)
+            if page is None:
+                raise Exception(f"Failed to {spec.description}: {self.return_error or 'no reply'}")
+            return page
+        pages = page_history(fetch, count, chunk_size, key)
         try:
-            response = await self.send_message(message)
-            if not response:
-                self.ok = False
-                return None
+            async for page in pages:
+                yield page
+        finally:
+            # Cancels the prefetched pages when the consumer stops early
+            await pages.aclose()
 
-            if self.debug:
-                print(response)
+    async def get_last_ticks(self, instruments: Sequence[str], max_in_flight: Optional[int] = None) -> BatchResult:
+        """
+        Retrieves the last tick of several instruments, with a bounded number of requests in flight.
 
-            parsed_response = self._process_response(response, 'F042')
-            if parsed_response:
-                bars = []
-                for bar in parsed_response['data']:
-                    bar_data = bar.split('$')
-                    bars.append({
-                        "date": int(bar_data[0]),
-                        "open": float(bar_data[1]),
-                        "high": float(bar_data[2]),
-                        "low": float(bar_data[3]),
-                        "close": float(bar_data[4]),
-                        "volume": int(bar_data[5])
-                    })
-                return bars
-            return None
-        except Exception as error:
-            self.return_error = ERROR_DICT['00001']
-            self.ok = False
-            raise Exception(f"Failed to get last x bars: {error}")
+        :param instruments: The instrument names.
+        :param max_in_flight: Maximum number of concurrent requests, batch_concurrency by default.
+        :return: The ticks as columns (see get_last_tick_info for the keys) and the error of each failed instrument.
+        """
+        results, errors = await fan_out(self.get_last_tick_info, instruments, max_in_flight or self.config.batch_concurrency)
+        return BatchResult(to_columns(results.values()), errors)
 
-    async def get_all_open_positions(self) -> Optional[List[Dict[str, Any]]]:
+    async def get_instruments_info(self, instruments: Sequence[str], max_in_flight: Optional[int] = None) -> BatchResult:
         """
-        Retrieves all open positions.
+        Retrieves information about several instruments, with a bounded number of requests in flight.
 
-        :return: A list of dictionaries containing open position information if successful, otherwise None.
+        :param instruments: The instrument names.
+        :param max_in_flight: Maximum number of concurrent requests, batch_concurrency by default.
+        :return: The instrument information as columns (see get_instrument_info for the keys) and the error of each failed instrument.
         """
-        message = self.make_message('F061', '1', [])
-        self.return_error = ''
+        results, errors = await fan_out(self.get_instrument_info, instruments, max_in_flight or self.config.batch_concurrency)
+        return BatchResult(to_columns(results.values()), errors)
 
-        try:
-            response = await self.send_message(message)
-            if not response:
-                self.ok = False
-                return None
+    async def get_bars(self, instruments: Sequence[str], specific_bar_index: int = 1, timeframe: int = 16408,
+                       max_in_flight: Optional[int] = None) -> BatchResult:
+        """
+        Retrieves a specific bar of several instruments.
 
-            if self.debug:
-                print(response)
+        Uses the multi-instrument form of get_specific_bar, with as many instruments
+        per request as fit, and fans the requests out with a bounded number in flight.
 
-            parsed_response = self._process_response(response, 'F061')
-            if parsed_response:
-                positions = []
-                for position in parsed_response['data']:
-                    position_data = position.split('$')
-                    positions.append({
-                        "ticket": int(position_data[0]),
-                        "instrument": position_data[1],
-                        "order_ticket": int(position_data[2]),
-                        "position_type": position_data[3],
-                        "magic_number": int(position_data[4]),
-                        "volume": float(position_data[5]),
-                        "open_price": float(position_data[6]),
-                        "open_time": int(position_data[7]),
-                        "stop_loss": float(position_data[8]),
-                        "take_profit": float(position_data[9]),
-                        "comment": position_data[10],
-                        "profit": float(position_data[11]),
-                        "swap": float(position_data[12]),
-                        "commission": float(position_data[13])
-                    })
-                return positions
-            return None
-        except Exception as error:
-            self.return_error = ERROR_DICT['00001']
-            self.ok = False
-            raise Exception(f"Failed to get all open positions: {error}")
+        :param instruments: The instrument names.
+        :param specific_bar_index: The index of the specific bar.
+        :param timeframe: The timeframe in MT5 format.
+        :param max_in_flight: Maximum number of concurrent requests, batch_concurrency by default.
+        :return: The bars as columns (see get_specific_bar for the keys) and the error of each instrument without a bar.
+        """
+        chunks = chunk_instruments(instruments)
+        results, chunk_errors = await fan_out(lambda index: self.get_specific_bar(chunks[index], specific_bar_index, timeframe),
+                                              range(len(chunks)), max_in_flight or self.config.batch_concurrency)
+        records = [record for index in sorted(results) for record in results[index]]
+        errors = {instrument: error for index, error in chunk_errors.items() for instrument in chunks[index]}
+        received = {record['instrument'] for record in records}
+        for index in results:
+            errors.update((instrument, "No bar in the reply") for instrument in chunks[index] if instrument not in received)
+        return BatchResult(to_columns(records), errors)
+
+    async def get_all_open_positions(self, as_array: bool = False) -> Optional[Union[List[Dict[str, Any]], np.ndarray]]:
+        """
+        Retrieves all open positions.
+
+        :param as_array: Returns a structured array of the positions, see parsers.POSITION_DTYPE.
+        :return: A list of dictionaries containing open position information if successful, otherwise None.
+        """
+        return await self._execute(COMMANDS['get_all_open_positions'], as_array=as_array)
 
     async def get_all_closed_positions(self) -> Optional[List[Dict[str, Any]]]:
         """
@@ -625,47 +686,7 @@ class EAClient(Connection):
 
         :return: A list of dictionaries containing closed position information if successful, otherwise None.
         """
-        message = self.make_message('F063', '1', [])
-        self.return_error = ''
-
-        try:
-            response = await self.send_message(message)
-            if not response:
-                self.ok = False
-                return None
-
-            if self.debug:
-                print(response)
-
-            parsed_response = self._process_response(response, 'F063')
-            if parsed_response:
-                positions = []
-                for position in parsed_response['data']:
-                    position_data = position.split('$')
-                    positions.append({
-                        "ticket": int(position_data[0]),
-                        "instrument": position_data[1],
-                        "order_ticket": int(position_data[2]),
-                        "position_type": position_data[3],
-                        "magic_number": int(position_data[4]),
-                        "volume": float(position_data[5]),
-                        "open_price": float(position_data[6]),
-                        "open_time": int(position_data[7]),
-                        "stop_loss": float(position_data[8]),
-                        "take_profit": float(position_data[9]),
-                        "close_price": float(position_data[10]),
-                        "close_time": int(position_data[11]),
-                        "comment": position_data[12],
-                        "profit": float(position_data[13]),
-                        "swap": float(position_data[14]),
-                        "commission": float(position_data[15])
-                    })
-                return positions
-            return None
-        except Exception as error:
-            self.return_error = ERROR_DICT['00001']
-            self.ok = False
-            raise Exception(f"Failed to get all closed positions: {error}")
+        return await self._execute(COMMANDS['get_all_closed_positions'])
 
     async def get_all_deleted_orders(self) -> Optional[List[Dict[str, Any]]]:
         """
@@ -673,43 +694,7 @@ class EAClient(Connection):
 
         :return: A list of dictionaries containing deleted order information if successful, otherwise None.
         """
-        message = self.make_message('F065', '1', [])
-        self.return_error = ''
-
-        try:
-            response = await self.send_message(message)
-            if not response:
-                self.ok = False
-                return None
-
-            if self.debug:
-                print(response)
-
-            parsed_response = self._process_response(response, 'F065')
-            if parsed_response:
-                orders = []
-                for order in parsed_response['data']:
-                    order_data = order.split('$')
-                    orders.append({
-                        "ticket": int(order_data[0]),
-                        "instrument": order_data[1],
-                        "order_type": order_data[2],
-                        "magic_number": int(order_data[3]),
-                        "volume": float(order_data[4]),
-                        "open_price": float(order_data[5]),
-                        "open_time": int(order_data[6]),
-                        "stop_loss": float(order_data[7]),
-                        "take_profit": float(order_data[8]),
-                        "delete_price": float(order_data[9]),
-                        "delete_time": int(order_data[10]),
-                        "comment": order_data[11]
-                    })
-                return orders
-            return None
-        except Exception as error:
-            self.return_error = ERROR_DICT['00001']
-            self.ok = False
-            raise Exception(f"Failed to get all deleted orders: {error}")
+        return await self._execute(COMMANDS['get_all_deleted_orders'])
 
     async def open_order(self, instrument_name: str, order_type: str, volume: float, open_price: float, slippage: int, magic_number: int, stop_loss: float, take_profit: float, comment: str, market: bool) -> Optional[int]:
         """
@@ -727,26 +712,7 @@ class EAClient(Connection):
         :param market: Whether the order is a market order.
         :return: The ticket number of the opened order if successful, otherwise None.
         """
-        message = self.make_message('F070', '9', [instrument_name, order_type, str(volume), str(open_price), str(slippage), str(magic_number), str(stop_loss), str(take_profit), comment, str(market)])
-        self.return_error = ''
-
-        try:
-            response = await self.send_message(message)
-            if not response:
-                self.ok = False
-                return None
-
-            if self.debug:
-                print(response)
-
-            parsed_response = self._process_response(response, 'F070')
-            if parsed_response:
-                return int(parsed_response['data'][0])
-            return None
-        except Exception as error:
-            self.return_error = ERROR_DICT['00001']
-            self.ok = False
-            raise Exception(f"Failed to open order: {error}")
+        return await self._execute(COMMANDS['open_order'], instrument_name, order_type, volume, open_price, slippage, magic_number, stop_loss, take_profit, comment, market)
 
     async def close_position_by_ticket(self, ticket: int) -> bool:
         """
@@ -755,24 +721,7 @@ class EAClient(Connection):
         :param ticket: The ticket number of the position.
         :return: True if the position was closed successfully, otherwise False.
         """
-        message = self.make_message('F071', '2', [str(ticket)])
-        self.return_error = ''
-
-        try:
-            response = await self.send_message(message)
-            if not response:
-                self.ok = False
-                return False
-
-            if self.debug:
-                print(response)
-
-            parsed_response = self._process_response(response, 'F071')
-            return parsed_response is not None
-        except Exception as error:
-            self.return_error = ERROR_DICT['00001']
-            self.ok = False
-            raise Exception(f"Failed to close position by ticket: {error}")
+        return await self._execute(COMMANDS['close_position_by_ticket'], ticket)
 
     async def close_position_partial_by_ticket(self, ticket: int, volume_to_close: float) -> bool:
         """
@@ -782,363 +731,49 @@ class EAClient(Connection):
         :param volume_to_close: The volume to close.
         :return: True if the position was partially closed successfully, otherwise False.
         """
-        message = self.make_message('F072', '3', [str(ticket), str(volume_to_close)])
-        self.return_error = ''
-
-        try:
-            response = await self.send_message(message)
-            if not response:
-                self.ok = False
-                return False
-
-            if self.debug:
-                print(response)
-
-            parsed_response = self._process_response(response, 'F072')
-            return parsed_response is not None
-        except Exception as error:
-            self.return_error = ERROR_DICT['00001']
-            self.ok = False
-            raise Exception(f"Failed to close position partially by ticket: {error}")
+        return await self._execute(COMMANDS['close_position_partial_by_ticket'], ticket, volume_to_close)
 
     async def delete_order_by_ticket(self, ticket: int) -> bool:
         """
         Deletes an order by its ticket number.
         """
-        message = self.make_message('F073', '2', [str(ticket)])
-        self.return_error = ''
-        
-        try:
-            response = await self.send_message(message)
-            if not response:
-                self.ok = False
-                return False
-
-            if self.debug:
-                print(response)
-
-            parsed_response = self._process_response(response, 'F073')
-            return parsed_response is not None
-        except Exception as error:
-            self.return_error = ERROR_DICT['00001']
-            self.ok = False
-            raise Exception(f"Failed to delete order by ticket: {error}")
+        return await self._execute(COMMANDS['delete_order_by_ticket'], ticket)
 
     async def get_all_pending_orders(self) -> Optional[List[Dict[str, Any]]]:
-        message = self.make_message('F060', '1', [])
-        self.return_error = ''
+        return await self._execute(COMMANDS['get_all_pending_orders'])
 
-        try:
-            response = await self.send_message(message)
-            if not response:
-                self.ok = False
-                return None
+    async def get_all_closed_positions_within_window(self, date_from: Union[datetime, int], date_to: Union[datetime, int]) -> Optional[List[Dict[str, Any]]]:
+        return await self._execute(COMMANDS['get_all_closed_positions_within_window'], date_from, date_to)
 
-            if self.debug:
-                print(response)
-
-            parsed_response = self._process_response(response, 'F060')
-            if parsed_response:
-                orders = []
-                for order in parsed_response['data']:
-                    order_data = order.split('$')
-                    orders.append({
-                        "ticket": int(order_data[0]),
-                        "instrument": order_data[1],
-                        "order_type": order_data[2],
-                        "magic_number": int(order_data[3]),
-                        "volume": float(order_data[4]),
-                        "open_price": float(order_data[5]),
-                        "stop_loss": float(order_data[6]),
-                        "take_profit": float(order_data[7]),
-                        "comment": order_data[8]
-                    })
-                return orders
-            return None
-        except Exception as error:
-            self.return_error = ERROR_DICT['00001']
-            self.ok = False
-            raise Exception(f"Failed to get all pending orders: {error}")
-
-    async def get_all_closed_positions_within_window(self, date_from: datetime, date_to: datetime) -> Optional[List[Dict[str, Any]]]:
-        message = self.make_message('F062', '3', [date_from.strftime('%Y/%m/%d/%H/%M/%S'), date_to.strftime('%Y/%m/%d/%H/%M/%S')])
-        self.return_error = ''
-
-        try:
-            response = await self.send_message(message)
-            if not response:
-                self.ok = False
-                return None
-
-            if self.debug:
-                print(response)
-
-            parsed_response = self._process_response(response, 'F062')
-            if parsed_response:
-                positions = []
-                for position in parsed_response['data']:
-                    position_data = position.split('$')
-                    positions.append({
-                        "ticket": int(position_data[0]),
-                        "instrument": position_data[1],
-                        "order_type": position_data[2],
-                        "magic_number": int(position_data[3]),
-                        "volume": float(position_data[4]),
-                        "open_price": float(position_data[5]),
-                        "open_time": int(position_data[6]),
-                        "stop_loss": float(position_data[7]),
-                        "take_profit": float(position_data[8]),
-                        "close_price": float(position_data[9]),
-                        "close_time": int(position_data[10]),
-                        "comment": position_data[11],
-                        "profit": float(position_data[12]),
-                        "swap": float(position_data[13]),
-                        "commission": float(position_data[14])
-                    })
-                return positions
-            return None
-        except Exception as error:
-            self.return_error = ERROR_DICT['00001']
-            self.ok = False
-            raise Exception(f"Failed to get all closed positions within window: {error}")
-
-    async def get_all_deleted_pending_orders_within_window(self, date_from: datetime, date_to: datetime) -> Optional[List[Dict[str, Any]]]:
-        message = self.make_message('F064', '3', [date_from.strftime('%Y/%m/%d/%H/%M/%S'), date_to.strftime('%Y/%m/%d/%H/%M/%S')])
-        self.return_error = ''
-
-        try:
-            response = await self.send_message(message)
-            if not response:
-                self.ok = False
-                return None
-
-            if self.debug:
-                print(response)
-
-            parsed_response = self._process_response(response, 'F064')
-            if parsed_response:
-                orders = []
-                for order in parsed_response['data']:
-                    order_data = order.split('$')
-                    orders.append({
-                        "ticket": int(order_data[0]),
-                        "instrument": order_data[1],
-                        "order_type": order_data[2],
-                        "magic_number": int(order_data[3]),
-                        "volume": float(order_data[4]),
-                        "open_price": float(order_data[5]),
-                        "open_time": int(order_data[6]),
-                        "stop_loss": float(order_data[7]),
-                        "take_profit": float(order_data[8]),
-                        "delete_price": float(order_data[9]),
-                        "delete_time": int(order_data[10]),
-                        "comment": order_data[11]
-                    })
-                return orders
-            return None
-        except Exception as error:
-            self.return_error = ERROR_DICT['00001']
-            self.ok = False
-            raise Exception(f"Failed to get all deleted pending orders within window: {error}")
+    async def get_all_deleted_pending_orders_within_window(self, date_from: Union[datetime, int], date_to: Union[datetime, int]) -> Optional[List[Dict[str, Any]]]:
+        return await self._execute(COMMANDS['get_all_deleted_pending_orders_within_window'], date_from, date_to)
 
     async def closeby_position_by_ticket(self, ticket: int, opposite_ticket: int) -> bool:
-        message = self.make_message('F074', '3', [str(ticket), str(opposite_ticket)])
-        self.return_error = ''
-
-        try:
-            response = await self.send_message(message)
-            if not response:
-                self.ok = False
-                return False
-
-            if self.debug:
-                print(response)
-
-            parsed_response = self._process_response(response, 'F074')
-            return parsed_response is not None
-        except Exception as error:
-            self.return_error = ERROR_DICT['00001']
-            self.ok = False
-            raise Exception(f"Failed to close position by opposite position: {error}")
+        return await self._execute(COMMANDS['closeby_position_by_ticket'], ticket, opposite_ticket)
 
     async def close_positions_async(self, instrument_name: str = '***', magic_number: int = -1) -> bool:
-        message = self.make_message('F091', '3', [instrument_name, str(magic_number)])
-        self.return_error = ''
-
-        try:
-            response = await self.send_message(message)
-            if not response:
-                self.ok = False
-                return False
-
-            if self.debug:
-                print(response)
-
-            parsed_response = self._process_response(response, 'F091')
-            return parsed_response is not None
-        except Exception as error:
-            self.return_error = ERROR_DICT['00001']
-            self.ok = False
-            raise Exception(f"Failed to close positions async: {error}")
+        return await self._execute(COMMANDS['close_positions_async'], instrument_name, magic_number)
 
     async def set_sl_and_tp_for_position(self, ticket: int, stop_loss: float, take_profit: float) -> bool:
-        message = self.make_message('F075', '4', [str(ticket), str(stop_loss), str(take_profit)])
-        self.return_error = ''
-
-        try:
-            response = await self.send_message(message)
-            if not response:
-                self.ok = False
-                return False
-
-            if self.debug:
-                print(response)
-
-            parsed_response = self._process_response(response, 'F075')
-            return parsed_response is not None
-        except Exception as error:
-            self.return_error = ERROR_DICT['00001']
-            self.ok = False
-            raise Exception(f"Failed to set SL and TP for position: {error}")
+        return await self._execute(COMMANDS['set_sl_and_tp_for_position'], ticket, stop_loss, take_profit)
 
     async def set_sl_and_tp_for_pending_order(self, ticket: int, stop_loss: float, take_profit: float) -> bool:
-        message = self.make_message('F076', '4', [str(ticket), str(stop_loss), str(take_profit)])
-        self.return_error = ''
-
-        try:
-            response = await self.send_message(message)
-            if not response:
-                self.ok = False
-                return False
-
-            if self.debug:
-                print(response)
-
-            parsed_response = self._process_response(response, 'F076')
-            return parsed_response is not None
-        except Exception as error:
-            self.return_error = ERROR_DICT['00001']
-            self.ok = False
-            raise Exception(f"Failed to set SL and TP for pending order: {error}")
+        return await self._execute(COMMANDS['set_sl_and_tp_for_pending_order'], ticket, stop_loss, take_profit)
 
     async def reset_sl_and_tp_for_position(self, ticket: int) -> bool:
-        message = self.make_message('F077', '2', [str(ticket)])
-        self.return_error = ''
-
-        try:
-            response = await self.send_message(message)
-            if not response:
-                self.ok = False
-                return False
-
-            if self.debug:
-                print(response)
-
-            parsed_response = self._process_response(response, 'F077')
-            return parsed_response is not None
-        except Exception as error:
-            self.return_error = ERROR_DICT['00001']
-            self.ok = False
-            raise Exception(f"Failed to reset SL and TP for position: {error}")
+        return await self._execute(COMMANDS['reset_sl_and_tp_for_position'], ticket)
 
     async def reset_sl_and_tp_for_pending_order(self, ticket: int) -> bool:
-        message = self.make_message('F078', '2', [str(ticket)])
-        self.return_error = ''
-
-        try:
-            response = await self.send_message(message)
-            if not response:
-                self.ok = False
-                return False
-
-            if self.debug:
-                print(response)
-
-            parsed_response = self._process_response(response, 'F078')
-            return parsed_response is not None
-        except Exception as error:
-            self.return_error = ERROR_DICT['00001']
-            self.ok = False
-            raise Exception(f"Failed to reset SL and TP for pending order: {error}")
+        return await self._execute(COMMANDS['reset_sl_and_tp_for_pending_order'], ticket)
 
     async def change_settings_for_pending_order(self, ticket: int, price: float, stop_loss: float, take_profit: float) -> bool:
-        message = self.make_message('F079', '5', [str(ticket), str(price), str(stop_loss), str(take_profit)])
-        self.return_error = ''
-
-        try:
-            response = await self.send_message(message)
-            if not response:
-                self.ok = False
-                return False
-
-            if self.debug:
-                print(response)
-
-            parsed_response = self._process_response(response, 'F079')
-            return parsed_response is not None
-        except Exception as error:
-            self.return_error = ERROR_DICT['00001']
-            self.ok = False
-            raise Exception(f"Failed to change settings for pending order: {error}")
+        return await self._execute(COMMANDS['change_settings_for_pending_order'], ticket, price, stop_loss, take_profit)
 
     async def set_global_variable(self, global_name: str, global_value: float) -> bool:
-        message = self.make_message('F080', '3', [global_name, str(global_value)])
-        self.return_error = ''
-
-        try:
-            response = await self.send_message(message)
-            if not response:
-                self.ok = False
-                return False
-
-            if self.debug:
-                print(response)
-
-            parsed_response = self._process_response(response, 'F080')
-            return parsed_response is not None
-        except Exception as error:
-            self.return_error = ERROR_DICT['00001']
-            self.ok = False
-            raise Exception(f"Failed to set global variable: {error}")
+        return await self._execute(COMMANDS['set_global_variable'], global_name, global_value)
 
     async def get_global_variable(self, global_name: str) -> Optional[float]:
-        message = self.make_message('F081', '2', [global_name])
-        self.return_error = ''
-
-        try:
-            response = await self.send_message(message)
-            if not response:
-                self.ok = False
-                return None
-
-            if self.debug:
-                print(response)
-
-            parsed_response = self._process_response(response, 'F081')
-            if parsed_response:
-                return float(parsed_response['data'][0])
-            return None
-        except Exception as error:
-            self.return_error = ERROR_DICT['00001']
-            self.ok = False
-            raise Exception(f"Failed to get global variable: {error}")
+        return await self._execute(COMMANDS['get_global_variable'], global_name)
 
     async def switch_auto_trading_on_off(self, on_off: bool) -> bool:
-        message = self.make_message('F084', '2', ['On' if on_off else 'Off'])
-        self.return_error = ''
-
-        try:
-            response = await self.send_message(message)
-            if not response:
-                self.ok = False
-                return False
-
-            if self.debug:
-                print(response)
-
-            parsed_response = self._process_response(response, 'F084')
-            return parsed_response is not None
-        except Exception as error:
-            self.return_error = ERROR_DICT['00001']
-            self.ok = False
-            raise Exception(f"Failed to switch auto trading on/off: {error}")
+        return await self._execute(COMMANDS['switch_auto_trading_on_off'], on_off)
@@ -0,0 +1,104 @@
+"""
+Encoding and decoding of EA protocol messages.
+
+These are the protocol hot paths. A compiled implementation is provided by the
+optional _codec extension (see build.py), which replaces the pure-Python functions
+below when it is available. Both implementations behave the same, `COMPILED`
+tells which one is in use.
+"""
+
+import re
+import warnings
+from typing import Dict, Iterable, List, Union
+import numpy as np
+from ..errors import BAD_MESSAGE
+from .utils import BadMessage
+
+RECORD_SEPARATOR = '$'
+
+# Whitespace skipped around fields by NumPy's parser, which reads a field holding only whitespace as -1
+FIELD_WHITESPACE = ' \t\n\v\f\r'
+_EMPTY_FIELD = re.compile(rf'(?:^|\$)[{FIELD_WHITESPACE}]*(?:\$|$)')
+
+
+def make_message(command: str, sub_command: str, parameters: Iterable[str]) -> str:
+    """
+    Builds a message in the format FXXX^Y^<parameters>.
+
+    :param command: The command identifier, e.g. 'F020'.
+    :param sub_command: The sub-command, e.g. '2'.
+    :param parameters: The parameters.
+    :return: The message.
+    """
+    return f"{command}^{sub_command}^{'^'.join(parameters)}"
+
+
+def parse_response_message(message: str) -> Dict[str, Union[str, List[str]]]:
+    """
+    Splits a message in the format FXXX^Y^<parameters> into its parts.
+
+    Trailing empty parameters are dropped.
+
+    :param message: The message.
+    :return: A dictionary with the command, sub_command and data.
+    :raises ValueError: If the message is malformed.
+    """
+    parts = message.split('^')
+    if len(parts) < 3:
+        raise ValueError("Invalid format. Expected at least three parts separated by '^'.")
+
+    end = len(parts)
+    while end > 2 and parts[end - 1] == '':
+        end -= 1
+    data = parts[2:end]
+    if '' in data:
+        raise ValueError("Invalid format. Hidden '^' delimiters detected in data.")
+    return {'command': parts[0], 'sub_command': parts[1], 'data': data}
+
+
+def split_records(data: List[str]) -> List[List[str]]:
+    """
+    Splits `$`-delimited records into their fields.
+
+    :param data: The records.
+    :return: The fields of each record.
+    """
+    return [record.split(RECORD_SEPARATOR) for record in data]
+
+
+def parse_record_matrix(records: List[str], fields: int) -> np.ndarray:
+    """
+    Parses numeric `$`-delimited records into a 2-D float64 array.
+
+    The records are joined and handed to NumPy's C parser at once instead of being
+    split and converted field by field in Python. Integers up to 2**53, such as
+    millisecond timestamps, are represented exactly.
+
+    :param records: The records, e.g. ['1700000000000$1.10002$1.10000$0.0$3', ...].
+    :param fields: The number of fields per record.
+    :return: An array of shape (len(records), fields).
+    :raises BadMessage: If a field is not a decimal number or an inf/nan spelling, surrounded by optional whitespace.
+    """
+    if not records:
+        return np.empty((0, fields), dtype=np.float64)
+    joined = RECORD_SEPARATOR.join(records)
+    with warnings.catch_warnings():
+        warnings.simplefilter('error', DeprecationWarning)
+        try:
+            values = np.fromstring(joined, dtype=np.float64, sep=RECORD_SEPARATOR)
+        except (DeprecationWarning, ValueError) as e:
+            raise BadMessage(f"{BAD_MESSAGE.msg()}: {e}") from None
+    # The joined records are parsed as one, so the fields of each record are counted separately
+    if values.size != len(records) * fields or any(record.count(RECORD_SEPARATOR) != fields - 1 for record in records):
+        raise BadMessage(f"{BAD_MESSAGE.msg()}: expected {fields} fields per record")
+    # Only searched for when a -1 was read, as the search costs more than the parsing
+    if (values == -1).any() and _EMPTY_FIELD.search(joined):
+        raise BadMessage(f"{BAD_MESSAGE.msg()}: empty field")
+    return values.reshape(len(records), fields)
+
+
+try:
+    from ._codec import make_message, parse_response_message, split_records, parse_record_matrix  # noqa: F811
+    COMPILED = True
+except ImportError:
+    COMPILED = False
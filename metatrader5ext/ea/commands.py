@@ -0,0 +1,341 @@
+import functools
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timezone
+from enum import Enum
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+import numpy as np
+from .codec import split_records
+from .records import LazyRecord, RecordLayout
+from .timestamps import epoch_ms
+from .parsers import TICK_DTYPE, RATE_DTYPE, POSITION_DTYPE, parse_ticks, parse_rates, parse_symbol_rates, parse_positions
+
+Encoder = Callable[[Any], str]
+Converter = Optional[Callable[[str], Any]]
+Decoder = Callable[[List[str], tuple], Any]
+
+# Encoded requests cached per command, see compile_byte_encoder()
+REQUEST_CACHE_SIZE = 128
+
+
+class ResponseKind(Enum):
+    """Response kind.
+
+    Includes 5 response kinds: STATUS, VALUE, RECORD, RECORDS and CUSTOM.
+
+    STATUS: True once the EA acknowledged the command.
+    VALUE: A single converted field of the reply.
+    RECORD: A dict built from the fields of the reply.
+    RECORDS: A list of dicts, one per `$`-delimited record of the reply.
+    CUSTOM: The result of the spec's own decoder.
+    """
+    STATUS = "status"
+    VALUE = "value"
+    RECORD = "record"
+    RECORDS = "records"
+    CUSTOM = "custom"
+
+    def to_str(self) -> str:
+        """Returns the string representation of the enum value."""
+        return self.value
+
+
+@dataclass(frozen=True)
+class CommandSpec:
+    """
+    Declarative description of an EA command.
+
+    The encoder and decoder are generated once, when the spec is created, so a call
+    only runs the precompiled functions.
+
+    Parameters:
+        description (str): What the command does, used in error messages ("Failed to <description>").
+        code (str): The command code, e.g. 'F020'.
+        sub_command (str): The sub-command, e.g. '2'.
+        params (Tuple): One entry per request parameter, either a literal string or an encoder applied to the next argument.
+        kind (ResponseKind): How the reply is decoded.
+        fields (Tuple): (name, converter) pairs of the reply fields for RECORD and RECORDS, a None converter keeps the raw string.
+        echo (Tuple): (name, argument index) pairs of arguments copied into each RECORD result, e.g. the instrument.
+        index (int): Index of the reply field returned by VALUE.
+        convert (Converter): Converter of the VALUE field.
+        decoder (Optional[Decoder]): Decoder of CUSTOM replies, called with the reply fields and the arguments.
+        array_decoder (Optional[Callable]): Decoder returning a NumPy structured array, used with as_array=True.
+        binary_dtype (Optional[np.dtype]): Record layout of the binary reply, if the command supports WireFormat.BINARY.
+        instrument_arg (Optional[int]): Index of the instrument (or list of instruments) argument, whose digits scale the prices of array replies in PriceMode.POINTS.
+        ttl (float): Seconds a reply may be served from the client's cache (EAClientConfig.cache_size), 0 never caches it.
+        mutating (bool): Whether the command changes state (orders, positions, settings), such requests are never coalesced.
+        default (Any): Result when the EA did not reply or replied with an error.
+
+    Besides encode and decode, encode_bytes returns the encoded request (see compile_byte_encoder()) and
+    lazy_decode decodes RECORD and RECORDS replies into LazyRecords.
+    """
+    description: str
+    code: str
+    sub_command: str
+    params: Tuple[Union[str, Encoder], ...] = ()
+    kind: ResponseKind = ResponseKind.STATUS
+    fields: Tuple[Tuple[str, Converter], ...] = ()
+    echo: Tuple[Tuple[str, int], ...] = ()
+    index: int = 0
+    convert: Converter = None
+    decoder: Optional[Decoder] = None
+    array_decoder: Optional[Callable[[List[str]], Any]] = None
+    binary_dtype: Optional[np.dtype] = None
+    instrument_arg: Optional[int] = None
+    ttl: float = 0.0
+    mutating: bool = False
+    default: Any = None
+    encode: Callable[[tuple], str] = field(init=False, repr=False, compare=False)
+    encode_bytes: Callable[..., bytes] = field(init=False, repr=False, compare=False)
+    decode: Decoder = field(init=False, repr=False, compare=False)
+    lazy_decode: Decoder = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, 'encode', compile_encoder(self.code, self.sub_command, self.params))
+        object.__setattr__(self, 'encode_bytes', compile_byte_encoder(self.code, self.sub_command, self.params))
+        object.__setattr__(self, 'decode', compile_decoder(self))
+        object.__setattr__(self, 'lazy_decode', compile_lazy_decoder(self.fields, self.echo, self.kind == ResponseKind.RECORDS)
+                           if self.kind in (ResponseKind.RECORD, ResponseKind.RECORDS) else self.decode)
+
+
+def _compile_params(params: Sequence[Union[str, Encoder]]) -> Optional[Callable[[tuple], str]]:
+    """ Builds the function joining the request parameters, None if the command has none. """
+    if not params:
+        return None
+    if all(encoder is str for encoder in params):
+        return lambda args: '^'.join(map(str, args))
+
+    steps = tuple((isinstance(param, str), param) for param in params)
+
+    def join(args: tuple) -> str:
+        values = iter(args)
+        return '^'.join([param if literal else param(next(values)) for literal, param in steps])
+    return join
+
+
+def compile_encoder(code: str, sub_command: str, params: Sequence[Union[str, Encoder]]) -> Callable[[tuple], str]:
+    """
+    Builds the function turning call arguments into a request, e.g. ('EURUSD',) -> 'F020^2^EURUSD'.
+
+    :param code: The command code.
+    :param sub_command: The sub-command.
+    :param params: Literal strings and per-argument encoders, in request order.
+    :return: The encoder.
+    """
+    prefix = f"{code}^{sub_command}^"
+    join = _compile_params(params)
+    if join is None:
+        return lambda args: prefix
+    return lambda args: prefix + join(args)
+
+
+def compile_byte_encoder(code: str, sub_command: str, params: Sequence[Union[str, Encoder]],
+                         cache_size: int = REQUEST_CACHE_SIZE) -> Callable[..., bytes]:
+    """
+    Builds the function turning call arguments into an encoded request, e.g. (('EURUSD',), 'B') -> b'F020^B2^EURUSD'.
+
+    The markers of optional protocol features (see binary.BINARY_SUB_COMMAND and
+    compression.COMPRESSION_SUB_COMMAND) are placed in front of the sub-command. The
+    prefix is encoded once per markers and encoding, and whole requests are kept in
+    an LRU cache keyed on the arguments and their types, so a repeated request, e.g.
+    polling 'F020^2^EURUSD', is returned without formatting or encoding. Requests
+    with unhashable arguments (e.g. instrument lists) bypass the cache.
+
+    :param code: The command code.
+    :param sub_command: The sub-command.
+    :param params: Literal strings and per-argument encoders, in request order.
+    :param cache_size: Number of encoded requests cached.
+    :return: The encoder, called with the arguments, the markers and the encoding.
+    """
+    join = _compile_params(params)
+    prefixes: Dict[Tuple[str, str], bytes] = {}
+
+    def encode(args: tuple, markers: str = '', encoding: str = 'utf-8') -> bytes:
+        prefix = prefixes.get((markers, encoding))
+        if prefix is None:
+            prefix = prefixes[(markers, encoding)] = f"{code}^{markers}{sub_command}^".encode(encoding)
+        return prefix if join is None else prefix + join(args).encode(encoding)
+
+    @functools.lru_cache(maxsize=cache_size)
+    def cached(args: tuple, types: tuple, markers: str, encoding: str) -> bytes:
+        return encode(args, markers, encoding)
+
+    def encode_bytes(args: tuple, markers: str = '', encoding: str = 'utf-8') -> bytes:
+        try:
+            return cached(args, tuple(map(type, args)), markers, encoding)
+        except TypeError:
+            return encode(args, markers, encoding)
+    encode_bytes.cache_info = cached.cache_info
+    return encode_bytes
+
+
+def _record_source(fields: Sequence[Tuple[str, Converter]], echo: Sequence[Tuple[str, int]], namespace: Dict[str, Any]) -> str:
+    items = [f"{name!r}: args[{index}]" for name, index in echo]
+    for position, (name, converter) in enumerate(fields):
+        value = f"r[{position}]"
+        if converter is not None:
+            namespace[f"_c{position}"] = converter
+            value = f"_c{position}({value})"
+        items.append(f"{name!r}: {value}")
+    return "{" + ", ".join(items) + "}"
+
+
+def compile_record_decoder(fields: Sequence[Tuple[str, Converter]], echo: Sequence[Tuple[str, int]] = (), records: bool = False) -> Decoder:
+    """
+    Generates the decoder of RECORD or RECORDS replies.
+
+    The dict display is generated as source, so decoding a record is a single
+    expression with the field names and converters bound as constants, rather than
+    a loop over the field table.
+
+    :param fields: (name, converter) pairs, in reply order.
+    :param echo: (name, argument index) pairs copied into each record.
+    :param records: Decodes a list of `$`-delimited records instead of a single record.
+    :return: The decoder, called with the reply fields and the call arguments.
+    """
+    namespace: Dict[str, Any] = {'split_records': split_records}
+    body = _record_source(fields, echo, namespace)
+    if records:
+        source = f"def decode(data, args):\n    return [{body} for r in split_records(data)]\n"
+    else:
+        source = f"def decode(r, args):\n    return {body}\n"
+    exec(source, namespace)
+    return namespace['decode']
+
+
+def compile_lazy_decoder(fields: Sequence[Tuple[str, Converter]], echo: Sequence[Tuple[str, int]] = (), records: bool = False) -> Decoder:
+    """
+    Builds the decoder of RECORD or RECORDS replies into LazyRecords, see compile_record_decoder().
+    """
+    layout = RecordLayout(fields, [name for name, _ in echo])
+    if records:
+        if echo:
+            return lambda data, args: [LazyRecord(layout, record, {name: args[index] for name, index in echo}) for record in data]
+        return lambda data, args: [LazyRecord(layout, record) for record in data]
+    return lambda data, args: LazyRecord(layout, data, {name: args[index] for name, index in echo})
+
+
+def compile_decoder(spec: CommandSpec) -> Decoder:
+    """ Generates the decoder of a spec according to its response kind. """
+    if spec.kind == ResponseKind.STATUS:
+        return lambda data, args: True
+    if spec.kind == ResponseKind.VALUE:
+        index, convert = spec.index, spec.convert or (lambda value: value)
+        return lambda data, args: convert(data[index])
+    if spec.kind in (ResponseKind.RECORD, ResponseKind.RECORDS):
+        return compile_record_decoder(spec.fields, spec.echo, spec.kind == ResponseKind.RECORDS)
+    if spec.decoder is None:
+        raise ValueError(f"Command {spec.code} has a custom response but no decoder.")
+    return spec.decoder
+
+
+def _server_time(data: List[str], args: tuple) -> Dict[str, int]:
+    # The server time is the broker's wall clock counted from the epoch, so it is broken down as UTC
+    dt = datetime.fromtimestamp(int(data[0]), timezone.utc)
+    return {"year": dt.year, "month": dt.month, "day": dt.day, "hour": dt.hour, "minute": dt.minute, "second": dt.second,
+            "timestamp": epoch_ms(data[0])}
+
+
+def _window_time(value: Union[datetime, int]) -> str:
+    if not isinstance(value, datetime):
+        value = datetime.fromtimestamp(value / 1000, timezone.utc)
+    return value.strftime('%Y/%m/%d/%H/%M/%S')
+
+
+POSITION_FIELDS = (
+    ("ticket", int), ("instrument", None), ("order_ticket", int), ("position_type", None), ("magic_number", int),
+    ("volume", float), ("open_price", float), ("open_time", epoch_ms), ("stop_loss", float), ("take_profit", float),
+)
+DELETED_ORDER_FIELDS = (
+    ("ticket", int), ("instrument", None), ("order_type", None), ("magic_number", int), ("volume", float),
+    ("open_price", float), ("open_time", epoch_ms), ("stop_loss", float), ("take_profit", float),
+    ("delete_price", float), ("delete_time", epoch_ms), ("comment", None),
+)
+BAR_FIELDS = (("date", epoch_ms), ("open", float), ("high", float), ("low", float), ("close", float), ("volume", int))
+
+
+def _status(description: str, code: str, sub_command: str, *params: Union[str, Encoder]) -> CommandSpec:
+    return CommandSpec(description, code, sub_command, params, ResponseKind.STATUS, default=False, mutating=True)
+
+
+COMMANDS: Dict[str, CommandSpec] = {spec_name: spec for spec_name, spec in (
+    ('check_connection', CommandSpec("check connection", 'F000', '1', default=False)),
+    ('get_static_account_info', CommandSpec("get static account info", 'F001', '1', kind=ResponseKind.RECORD, fields=(
+        ("name", None), ("login", None), ("currency", None), ("type", None), ("leverage", None), ("trade_allowed", None),
+        ("limit_orders", None), ("margin_call", None), ("margin_close", None), ("company", None)), ttl=300.0)),
+    ('get_dynamic_account_info', CommandSpec("get dynamic account info", 'F002', '1', kind=ResponseKind.RECORD, fields=(
+        ("balance", None), ("equity", None), ("profit", None), ("margin", None), ("margin_level", None), ("margin_free", None)))),
+    ('get_last_tick_info', CommandSpec("get last tick info", 'F020', '2', (str,), ResponseKind.RECORD, fields=(
+        ("date", epoch_ms), ("bid", float), ("ask", float), ("last", float), ("volume", int), ("spread", float),
+        ("date_in_ms", int)), echo=(("instrument", 0),))),
+    ('get_broker_server_time', CommandSpec("get broker server time", 'F005', '1', kind=ResponseKind.CUSTOM, decoder=_server_time)),
+    ('get_instrument_info', CommandSpec("get instrument info", 'F003', '2', (str,), ResponseKind.RECORD, fields=(
+        ("digits", int),  # SYMBOL_DIGITS (Integer)
+        ("max_lotsize", float),  # SYMBOL_VOLUME_MAX (Double)
+        ("min_lotsize", float),  # SYMBOL_VOLUME_MIN (Double)
+        ("lot_step", float),  # SYMBOL_VOLUME_STEP (Double)
+        ("point", float),  # SYMBOL_POINT (Double)
+        ("tick_size", float),  # SYMBOL_TRADE_TICK_SIZE (Double)
+        ("tick_value", float),  # SYMBOL_TRADE_TICK_VALUE (Double)
+        ("swap_long", float),  # SYMBOL_SWAP_LONG (Double)
+        ("swap_short", float),  # SYMBOL_SWAP_SHORT (Double)
+        ("stop_level", int),  # SYMBOL_TRADE_STOPS_LEVEL (Integer)
+        ("contract_size", float),  # SYMBOL_TRADE_CONTRACT_SIZE (Double)
+    ), echo=(("instrument", 0),), ttl=60.0)),
+    ('check_terminal_server_connection', CommandSpec("check terminal server connection", 'F011', '1', kind=ResponseKind.VALUE,
+                                                     convert=lambda value: value == '1', default=False)),
+    ('check_terminal_type', CommandSpec("check terminal type", 'F012', '1', kind=ResponseKind.VALUE,
+                                        convert=lambda value: 'MT4' if value == '1' else 'MT5', ttl=3600.0)),
+    ('check_license', CommandSpec("check license", 'F006', '1', kind=ResponseKind.VALUE, index=2, ttl=3600.0)),
+    ('check_trading_allowed', CommandSpec("check trading allowed", 'F008', '2', (str,), ResponseKind.VALUE, index=1,
+                                          convert=lambda value: value == 'OK', default=False)),
+    ('get_instruments', CommandSpec("get instruments", 'F007', '2', kind=ResponseKind.CUSTOM, decoder=lambda data, args: data[1:],
+                                    ttl=300.0)),
+    ('get_last_x_ticks_from_now', CommandSpec("get last x ticks", 'F021', '4', (str, str), ResponseKind.RECORDS, fields=(
+        ("date", epoch_ms), ("ask", float), ("bid", float), ("last", float), ("volume", int)), array_decoder=parse_ticks,
+        binary_dtype=TICK_DTYPE, instrument_arg=0)),
+    ('get_actual_bar_info', CommandSpec("get actual bar info", 'F041', '3', (str, str), ResponseKind.RECORD,
+                                        fields=BAR_FIELDS, echo=(("instrument", 0),))),
+    ('get_specific_bar', CommandSpec("get specific bar info", 'F045', '3', ('$'.join, str, str), ResponseKind.RECORDS,
+                                     fields=(("instrument", None),) + BAR_FIELDS, array_decoder=parse_symbol_rates,
+                                     instrument_arg=0)),
+    ('get_last_x_bars_from_now', CommandSpec("get last x bars", 'F042', '5', (str, str, '0', str), ResponseKind.RECORDS,
+                                             fields=BAR_FIELDS, array_decoder=parse_rates,
+                                             binary_dtype=RATE_DTYPE, instrument_arg=0)),
+    ('get_all_open_positions', CommandSpec("get all open positions", 'F061', '1', kind=ResponseKind.RECORDS, fields=POSITION_FIELDS + (
+        ("comment", None), ("profit", float), ("swap", float), ("commission", float)), array_decoder=parse_positions,
+        binary_dtype=POSITION_DTYPE)),
+    ('get_all_closed_positions', CommandSpec("get all closed positions", 'F063', '1', kind=ResponseKind.RECORDS, fields=POSITION_FIELDS + (
+        ("close_price", float), ("close_time", epoch_ms), ("comment", None), ("profit", float), ("swap", float), ("commission", float)))),
+    ('get_all_deleted_orders', CommandSpec("get all deleted orders", 'F065', '1', kind=ResponseKind.RECORDS, fields=DELETED_ORDER_FIELDS)),
+    ('open_order', CommandSpec("open order", 'F070', '9', (str,) * 10, ResponseKind.VALUE, convert=int, mutating=True)),
+    ('close_position_by_ticket', _status("close position by ticket", 'F071', '2', str)),
+    ('close_position_partial_by_ticket', _status("close position partially by ticket", 'F072', '3', str, str)),
+    ('delete_order_by_ticket', _status("delete order by ticket", 'F073', '2', str)),
+    ('get_all_pending_orders', CommandSpec("get all pending orders", 'F060', '1', kind=ResponseKind.RECORDS, fields=(
+        ("ticket", int), ("instrument", None), ("order_type", None), ("magic_number", int), ("volume", float),
+        ("open_price", float), ("stop_loss", float), ("take_profit", float), ("comment", None)))),
+    ('get_all_closed_positions_within_window', CommandSpec("get all closed positions within window", 'F062', '3', (_window_time, _window_time),
+                                                           ResponseKind.RECORDS, fields=(
+        ("ticket", int), ("instrument", None), ("order_type", None), ("magic_number", int), ("volume", float),
+        ("open_price", float), ("open_time", epoch_ms), ("stop_loss", float), ("take_profit", float), ("close_price", float),
+        ("close_time", epoch_ms), ("comment", None), ("profit", float), ("swap", float), ("commission", float)))),
+    ('get_all_deleted_pending_orders_within_window', CommandSpec("get all deleted pending orders within window", 'F064', '3',
+                                                                 (_window_time, _window_time), ResponseKind.RECORDS, fields=DELETED_ORDER_FIELDS)),
+    ('closeby_position_by_ticket', _status("close position by opposite position", 'F074', '3', str, str)),
+    ('close_positions_async', _status("close positions async", 'F091', '3', str, str)),
+    ('set_sl_and_tp_for_position', _status("set SL and TP for position", 'F075', '4', str, str, str)),
+    ('set_sl_and_tp_for_pending_order', _status("set SL and TP for pending order", 'F076', '4', str, str, str)),
+    ('reset_sl_and_tp_for_position', _status("reset SL and TP for position", 'F077', '2', str)),
+    ('reset_sl_and_tp_for_pending_order', _status("reset SL and TP for pending order", 'F078', '2', str)),
+    ('change_settings_for_pending_order', _status("change settings for pending order", 'F079', '5', str, str, str, str)),
+    ('set_global_variable', _status("set global variable", 'F080', '3', str, str)),
+    ('get_global_variable', CommandSpec("get global variable", 'F081', '2', (str,), ResponseKind.VALUE, convert=float)),
+    ('switch_auto_trading_on_off', _status("switch auto trading on/off", 'F084', '2', lambda on_off: 'On' if on_off else 'Off')),
+)}
+
+# Paged forms of F021 and F042 taking the offset of the newest record before the count,
+# used by EAClient.iter_ticks() and EAClient.iter_bars() with EAs offering history.PAGED_CAPABILITY
+HISTORY_PAGES: Dict[str, CommandSpec] = {
+    'iter_ticks': replace(COMMANDS['get_last_x_ticks_from_now'], description="get tick history page", params=(str, str, str)),
+    'iter_bars': replace(COMMANDS['get_last_x_bars_from_now'], description="get bar history page", params=(str, str, str, str)),
+}
@@ -0,0 +1,90 @@
+"""
+zlib compression of large EA replies.
+
+Text history and position replies are highly repetitive and shrink several times
+under zlib, which pays off on slow links (remote terminals, Docker bridges).
+
+Compression is negotiated with the connection check: a client that supports it
+sends 'F000^1^ZLIB' and an EA that supports it lists 'ZLIB' in its reply. The
+client then marks requests whose replies may be large with a 'Z' in front of the
+sub-command, e.g. 'F063^Z1^', and the EA compresses the reply if it is at least
+its compression threshold long. A compressed reply is 'Z^' followed by a zlib
+stream, other replies are sent as usual. Replies never start with 'Z', so both
+can be told apart without state.
+"""
+
+import zlib
+from ..errors import BAD_LENGTH, BAD_MESSAGE
+from .utils import BadMessage
+
+COMPRESSION_CAPABILITY = 'ZLIB'
+COMPRESSION_SUB_COMMAND = 'Z'
+COMPRESSED_PREFIX = b'Z^'
+COMPRESSION_THRESHOLD = 4096
+
+
+def compress_reply(payload: bytes, threshold: int = COMPRESSION_THRESHOLD, level: int = 6) -> bytes:
+    """
+    Compresses a reply if it is large enough, the reference for EA implementations.
+
+    :param payload: The reply.
+    :param threshold: Smallest reply compressed, in bytes.
+    :param level: The zlib compression level.
+    :return: The compressed reply, or the reply itself if it is shorter than the threshold.
+    """
+    if len(payload) < threshold:
+        return payload
+    return COMPRESSED_PREFIX + zlib.compress(payload, level)
+
+
+class Inflater:
+    """
+    Incremental decompressor of a compressed reply.
+
+    Chunks are decompressed as they arrive from the socket, so decompression
+    overlaps with the transfer, and the decompressed size is bounded while
+    decompressing rather than after it.
+
+    Attributes:
+        max_length (int): Largest accepted decompressed reply, in bytes.
+    """
+    max_length: int
+
+    def __init__(self, max_length: int) -> None:
+        self.max_length = max_length
+        self._decompressor = zlib.decompressobj()
+        self._output = bytearray()
+
+    def feed(self, data: bytes) -> None:
+        """ Decompresses the next chunk of the zlib stream. """
+        try:
+            self._output += self._decompressor.decompress(data, self.max_length - len(self._output) + 1)
+        except zlib.error as error:
+            raise BadMessage(f"{BAD_MESSAGE.msg()}: {error}")
+        if len(self._output) > self.max_length:
+            raise BadMessage(f"{BAD_LENGTH.msg()}: decompressed message exceeds {self.max_length} bytes")
+
+    def finish(self) -> bytes:
+        """
+        Completes decompression once the whole zlib stream was fed.
+
+        :return: The decompressed reply.
+        """
+        if not self._decompressor.eof:
+            raise BadMessage(f"{BAD_MESSAGE.msg()}: truncated compressed message")
+        return bytes(self._output)
+
+
+def decompress_reply(payload: bytes, max_length: int) -> bytes:
+    """
+    Decompresses a complete reply if it is compressed.
+
+    :param payload: The reply.
+    :param max_length: Largest accepted decompressed reply, in bytes.
+    :return: The decompressed reply, or the reply itself if it is not compressed.
+    """
+    if not payload.startswith(COMPRESSED_PREFIX):
+        return payload
+    inflater = Inflater(max_length)
+    inflater.feed(memoryview(payload)[len(COMPRESSED_PREFIX):])
+    return inflater.finish()
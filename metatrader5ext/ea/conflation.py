@@ -0,0 +1,223 @@
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set
+from .symbols import SYMBOLS
+from .timestamps import epoch_ms
+
+TICK_COMMAND = 'F020'
+TICK_SUB_COMMAND = '6'
+
+
+@dataclass
+class StreamTick:
+    """
+    Class describing a streamed tick, see GetLatestTick in stream-handlers.mqh.
+
+    Parameters
+    ----------
+    symbol: str
+        The instrument, the default symbol of the stream if the EA did not send one.
+    time: int
+        Tick time in milliseconds since epoch, converted from the seconds sent by the EA (see timestamps.epoch_ms).
+    sym_id: int
+        ID of the instrument in the symbol registry (symbols.SYMBOLS).
+    """
+    symbol: str
+    time: int
+    bid: float
+    ask: float
+    last: float
+    volume: int
+    sym_id: int = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.sym_id = SYMBOLS.intern(self.symbol)
+
+
+def stream_tick_symbol(message: str, default_symbol: str = '') -> Optional[str]:
+    """
+    Returns the instrument of a stream tick message without parsing the rest of it.
+
+    Both layouts are accepted, 'F020^6^time^bid^ask^last^volume' as sent by the EA for
+    its chart symbol, and 'F020^6^SYMBOL^time^bid^ask^last^volume'.
+
+    :param message: The stream message.
+    :param default_symbol: The instrument of ticks without an instrument field.
+    :return: The instrument, or None if the message is not a tick.
+    """
+    parts = message.split('^', 3)
+    if len(parts) < 4 or parts[0] != TICK_COMMAND or parts[1] != TICK_SUB_COMMAND:
+        return None
+    if parts[2] and not parts[2][0].isdigit():
+        return parts[2]
+    return default_symbol
+
+
+def parse_stream_tick(message: str, default_symbol: str = '') -> Optional[StreamTick]:
+    """
+    Parses a stream tick message, see stream_tick_symbol() for the accepted layouts.
+
+    :param message: The stream message.
+    :param default_symbol: The instrument of ticks without an instrument field.
+    :return: The tick, or None if the message is not a well-formed tick.
+    """
+    parts = message.split('^')
+    if len(parts) < 7 or parts[0] != TICK_COMMAND or parts[1] != TICK_SUB_COMMAND:
+        return None
+    if len(parts) >= 8:
+        symbol, fields = parts[2], parts[3:8]
+    else:
+        symbol, fields = default_symbol, parts[2:7]
+    try:
+        return StreamTick(symbol, epoch_ms(fields[0]), float(fields[1]), float(fields[2]), float(fields[3]), int(fields[4]))
+    except ValueError:
+        return None
+
+
+class ConflatingSubscriber:
+    """
+    Keeps only the latest tick per symbol of a stream.
+
+    The stream reader calls update() for every message, which only finds the
+    symbol and overwrites its slot in a table of max_symbols slots, assigned to
+    symbol IDs (see symbols.SYMBOLS) as their first tick arrives. Consumers call wait() to get the symbols that changed since
+    their last read and latest() to get their ticks, which are parsed once per read
+    rather than once per received tick. Under a tick burst the work of the consumer
+    thus scales with the number of symbols, not with the number of ticks.
+    wait_ids() and latest_id() do the same with symbol IDs.
+
+    Attributes:
+        max_symbols (int): Maximum number of symbols held.
+        default_symbol (str): The instrument of ticks without an instrument field.
+        updates (int): Number of ticks stored.
+        conflated (int): Number of ticks overwritten before being read.
+        skipped (int): Number of messages ignored, because they were not ticks or the table was full.
+    """
+    max_symbols: int
+    default_symbol: str
+    updates: int
+    conflated: int
+    skipped: int
+
+    def __init__(self, max_symbols: int = 256, default_symbol: str = '') -> None:
+        if max_symbols < 1:
+            raise ValueError("max_symbols must be at least 1.")
+        self.max_symbols = max_symbols
+        self.default_symbol = default_symbol
+        self.updates = 0
+        self.conflated = 0
+        self.skipped = 0
+        self._count = 0
+        self._slots: Dict[int, int] = {}
+        self._sym_ids: List[int] = [0] * max_symbols
+        self._messages: List[Optional[str]] = [None] * max_symbols
+        self._ticks: List[Optional[StreamTick]] = [None] * max_symbols
+        self._changed: Set[int] = set()
+        self._closed = False
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+
+    def __len__(self) -> int:
+        """ Returns the number of symbols holding a tick. """
+        return self._count
+
+    def update(self, message: str) -> bool:
+        """
+        Stores a stream message as the latest tick of its symbol.
+
+        :param message: The stream message.
+        :return: True if the message was stored, False if it was skipped.
+        """
+        symbol = stream_tick_symbol(message, self.default_symbol)
+        with self._lock:
+            if symbol is None or self._closed:
+                self.skipped += 1
+                return False
+            sym_id = SYMBOLS.id(symbol)
+            slot = None if sym_id is None else self._slots.get(sym_id)
+            if slot is None:
+                if self._count >= self.max_symbols:
+                    self.skipped += 1
+                    return False
+                if sym_id is None:
+                    sym_id = SYMBOLS.intern(symbol)
+                slot = self._slots[sym_id] = self._count
+                self._sym_ids[slot] = sym_id
+                self._count += 1
+            if slot in self._changed:
+                self.conflated += 1
+            else:
+                self._changed.add(slot)
+            self._messages[slot] = message
+            self._ticks[slot] = None
+            self.updates += 1
+            self._wakeup.notify()
+            return True
+
+    def wait(self, timeout: Optional[float] = None) -> Set[str]:
+        """
+        Waits for ticks and returns the symbols that changed since the last call.
+
+        :param timeout: Maximum seconds to wait, None waits forever.
+        :return: The changed symbols, empty on timeout or once the subscriber is closed.
+        """
+        return {SYMBOLS.name(sym_id) for sym_id in self.wait_ids(timeout)}
+
+    def wait_ids(self, timeout: Optional[float] = None) -> Set[int]:
+        """ Same as wait(), returning symbol IDs. """
+        with self._wakeup:
+            self._wakeup.wait_for(lambda: self._closed or self._changed, timeout)
+            changed, self._changed = self._changed, set()
+            return {self._sym_ids[slot] for slot in changed}
+
+    def latest(self, symbol: str) -> Optional[StreamTick]:
+        """
+        Returns the latest tick of a symbol.
+
+        :param symbol: The instrument.
+        :return: The tick, or None if no tick was received for the symbol.
+        """
+        sym_id = SYMBOLS.id(symbol)
+        return None if sym_id is None else self.latest_id(sym_id)
+
+    def latest_id(self, sym_id: int) -> Optional[StreamTick]:
+        """ Same as latest(), by symbol ID. """
+        with self._lock:
+            slot = self._slots.get(sym_id)
+            return None if slot is None else self._latest_slot(slot)
+
+    def _latest_slot(self, slot: int) -> Optional[StreamTick]:
+        """ Internal method parsing the tick of a slot once, the lock must be held. """
+        tick = self._ticks[slot]
+        if tick is None:
+            tick = self._ticks[slot] = parse_stream_tick(self._messages[slot], self.default_symbol)
+        return tick
+
+    def snapshot(self, symbols: Optional[Set[str]] = None) -> Dict[str, StreamTick]:
+        """
+        Returns the latest ticks of the given symbols, of every symbol by default.
+
+        The ticks are read under the lock, so they are consistent with each other.
+        Malformed ticks are left out.
+        """
+        ticks = {}
+        with self._lock:
+            if symbols is None:
+                slots = range(self._count)
+            else:
+                slots = [self._slots[sym_id] for sym_id in map(SYMBOLS.id, symbols) if sym_id in self._slots]
+            for slot in slots:
+                tick = self._latest_slot(slot)
+                if tick is not None:
+                    ticks[SYMBOLS.name(self._sym_ids[slot])] = tick
+        return ticks
+
+    def close(self) -> None:
+        """ Closes the subscriber, waking up every waiting consumer. """
+        with self._lock:
+            self._closed = True
+            self._wakeup.notify_all()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
@@ -1,7 +1,18 @@
 import socket
 import threading
 import asyncio
-from typing import Optional, Callable, List, Dict, Union
+import inspect
+from typing import Optional, Callable, List, Dict, Set, Union, AsyncIterator, Awaitable, Hashable
+from ..common import MAX_MSG_LEN
+from . import codec
+from .compression import decompress_reply
+from .framing import Framing, FramedReader, StreamDecoder, MESSAGE_TERMINATOR, encode_frame
+from .multiplex import MultiplexedConnection
+from .pool import ConnectionPool
+from .stream_queue import OverflowPolicy, QueueClosed, StreamQueue
+from .conflation import ConflatingSubscriber
+from .batching import tick_columns
+from .utils import BadMessage
 
 class Connection:
     """
@@ -16,6 +27,19 @@ class Connection:
         encoding (str): The encoding used for message communication.
         stream_callback (Optional[Callable[[str], None]]): The callback function for streaming data.
         debug (bool): Enables debug mode for logging messages.
+        keep_alive (bool): Returns REST sockets to the pool after each request instead of closing them.
+        pool (ConnectionPool): The pool of REST sockets used by send_message.
+        framing (Framing): How message boundaries are marked on the wire.
+        terminator (bytes): The message terminator used with Framing.TERMINATOR.
+        max_message_length (int): Largest accepted message, in bytes.
+        stream_buffer_limit (int): Size of the asyncio stream reader buffer before reading is paused.
+        multiplexer (Optional[MultiplexedConnection]): Single-socket pipelined transport, used instead of the pool when multiplexing is enabled.
+        stream_queue (Optional[StreamQueue]): Bounded queue between the stream reader and the callback, None to call the callback inline.
+        stream_subscriber (Optional[ConflatingSubscriber]): Latest tick per symbol, used instead of the queue when stream conflation is enabled.
+        stream_reconnect (bool): Reopens the stream socket when it drops or stalls.
+        stream_idle_timeout (float): Seconds without stream data after which the socket is considered stalled, 0 disables the check.
+        stream_subscriptions (Set[str]): Instruments subscribed on the stream socket, restored on reconnect.
+        stream_reconnects (int): Number of times the stream socket was reopened.
     """
     host: str
     rest_port: int
@@ -25,8 +49,29 @@ class Connection:
     encoding: str
     stream_callback: Optional[Callable[[str], None]]
     debug: bool
+    keep_alive: bool
+    pool: ConnectionPool
+    framing: Framing
+    terminator: bytes
+    max_message_length: int
+    stream_buffer_limit: int
+    multiplexer: Optional[MultiplexedConnection]
+    stream_queue: Optional[StreamQueue]
+    stream_subscriber: Optional[ConflatingSubscriber]
+    stream_reconnect: bool
+    stream_idle_timeout: float
+    stream_subscriptions: Set[str]
+    stream_reconnects: int
 
-    def __init__(self, host: str = '127.0.0.1', rest_port: int = 15556, stream_port: int = 15557, encoding: str = 'utf-8', debug: bool = False) -> None:
+    def __init__(self, host: str = '127.0.0.1', rest_port: int = 15556, stream_port: int = 15557, encoding: str = 'utf-8', debug: bool = False,
+                 keep_alive: bool = True, pool_size: int = 4, pool_idle_timeout: float = 30.0, connect_timeout: float = 5.0,
+                 framing: Framing = Framing.NONE, terminator: bytes = MESSAGE_TERMINATOR, max_message_length: int = MAX_MSG_LEN,
+                 stream_buffer_limit: int = 2 ** 16, multiplex: bool = False, max_in_flight: int = 64,
+                 stream_queue_size: int = 0, stream_overflow_policy: OverflowPolicy = OverflowPolicy.BLOCK,
+                 stream_conflate_key: Optional[Callable[[str], Hashable]] = None, stream_conflation_slots: int = 0,
+                 stream_symbol: str = '', stream_batch_size: int = 0, stream_batch_interval: float = 0.0,
+                 stream_batch_columns: bool = False, stream_reconnect: bool = True, stream_reconnect_delay: float = 0.5,
+                 stream_reconnect_max_delay: float = 30.0, stream_idle_timeout: float = 0.0) -> None:
         self.host = host
         self.rest_port = rest_port
         self.stream_port = stream_port
@@ -35,6 +80,34 @@ class Connection:
         self.encoding = encoding
         self.stream_callback = None
         self.debug = debug
+        self.keep_alive = keep_alive
+        self.pool = ConnectionPool(host, rest_port, pool_size, pool_idle_timeout, connect_timeout, debug)
+        self.framing = framing
+        self.terminator = terminator
+        self.max_message_length = max_message_length
+        self.stream_buffer_limit = stream_buffer_limit
+        self._stream_task: Optional[asyncio.Task] = None
+        self.multiplexer = None
+        if multiplex:
+            self.multiplexer = MultiplexedConnection(host, rest_port, framing, terminator, max_message_length, max_in_flight, connect_timeout, debug)
+        self.stream_queue_size = stream_queue_size
+        self.stream_overflow_policy = stream_overflow_policy
+        self.stream_conflate_key = stream_conflate_key
+        self.stream_queue = None
+        self.stream_conflation_slots = stream_conflation_slots
+        self.stream_symbol = stream_symbol
+        self.stream_subscriber = None
+        self.stream_batch_size = stream_batch_size
+        self.stream_batch_interval = stream_batch_interval
+        self.stream_batch_columns = stream_batch_columns
+        self.connect_timeout = connect_timeout
+        self.stream_reconnect = stream_reconnect
+        self.stream_reconnect_delay = stream_reconnect_delay
+        self.stream_reconnect_max_delay = stream_reconnect_max_delay
+        self.stream_idle_timeout = stream_idle_timeout
+        self.stream_subscriptions = set()
+        self.stream_reconnects = 0
+        self._stream_stopped: Optional[threading.Event] = None
 
     def make_message(self, command: str, sub_command: str, parameters: List[str]) -> str:
         """
@@ -46,11 +119,7 @@ class Connection:
         :return: A formatted message string.
         """
         try:
-            # Join the parameters with the '^' delimiter
-            params_str = '^'.join(parameters)
-            
-            # Construct the message in the required format
-            message = f"{command}^{sub_command}^{params_str}"
+            message = codec.make_message(command, sub_command, parameters)
 
             if self.debug:
                 print(f"Constructed message: {message}")
@@ -71,38 +140,7 @@ class Connection:
         :return: A dictionary containing the command, sub_command, and data.
         """
         try:
-            # Split the response or message by the '^' delimiter
-            parts = response_message.split('^')
-            
-            # Ensure the response or message has at least three parts
-            if len(parts) < 3:
-                raise ValueError("Invalid format. Expected at least three parts separated by '^'.")
-            
-            # Extract the command and sub-command
-            command = parts[0]
-            sub_command = parts[1]
-            
-            # Extract the data (all remaining parts)
-            data = parts[2:]
-            
-            # Find the index of the last non-empty data element
-            last_non_empty_index = len(data) - 1
-            while last_non_empty_index >= 0 and data[last_non_empty_index] == '':
-                last_non_empty_index -= 1
-            
-            # Slice the data list up to the last non-empty index
-            data = data[:last_non_empty_index + 1]
-            
-            # Check for hidden '^' delimiters in data (empty strings in the middle)
-            if '' in data:
-                raise ValueError("Invalid format. Hidden '^' delimiters detected in data.")
-            
-            # Return the parsed components as a dictionary
-            response = {
-                'command': command,
-                'sub_command': sub_command,
-                'data': data
-            }
+            response = codec.parse_response_message(response_message)
             if self.debug:
                 print(f"Parsed response: {response}")
                 
@@ -121,53 +159,378 @@ class Connection:
         :param message: The message to send.
         :return: The server's response as a decoded string.
         """
+        return await self.send_encoded(message.encode(self.encoding))
+
+    async def send_encoded(self, payload: bytes) -> str:
+        """
+        Sends an already encoded request command/message to the server and returns the decoded response.
+
+        :param payload: The encoded message, e.g. from CommandSpec.encode_bytes.
+        :return: The server's response as a decoded string, or "Error: ..." if the exchange failed.
+        """
         try:
-            reader, writer = await asyncio.open_connection(self.host, self.rest_port)
-            writer.write(message.encode(self.encoding))
-            await writer.drain()
-            response = await reader.read(1024)
-            writer.close()
-            await writer.wait_closed()
+            response = await self._exchange(payload)
             if self.debug:
-                print(f"Sent: {message}, Received: {response.decode(self.encoding)}")
+                print(f"Sent: {payload.decode(self.encoding)}, Received: {response.decode(self.encoding)}")
             return response.decode(self.encoding)
         except Exception as e:
             if self.debug:
                 print(f"Error: {e}")
             return f"Error: {e}"
 
+    async def send_raw_message(self, message: Union[str, bytes]) -> bytes:
+        """
+        Sends a request command/message to the server and returns the undecoded response, e.g. a binary reply.
+
+        Unlike send_message(), transport errors are raised.
+
+        :param message: The message to send, or the encoded message.
+        :return: The server's response bytes.
+        """
+        payload = message if isinstance(message, bytes) else message.encode(self.encoding)
+        response = await self._exchange(payload)
+        if self.debug:
+            print(f"Sent: {payload.decode(self.encoding)}, Received: {len(response)} bytes")
+        return response
+
+    async def _exchange(self, payload: bytes) -> bytes:
+        """
+        Writes a request on a pooled socket and reads the complete reply.
+
+        The reply is read according to the configured framing, so replies larger
+        than a single socket read are returned whole. A reused socket may have been closed by the EA while idle. In that case the
+        request is retried once on a freshly opened socket. Compressed replies are
+        decompressed.
+
+        :param payload: The encoded request, without framing.
+        :return: The raw response bytes, without framing.
+        """
+        if self.multiplexer is not None:
+            return decompress_reply(await self.multiplexer.request(payload), self.max_message_length)
+
+        frame = encode_frame(payload, self.framing, self.terminator)
+        while True:
+            conn = await self.pool.acquire()
+            reused = conn.uses > 0
+            if conn.framer is None:
+                conn.framer = FramedReader(self.framing, self.terminator, self.max_message_length)
+            try:
+                conn.writer.write(frame)
+                await conn.writer.drain()
+                response = await conn.framer.read_message(conn.reader)
+            except (ConnectionError, OSError):
+                self.pool.release(conn, reuse=False)
+                if reused:
+                    continue
+                raise
+            except BaseException:
+                self.pool.release(conn, reuse=False)
+                raise
+
+            if not response and reused:
+                self.pool.release(conn, reuse=False)
+                continue
+
+            conn.uses += 1
+            self.pool.release(conn, reuse=self.keep_alive and bool(response))
+            return decompress_reply(response, self.max_message_length)
+
+    async def close(self) -> None:
+        """ Closes the pooled REST sockets and the multiplexed socket, if any. """
+        await self.pool.close()
+        if self.multiplexer is not None:
+            await self.multiplexer.close()
+
     def start_stream(self, callback: Optional[Callable[[str], None]] = None) -> None:
         """
         Connects to the streaming server and continuously listens for updates.
 
+        With a stream queue size set, messages are handed to the callback by a
+        separate dispatcher thread through a bounded StreamQueue, so a slow callback
+        never stalls the socket reader.
+
+        With stream conflation slots set, only the latest tick per symbol is kept
+        (see ConflatingSubscriber) and the callback is instead called with a dict of
+        {symbol: StreamTick} holding the symbols that changed since its previous call.
+
+        With a stream batch size set, the callback is called once per batch of up to
+        that many messages rather than once per message. A batch holds the messages
+        decoded from one read, or with a stream queue, the messages queued within
+        the stream batch interval. Batches are lists of messages, or dicts of columns
+        (see tick_columns) when stream_batch_columns is set.
+
+        The connection is supervised: when the socket drops, the server closes it
+        or nothing arrives within the stream idle timeout, it is reopened with
+        exponential backoff and the subscriptions (see subscribe_stream) are sent
+        again, until stop_stream() is called.
+
         :param callback: Optional callback function to handle incoming stream data.
         """
         self.stream_callback = callback
         try:
-            self.stream_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self.stream_socket.connect((self.host, self.stream_port))
+            self.stream_socket = self._connect_stream()
             self.running = True
-            threading.Thread(target=self._listen_stream, daemon=True).start()
+            self._stream_stopped = threading.Event()
+            if self.stream_conflation_slots > 0:
+                self.stream_subscriber = ConflatingSubscriber(self.stream_conflation_slots, self.stream_symbol)
+                threading.Thread(target=self._dispatch_conflated, args=(self.stream_subscriber,), daemon=True).start()
+            elif self.stream_queue_size > 0:
+                self.stream_queue = StreamQueue(self.stream_queue_size, self.stream_overflow_policy, self.stream_conflate_key)
+                threading.Thread(target=self._dispatch_stream, args=(self.stream_queue,), daemon=True).start()
+            threading.Thread(target=self._listen_stream, args=(self._stream_stopped,), daemon=True).start()
         except Exception as e:
             print(f"Streaming connection error: {e}")
 
-    def _listen_stream(self) -> None:
-        """ Internal method to listen for streaming data. """
+    def _subscription_frame(self, symbol: str) -> bytes:
+        return encode_frame(self.make_message('F020', '2', [symbol]).encode(self.encoding), self.framing, self.terminator)
+
+    def _connect_stream(self) -> socket.socket:
+        """ Internal method opening the stream socket and sending the subscriptions. """
+        sock = socket.create_connection((self.host, self.stream_port), self.connect_timeout)
+        try:
+            sock.settimeout(self.stream_idle_timeout or None)
+            for symbol in sorted(self.stream_subscriptions):
+                sock.sendall(self._subscription_frame(symbol))
+        except BaseException:
+            sock.close()
+            raise
+        return sock
+
+    def subscribe_stream(self, symbols: List[str]) -> None:
+        """
+        Subscribes the stream to instruments.
+
+        Subscriptions are sent as 'F020^2^SYMBOL' messages on the stream socket and
+        sent again after every reconnect.
+
+        :param symbols: The instruments.
+        """
+        new = [symbol for symbol in symbols if symbol not in self.stream_subscriptions]
+        self.stream_subscriptions.update(new)
+        if self.running and self.stream_socket is not None:
+            try:
+                for symbol in new:
+                    self.stream_socket.sendall(self._subscription_frame(symbol))
+            except OSError as e:
+                # The listener reconnects and sends every subscription again
+                if self.debug:
+                    print(f"Stream subscription error: {e}")
+
+    def unsubscribe_stream(self, symbols: List[str]) -> None:
+        """
+        Removes instruments from the subscriptions restored on reconnect.
+
+        :param symbols: The instruments.
+        """
+        self.stream_subscriptions.difference_update(symbols)
+
+    def _read_stream(self, sock: socket.socket, decoder: StreamDecoder, sink: Optional[Callable[[str], object]], batch_size: int) -> int:
+        """
+        Internal method handing messages to the sink until the server closes the socket.
+
+        Errors of the sink are reported per message and do not stop the stream.
+
+        :return: The number of bytes received.
+        """
+        received = 0
+        while True:
+            # With Framing.NONE the last message is held back until the next one starts or the stream goes quiet
+            nbytes = None
+            final = decoder.idle(sock)
+            if not final:
+                nbytes = decoder.recv(sock)
+                final = not nbytes
+                received += nbytes
+            if batch_size > 0:
+                batch = list(decoder.messages(final))
+                for start in range(0, len(batch), batch_size):
+                    try:
+                        self._deliver_batch(batch[start:start + batch_size])
+                    except Exception as e:
+                        print(f"Stream callback error: {e}")
+            else:
+                for message in decoder.messages(final):
+                    if self.debug:
+                        print(f"Stream Update: {message}")
+                    if sink:
+                        try:
+                            sink(message)
+                        except Exception as e:
+                            print(f"Stream callback error: {e}")
+            if nbytes == 0:
+                return received
+
+    def _listen_stream(self, stopped: threading.Event) -> None:
+        """
+        Internal method to listen for streaming data.
+
+        Reads into a reusable buffer and only hands whole messages to the callback,
+        however the messages were split or batched by the socket. Reconnects the
+        socket until `stopped` is set, also after data that cannot be decoded.
+        """
+        handoff = self.stream_subscriber if self.stream_subscriber is not None else self.stream_queue
+        if handoff is not None:
+            sink = handoff.update if handoff is self.stream_subscriber else handoff.put
+        else:
+            sink = self.stream_callback
+        batch_size = self.stream_batch_size if handoff is None else 0
+        delay = self.stream_reconnect_delay
+        sock = self.stream_socket
         try:
-            while self.running:
-                data = self.stream_socket.recv(1024)
-                if data:
-                    decoded_data = data.decode(self.encoding)
+            while not stopped.is_set():
+                decoder = StreamDecoder(self.framing, self.terminator, self.max_message_length, self.encoding)
+                try:
+                    if self._read_stream(sock, decoder, sink, batch_size):
+                        delay = self.stream_reconnect_delay
+                    reason = "Stream closed by server"
+                except socket.timeout:
+                    reason = f"No stream data within {self.stream_idle_timeout}s"
+                except OSError as e:
+                    reason = f"Streaming error: {e}"
+                except (BadMessage, UnicodeDecodeError) as e:
+                    # The position of the next message is unknown, so the stream starts again on a new socket
+                    reason = f"Bad stream data: {e}"
+                sock.close()
+                if stopped.is_set():
+                    break
+                if not self.stream_reconnect:
                     if self.debug:
-                        print(f"Stream Update: {decoded_data}")
-                    if self.stream_callback:
-                        self.stream_callback(decoded_data)
+                        print(reason)
+                    break
+
+                if self.debug:
+                    print(f"{reason}, reconnecting")
+                sock = None
+                while sock is None and not stopped.wait(delay):
+                    delay = min(delay * 2, self.stream_reconnect_max_delay)
+                    try:
+                        sock = self._connect_stream()
+                    except OSError as e:
+                        if self.debug:
+                            print(f"Stream reconnect failed: {e}")
+                if sock is None:
+                    break
+                if stopped.is_set():
+                    sock.close()
+                    break
+                self.stream_socket = sock
+                self.stream_reconnects += 1
+                if self.debug:
+                    print(f"Stream reconnected ({self.stream_reconnects})")
         except Exception as e:
             print(f"Streaming error: {e}")
+        finally:
+            if self._stream_stopped is stopped:
+                self.running = False
+            if handoff is not None:
+                handoff.close()
+
+    def _deliver_batch(self, messages: List[str]) -> None:
+        """ Internal method handing a batch of stream messages to the callback. """
+        if self.debug:
+            print(f"Stream Batch: {len(messages)} messages")
+        if self.stream_callback and messages:
+            self.stream_callback(tick_columns(messages, self.stream_symbol) if self.stream_batch_columns else messages)
+
+    def _dispatch_stream(self, queue: StreamQueue) -> None:
+        """ Internal method handing queued stream messages to the callback. """
+        while True:
+            if self.stream_batch_size > 0:
+                try:
+                    self._deliver_batch(queue.get_many(self.stream_batch_size, linger=self.stream_batch_interval))
+                except QueueClosed:
+                    return
+                except Exception as e:
+                    print(f"Stream callback error: {e}")
+                continue
+            try:
+                message = queue.get()
+            except QueueClosed:
+                return
+            if self.stream_callback:
+                try:
+                    self.stream_callback(message)
+                except Exception as e:
+                    print(f"Stream callback error: {e}")
+
+    def _dispatch_conflated(self, subscriber: ConflatingSubscriber) -> None:
+        """ Internal method handing the latest ticks of changed symbols to the callback. """
+        while True:
+            changed = subscriber.wait()
+            if not changed:
+                if subscriber.closed:
+                    return
+                continue
+            if self.stream_callback:
+                try:
+                    self.stream_callback(subscriber.snapshot(changed))
+                except Exception as e:
+                    print(f"Stream callback error: {e}")
+
+    async def stream(self) -> AsyncIterator[str]:
+        """
+        Connects to the streaming server and yields every message on the running event loop.
+
+        Usage:
+            async for message in client.stream():
+                ...
+
+        The socket is only read when the consumer asks for the next message, so a slow
+        consumer applies backpressure to the server through the reader buffer
+        (see stream_buffer_limit) instead of queuing messages in memory.
+
+        :return: An async iterator over decoded stream messages.
+        """
+        reader, writer = await asyncio.open_connection(self.host, self.stream_port, limit=self.stream_buffer_limit)
+        framer = FramedReader(self.framing, self.terminator, self.max_message_length, self.stream_buffer_limit)
+        self.running = True
+        try:
+            async for frame in framer.iter_messages(reader):
+                if not self.running:
+                    break
+                message = frame.decode(self.encoding)
+                if self.debug:
+                    print(f"Stream Update: {message}")
+                yield message
+        finally:
+            self.running = False
+            writer.close()
+
+    def start_stream_async(self, callback: Callable[[str], Union[None, Awaitable[None]]]) -> asyncio.Task:
+        """
+        Consumes the stream in a task on the running event loop.
+
+        :param callback: Function or coroutine function called with each stream message. Coroutines are awaited before the next message is read.
+        :return: The streaming task.
+        """
+        self.stream_callback = callback
+
+        async def consume() -> None:
+            try:
+                async for message in self.stream():
+                    result = callback(message)
+                    if inspect.isawaitable(result):
+                        await result
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Streaming error: {e}")
+
+        self._stream_task = asyncio.get_running_loop().create_task(consume())
+        return self._stream_task
 
     def stop_stream(self) -> None:
         """ Stops the streaming connection. """
         self.running = False
+        if self._stream_stopped is not None:
+            self._stream_stopped.set()
         if self.stream_socket:
             self.stream_socket.close()
+        if self.stream_queue is not None:
+            self.stream_queue.close()
+        if self.stream_subscriber is not None:
+            self.stream_subscriber.close()
+        if self._stream_task is not None and not self._stream_task.done():
+            self._stream_task.get_loop().call_soon_threadsafe(self._stream_task.cancel)
+        self._stream_task = None
 
@@ -0,0 +1,92 @@
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, List, Sequence, Tuple
+
+# Longest request the EA reads in one go, instrument lists are split to stay below it
+MAX_REQUEST_LENGTH = 4096
+
+
+@dataclass
+class BatchResult:
+    """
+    Combined result of a batch request.
+
+    Parameters
+    ----------
+    columns: Dict[str, List[Any]]
+        The records of the successful items as equally long columns.
+    errors: Dict[Hashable, str]
+        The error of each failed item, e.g. keyed by instrument.
+    """
+    columns: Dict[str, List[Any]] = field(default_factory=dict)
+    errors: Dict[Hashable, str] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        """ Returns the number of records. """
+        return len(next(iter(self.columns.values()), ()))
+
+
+async def fan_out(call: Callable[[Any], Awaitable[Any]], items: Iterable[Hashable], limit: int) -> Tuple[Dict[Hashable, Any], Dict[Hashable, str]]:
+    """
+    Awaits call(item) for every item with at most `limit` calls in flight.
+
+    A failing item does not affect the others: exceptions and None results (the
+    EA replied with an error) are captured per item.
+
+    :param call: The coroutine function, e.g. EAClient.get_last_tick_info.
+    :param items: The items, e.g. instruments.
+    :param limit: Maximum number of concurrent calls.
+    :return: The results and the errors, both keyed by item, results in item order.
+    """
+    if limit < 1:
+        raise ValueError("limit must be at least 1.")
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run(item: Hashable) -> Any:
+        async with semaphore:
+            return await call(item)
+
+    items = list(items)
+    outcomes = await asyncio.gather(*(run(item) for item in items), return_exceptions=True)
+    results, errors = {}, {}
+    for item, outcome in zip(items, outcomes):
+        if isinstance(outcome, BaseException):
+            if not isinstance(outcome, Exception):
+                raise outcome
+            errors[item] = str(outcome)
+        elif outcome is None:
+            errors[item] = "No reply or error reply from the EA"
+        else:
+            results[item] = outcome
+    return results, errors
+
+
+def to_columns(records: Iterable[Dict[str, Any]]) -> Dict[str, List[Any]]:
+    """ Turns records with the same keys into a dict of columns. """
+    columns: Dict[str, List[Any]] = {}
+    for record in records:
+        if not columns:
+            columns = {key: [] for key in record}
+        for key, column in columns.items():
+            column.append(record[key])
+    return columns
+
+
+def chunk_instruments(instruments: Sequence[str], max_length: int = MAX_REQUEST_LENGTH - 64) -> List[List[str]]:
+    """
+    Splits instruments into lists whose `$`-joined form fits in a request.
+
+    :param instruments: The instruments.
+    :param max_length: Longest joined list, leaving room for the rest of the request.
+    :return: The chunks, in order.
+    """
+    chunks, chunk, length = [], [], 0
+    for instrument in instruments:
+        if chunk and length + 1 + len(instrument) > max_length:
+            chunks.append(chunk)
+            chunk, length = [], 0
+        length += len(instrument) + (1 if chunk else 0)
+        chunk.append(instrument)
+    if chunk:
+        chunks.append(chunk)
+    return chunks
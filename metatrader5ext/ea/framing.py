@@ -0,0 +1,350 @@
+import asyncio
+import re
+import select
+import socket
+from enum import Enum
+from typing import AsyncIterator, Iterator, Optional
+from ..common import MAX_MSG_LEN
+from ..errors import BAD_LENGTH, BAD_MESSAGE
+from .compression import COMPRESSED_PREFIX, Inflater
+from .utils import BadMessage
+
+MESSAGE_TERMINATOR = b"\r\n"
+LENGTH_PREFIX_SIZE = 4
+
+# Start of an EA message, a command code such as 'F020^', where unframed stream messages are split
+MESSAGE_START = re.compile(rb"F\d{3}\^")
+MESSAGE_START_SIZE = 5
+
+# Seconds to wait for the rest of the last message of an unframed stream before handing it out
+STREAM_FLUSH_DELAY = 0.002
+
+
+class Framing(Enum):
+    """Framing type.
+
+    Includes 3 framing types: NONE, TERMINATOR and LENGTH_PREFIX.
+
+    NONE: No framing, a REST reply is complete once the EA closes the socket (one request per socket) and
+          stream messages are split where the next message starts.
+    TERMINATOR: Every message ends with a terminator sequence (MESSAGE_TERMINATOR by default).
+    LENGTH_PREFIX: Every message is preceded by its length as a 4 byte big-endian unsigned integer.
+    """
+    NONE = "none"
+    TERMINATOR = "terminator"
+    LENGTH_PREFIX = "length_prefix"
+
+    def to_str(self) -> str:
+        """Returns the string representation of the enum value."""
+        return self.value
+
+
+def encode_frame(payload: bytes, framing: Framing, terminator: bytes = MESSAGE_TERMINATOR) -> bytes:
+    """
+    Wraps an encoded message in the given framing.
+
+    :param payload: The encoded message.
+    :param framing: The framing to apply.
+    :param terminator: The terminator used by Framing.TERMINATOR.
+    :return: The framed message.
+    """
+    if framing == Framing.TERMINATOR:
+        return payload + terminator
+    if framing == Framing.LENGTH_PREFIX:
+        return len(payload).to_bytes(LENGTH_PREFIX_SIZE, 'big') + payload
+    return payload
+
+
+class FrameBuffer:
+    """
+    Reusable, growable receive buffer that splits framed messages.
+
+    Bytes are written at the tail (see writable()/commit() or feed()), complete
+    messages are taken from the head with next_frame(). A partial message stays in
+    the buffer until the rest of it arrives. Frames are returned as memoryviews into
+    the buffer and are only valid until the next write.
+
+    Attributes:
+        framing (Framing): The framing used to find message boundaries.
+        terminator (bytes): The terminator used by Framing.TERMINATOR.
+        max_length (int): Largest accepted message, in bytes.
+    """
+    framing: Framing
+    terminator: bytes
+    max_length: int
+
+    def __init__(self, framing: Framing, terminator: bytes = MESSAGE_TERMINATOR, max_length: int = MAX_MSG_LEN, initial_size: int = 4096) -> None:
+        self.framing = framing
+        self.terminator = terminator
+        self.max_length = max_length
+        self._buffer = bytearray(initial_size)
+        self._start = 0
+        self._end = 0
+        self._scan = 0
+
+    def __len__(self) -> int:
+        """ Returns the number of buffered bytes not yet returned as a frame. """
+        return self._end - self._start
+
+    @property
+    def capacity(self) -> int:
+        return len(self._buffer)
+
+    def writable(self, min_free: int = 1) -> memoryview:
+        """
+        Returns the free tail of the buffer, compacting or growing it to hold at least `min_free` bytes.
+
+        :param min_free: The minimum number of free bytes required.
+        :return: A writable memoryview over the free tail.
+        """
+        if len(self._buffer) - self._end < min_free:
+            pending = self._end - self._start
+            if len(self._buffer) - pending >= min_free and self._start:
+                # Move the partial message to the front, in place
+                self._buffer[0:pending] = self._buffer[self._start:self._end]
+            else:
+                # Grow into a new buffer so that frames handed out earlier stay valid
+                size = len(self._buffer)
+                while size - pending < min_free:
+                    size *= 2
+                buffer = bytearray(size)
+                buffer[0:pending] = self._buffer[self._start:self._end]
+                self._buffer = buffer
+            self._scan -= self._start
+            self._start = 0
+            self._end = pending
+        return memoryview(self._buffer)[self._end:]
+
+    def commit(self, nbytes: int) -> None:
+        """ Marks `nbytes` written into the view returned by writable() as received. """
+        self._end += nbytes
+
+    def feed(self, data: bytes) -> None:
+        """ Appends received bytes to the buffer. """
+        size = len(data)
+        self.writable(size)[:size] = data
+        self._end += size
+
+    def next_frame(self) -> Optional[memoryview]:
+        """
+        Takes the next complete message from the buffer.
+
+        :return: The message payload without framing, or None if no complete message is buffered.
+        """
+        if self.framing == Framing.TERMINATOR:
+            index = self._buffer.find(self.terminator, self._scan, self._end)
+            if index < 0:
+                if self._end - self._start > self.max_length + len(self.terminator):
+                    raise BadMessage(f"{BAD_LENGTH.msg()}: no terminator within {self.max_length} bytes")
+                self._scan = max(self._start, self._end - len(self.terminator) + 1)
+                return None
+            frame = memoryview(self._buffer)[self._start:index]
+            self._start = index + len(self.terminator)
+        elif self.framing == Framing.LENGTH_PREFIX:
+            if self._end - self._start < LENGTH_PREFIX_SIZE:
+                return None
+            length = int.from_bytes(self._buffer[self._start:self._start + LENGTH_PREFIX_SIZE], 'big')
+            if length > self.max_length:
+                raise BadMessage(f"{BAD_LENGTH.msg()}: {length} exceeds {self.max_length} bytes")
+            begin = self._start + LENGTH_PREFIX_SIZE
+            if self._end - begin < length:
+                return None
+            frame = memoryview(self._buffer)[begin:begin + length]
+            self._start = begin + length
+        else:
+            if self._end - self._start > self.max_length:
+                raise BadMessage(f"{BAD_LENGTH.msg()}: message exceeds {self.max_length} bytes")
+            return None
+
+        self._scan = self._start
+        if self._start == self._end:
+            self._start = self._end = self._scan = 0
+        return frame
+
+    def next_message(self) -> Optional[memoryview]:
+        """
+        Takes the next message of an unframed stream, which ends where the next message starts.
+
+        The last buffered message is kept, as its tail may still be in flight, see flush().
+
+        :return: The message, or None if no message is followed by the start of another one.
+        """
+        match = MESSAGE_START.search(self._buffer, max(self._start + 1, self._scan), self._end)
+        if match is None:
+            if self._end - self._start > self.max_length:
+                raise BadMessage(f"{BAD_LENGTH.msg()}: message exceeds {self.max_length} bytes")
+            self._scan = max(self._start + 1, self._end - MESSAGE_START_SIZE + 1)
+            return None
+        frame = memoryview(self._buffer)[self._start:match.start()]
+        self._start = self._scan = match.start()
+        return frame
+
+    def startswith(self, prefix: bytes) -> bool:
+        """ Returns whether the buffered bytes start with `prefix`. """
+        return self._buffer.startswith(prefix, self._start, self._end)
+
+    def flush(self) -> memoryview:
+        """ Takes every buffered byte, used when the peer closes the socket. """
+        frame = memoryview(self._buffer)[self._start:self._end]
+        self._start = self._end = self._scan = 0
+        return frame
+
+
+class FramedReader:
+    """
+    Reads complete messages from an asyncio.StreamReader.
+
+    Bytes past the end of a message are kept for the next read, so a single reader
+    must be used per socket.
+    """
+    def __init__(self, framing: Framing, terminator: bytes = MESSAGE_TERMINATOR, max_length: int = MAX_MSG_LEN, chunk_size: int = 65536) -> None:
+        self.buffer = FrameBuffer(framing, terminator, max_length)
+        self.chunk_size = chunk_size
+
+    async def read_message(self, reader: asyncio.StreamReader) -> bytes:
+        """
+        Reads one complete message.
+
+        With Framing.NONE the message ends when the peer closes the socket, and a
+        compressed message is decompressed while it is being received.
+
+        :param reader: The stream to read from.
+        :return: The message payload, or b'' if the socket was closed before any byte arrived.
+        """
+        inflater = None
+        while True:
+            frame = self.buffer.next_frame()
+            if frame is not None:
+                return bytes(frame)
+
+            chunk = await reader.read(self.chunk_size)
+            if inflater is not None:
+                if not chunk:
+                    return inflater.finish()
+                inflater.feed(chunk)
+                continue
+            if not chunk:
+                if self.buffer.framing == Framing.NONE or not len(self.buffer):
+                    return bytes(self.buffer.flush())
+                raise BadMessage(f"{BAD_MESSAGE.msg()}: connection closed mid-message")
+            self.buffer.feed(chunk)
+            if self.buffer.framing == Framing.NONE and len(self.buffer) >= len(COMPRESSED_PREFIX) and self.buffer.startswith(COMPRESSED_PREFIX):
+                inflater = Inflater(self.buffer.max_length)
+                inflater.feed(self.buffer.flush()[len(COMPRESSED_PREFIX):])
+
+    async def iter_messages(self, reader: asyncio.StreamReader) -> AsyncIterator[bytes]:
+        """
+        Yields messages from a long-lived stream until the peer closes it.
+
+        Nothing is read from the socket while the consumer is busy with a message, so
+        a slow consumer fills the reader's buffer, which pauses the transport and
+        pushes back on the sender. With Framing.NONE messages are split where the next
+        one starts, and the last one is yielded once nothing follows it within
+        STREAM_FLUSH_DELAY.
+
+        :param reader: The stream to read from.
+        """
+        unframed = self.buffer.framing == Framing.NONE
+        next_frame = self.buffer.next_message if unframed else self.buffer.next_frame
+        while True:
+            if unframed and len(self.buffer):
+                try:
+                    chunk = await asyncio.wait_for(reader.read(self.chunk_size), STREAM_FLUSH_DELAY)
+                except asyncio.TimeoutError:
+                    yield bytes(self.buffer.flush())
+                    continue
+            else:
+                chunk = await reader.read(self.chunk_size)
+            if not chunk:
+                if unframed and len(self.buffer):
+                    yield bytes(self.buffer.flush())
+                return
+            self.buffer.feed(chunk)
+            while True:
+                frame = next_frame()
+                if frame is None:
+                    break
+                yield bytes(frame)
+
+
+class StreamDecoder:
+    """
+    Decodes framed messages from a blocking stream socket.
+
+    Bytes are received with recv_into straight into a preallocated FrameBuffer and
+    complete messages are sliced out of it without intermediate copies. A message
+    split across reads is carried over until its tail arrives, so consumers only
+    ever see whole messages.
+
+    With Framing.NONE messages are split where the next message starts (see
+    MESSAGE_START). The last buffered message is held back until more bytes arrive,
+    or until idle() finds that nothing followed it within `flush_delay`.
+
+    Attributes:
+        buffer (FrameBuffer): The receive buffer.
+        encoding (str): The encoding used to decode messages.
+        recv_size (int): Maximum number of bytes requested per read.
+        flush_delay (float): Seconds to wait for the rest of the last message with Framing.NONE.
+    """
+    buffer: FrameBuffer
+    encoding: str
+    recv_size: int
+    flush_delay: float
+
+    def __init__(self, framing: Framing, terminator: bytes = MESSAGE_TERMINATOR, max_length: int = MAX_MSG_LEN, encoding: str = 'utf-8',
+                 recv_size: int = 65536, flush_delay: float = STREAM_FLUSH_DELAY) -> None:
+        self.buffer = FrameBuffer(framing, terminator, max_length, initial_size=recv_size * 2)
+        self.encoding = encoding
+        self.recv_size = recv_size
+        self.flush_delay = flush_delay
+
+    def recv(self, sock: socket.socket) -> int:
+        """
+        Receives the next chunk of bytes from the socket into the buffer.
+
+        :param sock: The socket to read from.
+        :return: The number of bytes received, 0 once the peer closed the socket.
+        """
+        nbytes = sock.recv_into(self.buffer.writable(self.recv_size), self.recv_size)
+        self.buffer.commit(nbytes)
+        return nbytes
+
+    def idle(self, sock: socket.socket) -> bool:
+        """
+        Returns whether the message held back with Framing.NONE is complete, i.e. no bytes followed it within flush_delay.
+
+        :param sock: The socket to wait on.
+        """
+        if self.buffer.framing != Framing.NONE or not len(self.buffer):
+            return False
+        readable, _, _ = select.select([sock], [], [], self.flush_delay)
+        return not readable
+
+    def frames(self, final: bool = False) -> Iterator[memoryview]:
+        """
+        Yields every complete message currently buffered, as views into the buffer.
+
+        The views are only valid until the next call to recv().
+
+        :param final: Also yields the message held back with Framing.NONE, e.g. after idle() or once the peer closed the socket.
+        """
+        if self.buffer.framing == Framing.NONE:
+            while True:
+                frame = self.buffer.next_message()
+                if frame is None:
+                    break
+                yield frame
+            if final and len(self.buffer):
+                yield self.buffer.flush()
+            return
+        while True:
+            frame = self.buffer.next_frame()
+            if frame is None:
+                return
+            yield frame
+
+    def messages(self, final: bool = False) -> Iterator[str]:
+        """ Yields every complete message currently buffered, decoded, see frames(). """
+        encoding = self.encoding
+        for frame in self.frames(final):
+            yield str(frame, encoding)
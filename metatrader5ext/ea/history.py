@@ -0,0 +1,102 @@
+import asyncio
+from collections import deque
+from typing import AsyncIterator, Awaitable, Callable, Deque, List, Tuple
+import numpy as np
+
+# Records per history page, about 0.5 MB of text for ticks
+HISTORY_CHUNK_SIZE = 10_000
+
+# Pages requested ahead of the one being consumed
+HISTORY_PREFETCH = 2
+
+# The shipped EA always sends the newest records of F021 and F042, EAs offering this
+# capability also serve requests marked with PAGED_SUB_COMMAND, whose start parameter
+# is the offset of the newest record returned
+PAGED_CAPABILITY = 'PAGED'
+PAGED_SUB_COMMAND = 'P'
+
+
+def history_pages(count: int, chunk_size: int) -> List[Tuple[int, int]]:
+    """
+    Splits the last `count` records into pages, oldest first.
+
+    :param count: Number of records, counted back from the newest one.
+    :param chunk_size: Maximum records per page.
+    :return: (start, count) of each page, start being the offset of its newest record from the newest record.
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1.")
+    pages = []
+    remaining = count
+    while remaining > 0:
+        size = min(chunk_size, remaining)
+        remaining -= size
+        pages.append((remaining, size))
+    return pages
+
+
+def trim_overlap(page: np.ndarray, previous: np.ndarray, key: str = 'time') -> np.ndarray:
+    """
+    Drops the leading records of a page that repeat the trailing records of the previous page.
+
+    Offsets are counted from the newest record, so records arriving while paging
+    shift later pages back by as many records, which are then returned twice.
+    Only records not newer than the last record of the previous page are compared.
+
+    :param page: The page, oldest first.
+    :param previous: The previous page, oldest first.
+    :param key: The time field, e.g. 'time_msc'.
+    :return: A view of the new records.
+    """
+    if not len(previous):
+        return page
+    limit = int(np.searchsorted(page[key], previous[key][-1], side='right'))
+    for overlap in np.flatnonzero(page[:limit] == previous[-1])[::-1] + 1:
+        if overlap <= len(previous) and np.array_equal(page[:overlap], previous[-overlap:]):
+            return page[overlap:]
+    return page
+
+
+def to_polars(page: np.ndarray):
+    """ Converts a page into a polars DataFrame with one column per field. """
+    import polars as pl
+
+    return pl.DataFrame(page)
+
+
+async def page_history(fetch: Callable[[int, int], Awaitable[np.ndarray]], count: int, chunk_size: int = HISTORY_CHUNK_SIZE,
+                       key: str = 'time', prefetch: int = HISTORY_PREFETCH) -> AsyncIterator[np.ndarray]:
+    """
+    Yields the last `count` records in pages, oldest first.
+
+    Up to `prefetch` pages are requested ahead of the page being consumed, so the
+    EA sends the next pages while the current one is decoded and processed, and at
+    most prefetch + 1 pages are held at any time. Pending requests are cancelled
+    when the consumer stops early.
+
+    :param fetch: Coroutine function fetching a page given its start and count, see history_pages().
+    :param count: Number of records.
+    :param chunk_size: Maximum records per page.
+    :param key: The time field used to find records returned twice, see trim_overlap().
+    :param prefetch: Number of pages requested ahead.
+    :return: The non-empty pages, oldest first.
+    """
+    pages = deque(history_pages(count, chunk_size))
+    in_flight: Deque[asyncio.Future] = deque()
+    previous = None
+    try:
+        while pages or in_flight:
+            while pages and len(in_flight) <= prefetch:
+                in_flight.append(asyncio.ensure_future(fetch(*pages.popleft())))
+            page = await in_flight.popleft()
+            if previous is not None:
+                page = trim_overlap(page, previous, key)
+            if not len(page):
+                continue
+            previous = page
+            yield page
+    finally:
+        for task in in_flight:
+            if task.done() and not task.cancelled():
+                task.exception()
+            task.cancel()
@@ -1,6 +1,7 @@
 # To store types 
 from dataclasses import dataclass
 from typing import Literal, Optional
+from .symbols import SYMBOLS
 from ..common import UNSET_DOUBLE  # TODO: remove ibapi dependency
 
 
@@ -14,6 +15,8 @@ class Symbol:
     ----------
     symbol: str
         Unique Symbol registered in Exchange.
+    sym_id: int
+        ID of the symbol in the symbol registry (symbols.SYMBOLS), assigned from `symbol` if not given.
 
     """
     sec_type: Literal[
@@ -24,6 +27,10 @@ class Symbol:
     symbol: str = ""
     broker: str = ""
 
+    def __post_init__(self) -> None:
+        if self.symbol and not self.sym_id:
+            self.sym_id = SYMBOLS.intern(self.symbol)
+
 @dataclass
 class SymbolInfo:
     """
@@ -0,0 +1,168 @@
+import asyncio
+import itertools
+from typing import Dict, Optional
+from ..common import MAX_MSG_LEN
+from ..errors import BAD_MESSAGE
+from .framing import Framing, FramedReader, MESSAGE_TERMINATOR, encode_frame
+from .utils import BadMessage
+
+CORRELATION_SEPARATOR = b"|"
+
+
+def tag_message(correlation_id: int, payload: bytes) -> bytes:
+    """
+    Prefixes an encoded message with its correlation ID, e.g. b'17|F020^2^EURUSD'.
+
+    :param correlation_id: The ID echoed back by the server in the reply.
+    :param payload: The encoded message.
+    :return: The tagged message.
+    """
+    return str(correlation_id).encode() + CORRELATION_SEPARATOR + payload
+
+
+def untag_message(message: bytes) -> tuple:
+    """
+    Splits a tagged message into its correlation ID and payload.
+
+    :param message: The tagged message.
+    :return: A tuple (correlation_id, payload).
+    """
+    tag, separator, payload = message.partition(CORRELATION_SEPARATOR)
+    if not separator or not tag.isdigit():
+        raise BadMessage(f"{BAD_MESSAGE.msg()}: missing correlation ID")
+    return int(tag), payload
+
+
+class MultiplexedConnection:
+    """
+    Keeps many REST requests in flight on a single long-lived EA socket.
+
+    Each request is tagged with a correlation ID (see tag_message) and the server
+    echoes the tag in its reply, so replies may arrive in any order. A background
+    task reads replies and resolves the future of the matching request. Requires a
+    framing other than Framing.NONE.
+
+    Attributes:
+        host (str): The server host address.
+        port (int): The REST port of the server.
+        framing (Framing): How message boundaries are marked on the wire.
+        max_in_flight (int): Maximum number of requests awaiting a reply.
+        connect_timeout (float): Seconds to wait for the socket to connect.
+    """
+    host: str
+    port: int
+    framing: Framing
+    max_in_flight: int
+    connect_timeout: float
+    debug: bool
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 15556, framing: Framing = Framing.TERMINATOR, terminator: bytes = MESSAGE_TERMINATOR,
+                 max_length: int = MAX_MSG_LEN, max_in_flight: int = 64, connect_timeout: float = 5.0, debug: bool = False) -> None:
+        if framing == Framing.NONE:
+            raise ValueError("Multiplexing requires message framing, Framing.NONE is not supported.")
+        self.host = host
+        self.port = port
+        self.framing = framing
+        self.terminator = terminator
+        self.max_length = max_length
+        self.max_in_flight = max_in_flight
+        self.connect_timeout = connect_timeout
+        self.debug = debug
+
+        self._ids = itertools.count(1)
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._reader_task: Optional[asyncio.Task] = None
+        self._connect_lock: Optional[asyncio.Lock] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def in_flight(self) -> int:
+        """ Returns the number of requests awaiting a reply. """
+        return len(self._pending)
+
+    def _bind_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        if loop is self._loop:
+            return
+        if self._writer is not None:
+            try:
+                self._writer.transport.abort()
+            except Exception:
+                pass
+        self._writer = None
+        self._reader_task = None
+        self._pending.clear()
+        self._connect_lock = asyncio.Lock()
+        self._semaphore = asyncio.Semaphore(self.max_in_flight)
+        self._loop = loop
+
+    async def _ensure_connected(self) -> asyncio.StreamWriter:
+        async with self._connect_lock:
+            if self._writer is None or self._writer.is_closing():
+                reader, writer = await asyncio.wait_for(
+                    asyncio.open_connection(self.host, self.port), self.connect_timeout
+                )
+                self._writer = writer
+                self._reader_task = asyncio.get_running_loop().create_task(self._read_replies(reader, writer))
+                if self.debug:
+                    print(f"Multiplexed connection opened to {self.host}:{self.port}")
+            return self._writer
+
+    async def _read_replies(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """ Dispatches replies to the futures of their requests until the socket closes. """
+        framer = FramedReader(self.framing, self.terminator, self.max_length)
+        error: Exception = ConnectionError("Multiplexed connection closed by server")
+        try:
+            async for frame in framer.iter_messages(reader):
+                correlation_id, payload = untag_message(frame)
+                future = self._pending.pop(correlation_id, None)
+                if future is not None and not future.done():
+                    future.set_result(payload)
+                elif self.debug:
+                    print(f"Dropped reply for unknown correlation ID {correlation_id}")
+        except asyncio.CancelledError:
+            error = ConnectionError("Multiplexed connection closed")
+            raise
+        except Exception as e:
+            error = e
+        finally:
+            if self._writer is writer:
+                self._writer = None
+            writer.close()
+            pending, self._pending = self._pending, {}
+            for future in pending.values():
+                if not future.done():
+                    future.set_exception(error)
+
+    async def request(self, payload: bytes) -> bytes:
+        """
+        Sends a request and waits for its reply.
+
+        :param payload: The encoded request, without framing or correlation ID.
+        :return: The reply payload, without framing or correlation ID.
+        """
+        self._bind_loop()
+        async with self._semaphore:
+            writer = await self._ensure_connected()
+            correlation_id = next(self._ids)
+            future = asyncio.get_running_loop().create_future()
+            self._pending[correlation_id] = future
+            try:
+                writer.write(encode_frame(tag_message(correlation_id, payload), self.framing, self.terminator))
+                await writer.drain()
+                return await future
+            finally:
+                self._pending.pop(correlation_id, None)
+
+    async def close(self) -> None:
+        """ Closes the socket and fails every request still in flight. """
+        task, self._reader_task = self._reader_task, None
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass
+        self._writer = None
@@ -0,0 +1,113 @@
+from typing import List
+import numpy as np
+from .codec import RECORD_SEPARATOR, parse_record_matrix
+from .symbols import SYMBOLS
+
+# Same layout as the arrays returned by MetaTrader5.copy_ticks_from / copy_ticks_range
+TICK_DTYPE = np.dtype([
+    ('time', '<i8'),
+    ('bid', '<f8'),
+    ('ask', '<f8'),
+    ('last', '<f8'),
+    ('volume', '<u8'),
+    ('time_msc', '<i8'),
+    ('flags', '<u4'),
+    ('volume_real', '<f8'),
+])
+
+# Same layout as the arrays returned by MetaTrader5.copy_rates_from / copy_rates_from_pos
+RATE_DTYPE = np.dtype([
+    ('time', '<i8'),
+    ('open', '<f8'),
+    ('high', '<f8'),
+    ('low', '<f8'),
+    ('close', '<f8'),
+    ('tick_volume', '<u8'),
+    ('spread', '<i4'),
+    ('real_volume', '<u8'),
+])
+
+# RATE_DTYPE prefixed with the instrument and its ID in symbols.SYMBOLS, for replies covering several instruments (F045)
+SYMBOL_RATE_DTYPE = np.dtype([('symbol', '<U32'), ('sym_id', '<i4')] + RATE_DTYPE.descr)
+
+# Open positions (F061), named like the fields of MetaTrader5.positions_get, text fields as fixed-width ASCII
+POSITION_DTYPE = np.dtype([
+    ('ticket', '<i8'),
+    ('symbol', 'S32'),
+    ('identifier', '<i8'),
+    ('type', 'S16'),
+    ('magic', '<i8'),
+    ('volume', '<f8'),
+    ('price_open', '<f8'),
+    ('time', '<i8'),
+    ('sl', '<f8'),
+    ('tp', '<f8'),
+    ('comment', 'S32'),
+    ('profit', '<f8'),
+    ('swap', '<f8'),
+    ('commission', '<f8'),
+])
+
+
+def parse_ticks(records: List[str]) -> np.ndarray:
+    """
+    Parses F021 tick records 'time$ask$bid$last$volume' into a TICK_DTYPE array.
+
+    The EA sends tick times in seconds, so time_msc is the time in whole seconds.
+
+    :param records: The records of the reply.
+    :return: The ticks, oldest first.
+    """
+    values = parse_record_matrix(records, 5)
+    ticks = np.zeros(len(records), dtype=TICK_DTYPE)
+    ticks['time'] = values[:, 0]
+    ticks['time_msc'] = ticks['time'] * 1000
+    ticks['ask'] = values[:, 1]
+    ticks['bid'] = values[:, 2]
+    ticks['last'] = values[:, 3]
+    ticks['volume'] = values[:, 4]
+    ticks['volume_real'] = values[:, 4]
+    return ticks
+
+
+def parse_rates(records: List[str]) -> np.ndarray:
+    """
+    Parses F042 bar records 'time$open$high$low$close$volume' into a RATE_DTYPE array.
+
+    :param records: The records of the reply.
+    :return: The bars, oldest first.
+    """
+    values = parse_record_matrix(records, 6)
+    rates = np.zeros(len(records), dtype=RATE_DTYPE)
+    rates['time'] = values[:, 0]
+    for column, name in enumerate(('open', 'high', 'low', 'close'), start=1):
+        rates[name] = values[:, column]
+    rates['tick_volume'] = values[:, 5]
+    return rates
+
+
+def parse_symbol_rates(records: List[str]) -> np.ndarray:
+    """
+    Parses F045 bar records 'symbol$time$open$high$low$close$volume' into a SYMBOL_RATE_DTYPE array.
+
+    :param records: The records of the reply.
+    :return: One bar per record, in reply order.
+    """
+    symbols, _, numeric = zip(*(record.partition(RECORD_SEPARATOR) for record in records)) if records else ((), (), ())
+    rates = np.zeros(len(records), dtype=SYMBOL_RATE_DTYPE)
+    rates['symbol'] = symbols
+    rates['sym_id'] = SYMBOLS.intern_many(symbols) if records else 0
+    parsed = parse_rates(list(numeric))
+    for name in RATE_DTYPE.names:
+        rates[name] = parsed[name]
+    return rates
+
+
+def parse_positions(records: List[str]) -> np.ndarray:
+    """
+    Parses F061 position records into a POSITION_DTYPE array.
+
+    :param records: The records of the reply.
+    :return: One position per record, in reply order.
+    """
+    return np.array([tuple(record.split(RECORD_SEPARATOR)) for record in records], dtype=POSITION_DTYPE)
@@ -0,0 +1,177 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, List, Optional
+
+
+@dataclass
+class PooledConnection:
+    """
+    A REST socket owned by a ConnectionPool.
+
+    Attributes:
+        reader (asyncio.StreamReader): The reader side of the socket.
+        writer (asyncio.StreamWriter): The writer side of the socket.
+        created_at (float): Monotonic time the socket was opened.
+        last_used (float): Monotonic time the socket was last returned to the pool.
+        uses (int): Number of completed request/response exchanges on the socket.
+        framer (Any): Per-socket reader state owned by the Connection (e.g. a FramedReader).
+    """
+    reader: asyncio.StreamReader
+    writer: asyncio.StreamWriter
+    created_at: float
+    last_used: float
+    uses: int = 0
+    framer: Any = None
+
+    def is_healthy(self) -> bool:
+        """ Returns True if neither side of the socket has been closed. """
+        return not self.writer.is_closing() and not self.reader.at_eof()
+
+    def abort(self) -> None:
+        """ Drops the socket without waiting for a graceful shutdown. """
+        try:
+            self.writer.transport.abort()
+        except Exception:
+            # The owning loop may already be closed, the socket is then freed by the GC
+            pass
+
+
+class ConnectionPool:
+    """
+    Keep-alive pool of REST sockets to the EA server.
+
+    At most `max_size` sockets are open at any time, callers beyond that wait for a
+    socket to be released. Idle sockets are reused warmest first, and are evicted
+    once idle for longer than `idle_timeout` or when the EA has closed them.
+
+    Sockets are only reused when replies are framed (Framing.TERMINATOR or
+    Framing.LENGTH_PREFIX). With Framing.NONE a reply ends when the EA closes the
+    socket, as the shipped EA does after every request, so the pool only caps the
+    number of concurrent sockets.
+
+    Attributes:
+        host (str): The server host address.
+        port (int): The REST port of the server.
+        max_size (int): Maximum number of open sockets.
+        idle_timeout (float): Seconds an idle socket is kept before being evicted.
+        connect_timeout (float): Seconds to wait for a new socket to connect.
+        created (int): Number of sockets opened by the pool.
+        reused (int): Number of times an idle socket was handed out again.
+        discarded (int): Number of sockets closed by the pool.
+    """
+    host: str
+    port: int
+    max_size: int
+    idle_timeout: float
+    connect_timeout: float
+    debug: bool
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 15556, max_size: int = 4, idle_timeout: float = 30.0, connect_timeout: float = 5.0, debug: bool = False) -> None:
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1.")
+        self.host = host
+        self.port = port
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.connect_timeout = connect_timeout
+        self.debug = debug
+
+        self._idle: List[PooledConnection] = []
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        self.created = 0
+        self.reused = 0
+        self.discarded = 0
+
+    def __len__(self) -> int:
+        """ Returns the number of idle sockets held by the pool. """
+        return len(self._idle)
+
+    def _bind_loop(self) -> None:
+        """
+        Binds the pool to the running event loop.
+
+        Sockets belong to the loop that opened them, so switching loops (e.g. one
+        asyncio.run per call) drops every idle socket of the previous loop.
+        """
+        loop = asyncio.get_running_loop()
+        if loop is self._loop:
+            return
+        for conn in self._idle:
+            conn.abort()
+            self.discarded += 1
+        self._idle.clear()
+        self._semaphore = asyncio.Semaphore(self.max_size)
+        self._loop = loop
+
+    async def _open(self) -> PooledConnection:
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port), self.connect_timeout
+        )
+        now = time.monotonic()
+        self.created += 1
+        if self.debug:
+            print(f"Pool opened connection #{self.created} to {self.host}:{self.port}")
+        return PooledConnection(reader, writer, now, now)
+
+    def _discard(self, conn: PooledConnection) -> None:
+        self.discarded += 1
+        conn.writer.close()
+
+    def _evict_idle(self, now: float) -> None:
+        """ Closes idle sockets past their idle timeout or already closed by the EA. """
+        keep = []
+        for conn in self._idle:
+            if now - conn.last_used > self.idle_timeout or not conn.is_healthy():
+                self._discard(conn)
+            else:
+                keep.append(conn)
+        self._idle = keep
+
+    async def acquire(self) -> PooledConnection:
+        """
+        Checks out a socket, reusing a healthy idle one when available.
+
+        :return: A connected PooledConnection. It must be handed back with release().
+        """
+        self._bind_loop()
+        await self._semaphore.acquire()
+        try:
+            self._evict_idle(time.monotonic())
+            if self._idle:
+                self.reused += 1
+                return self._idle.pop()
+            return await self._open()
+        except BaseException:
+            self._semaphore.release()
+            raise
+
+    def release(self, conn: PooledConnection, reuse: bool = True) -> None:
+        """
+        Returns a socket to the pool.
+
+        :param conn: The connection obtained from acquire().
+        :param reuse: Whether the socket may serve another request. Pass False after any I/O error.
+        """
+        now = time.monotonic()
+        if reuse and conn.is_healthy():
+            conn.last_used = now
+            self._idle.append(conn)
+        else:
+            self._discard(conn)
+        self._evict_idle(now)
+        if self._semaphore is not None:
+            self._semaphore.release()
+
+    async def close(self) -> None:
+        """ Closes every idle socket held by the pool. """
+        idle, self._idle = self._idle, []
+        for conn in idle:
+            self._discard(conn)
+        for conn in idle:
+            try:
+                await conn.writer.wait_closed()
+            except Exception:
+                pass
@@ -0,0 +1,88 @@
+"""
+Fixed-point prices.
+
+A price of a symbol with `digits` decimals (SymbolInfo.digits, SYMBOL_DIGITS) is
+stored as an int64 number of points (SymbolInfo.point == 10 ** -digits), e.g.
+1.10002 with 5 digits is 110002. Integer prices compare, dedupe and aggregate
+exactly, spreads and PnL in points are plain integer arithmetic, and integer
+columns compress far better than floats.
+"""
+
+from enum import Enum
+from typing import Dict, Mapping, Union
+import numpy as np
+
+# Price fields of the TICK_DTYPE, RATE_DTYPE and SYMBOL_RATE_DTYPE arrays
+PRICE_FIELDS = ('bid', 'ask', 'last', 'open', 'high', 'low', 'close')
+
+Digits = Union[int, np.ndarray]
+
+
+class PriceMode(Enum):
+    """Price mode type.
+
+    Includes 2 price modes: FLOAT and POINTS.
+
+    FLOAT: Prices are float64, as sent by the EA.
+    POINTS: Prices are int64 points of the symbol, see prices.to_points().
+    """
+    FLOAT = "float"
+    POINTS = "points"
+
+    def to_str(self) -> str:
+        """Returns the string representation of the enum value."""
+        return self.value
+
+
+def to_points(prices, digits: Digits) -> np.ndarray:
+    """
+    Converts prices into int64 points, rounding to the nearest point.
+
+    :param prices: The prices.
+    :param digits: The decimals of the symbol, or one per price.
+    :return: The prices in points.
+    """
+    return np.rint(np.asarray(prices, dtype=np.float64) * np.power(10.0, digits)).astype(np.int64)
+
+
+def from_points(points, digits: Digits) -> np.ndarray:
+    """
+    Converts int64 points back into float64 prices.
+
+    :param points: The prices in points.
+    :param digits: The decimals of the symbol, or one per price.
+    :return: The prices.
+    """
+    return np.asarray(points, dtype=np.int64) / np.power(10.0, digits)
+
+
+def points_dtype(dtype: np.dtype) -> np.dtype:
+    """ Returns a record dtype with the float64 price fields replaced by int64 points. """
+    return np.dtype([(name, '<i8' if name in PRICE_FIELDS else dtype.fields[name][0]) for name in dtype.names])
+
+
+def to_points_array(records: np.ndarray, digits: Digits) -> np.ndarray:
+    """
+    Converts the prices of a tick or bar array (TICK_DTYPE, RATE_DTYPE, SYMBOL_RATE_DTYPE) into points.
+
+    :param records: The records.
+    :param digits: The decimals of the symbol, or one per record.
+    :return: A new array of points_dtype(records.dtype).
+    """
+    converted = np.empty(len(records), dtype=points_dtype(records.dtype))
+    for name in records.dtype.names:
+        converted[name] = to_points(records[name], digits) if name in PRICE_FIELDS else records[name]
+    return converted
+
+
+def symbol_digits(symbols: np.ndarray, digits: Mapping[str, int]) -> np.ndarray:
+    """
+    Looks up the digits of each record of a multi-symbol array, e.g. the 'symbol' field of SYMBOL_RATE_DTYPE.
+
+    :param symbols: The symbol of each record.
+    :param digits: The digits of each symbol.
+    :return: The digits of each record.
+    """
+    names, inverse = np.unique(symbols, return_inverse=True)
+    table: Dict[str, int] = {str(name): digits[str(name)] for name in names}
+    return np.array([table[str(name)] for name in names], dtype=np.int64)[inverse]
@@ -0,0 +1,91 @@
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+from ..errors import BAD_MESSAGE
+from .codec import RECORD_SEPARATOR
+from .utils import BadMessage
+
+Converter = Optional[Callable[[str], Any]]
+_MISSING = object()
+
+
+class RecordLayout:
+    """
+    The fields of a record type, shared by all LazyRecords of a command.
+
+    Attributes:
+        names (Tuple[str, ...]): Every key of a record, echoed arguments first, in the order of the eager dicts.
+        positions (Dict[str, int]): Index of each reply field in the raw record.
+        converters (Tuple[Converter, ...]): Converter of each reply field, None keeps the raw string.
+    """
+    names: Tuple[str, ...]
+    positions: Dict[str, int]
+    converters: Tuple[Converter, ...]
+
+    def __init__(self, fields: Sequence[Tuple[str, Converter]], echo: Sequence[str] = ()) -> None:
+        self.names = tuple(echo) + tuple(name for name, _ in fields)
+        self.positions = {name: position for position, (name, _) in enumerate(fields)}
+        self.converters = tuple(converter for _, converter in fields)
+
+
+class LazyRecord(Mapping):
+    """
+    Read-only record decoding its fields on access.
+
+    The record keeps the raw reply record and is only split into fields when the
+    first field is read. Each field is converted when it is read and cached, so a
+    caller reading two fields of a position pays for two conversions, not for all
+    of them. It compares equal to the dict the eager decoder returns and
+    materialize() turns it into one.
+
+    A record with missing fields raises BadMessage when such a field is read.
+    """
+    __slots__ = ('_layout', '_raw', '_fields', '_values')
+
+    def __init__(self, layout: RecordLayout, raw: Union[str, List[str]], values: Optional[Dict[str, Any]] = None) -> None:
+        self._layout = layout
+        self._raw = raw
+        self._fields = raw if isinstance(raw, list) else None
+        self._values = values if values is not None else {}
+
+    def __getitem__(self, key: str) -> Any:
+        value = self._values.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        position = self._layout.positions[key]
+        fields = self._fields
+        if fields is None:
+            fields = self._fields = self._raw.split(RECORD_SEPARATOR)
+        if position >= len(fields):
+            raise BadMessage(f"{BAD_MESSAGE.msg()}: record has no field {key!r}")
+        converter = self._layout.converters[position]
+        value = fields[position] if converter is None else converter(fields[position])
+        self._values[key] = value
+        return value
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._layout.names)
+
+    def __len__(self) -> int:
+        return len(self._layout.names)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._layout.positions or key in self._values
+
+    def __repr__(self) -> str:
+        return f"LazyRecord({self._raw!r})"
+
+    def materialize(self) -> Dict[str, Any]:
+        """ Decodes every field and returns the record as a dict. """
+        return {name: self[name] for name in self._layout.names}
+
+
+def materialize(records: Union[LazyRecord, List[LazyRecord]]) -> Union[Dict[str, Any], List[Dict[str, Any]]]:
+    """
+    Decodes lazy records into dicts, e.g. before serialising them.
+
+    :param records: A record or a list of records.
+    :return: A dict or a list of dicts.
+    """
+    if isinstance(records, LazyRecord):
+        return records.materialize()
+    return [record.materialize() for record in records]
@@ -0,0 +1,401 @@
+"""
+Python reference implementation of the MT5Ext EA server.
+
+It speaks the same wire protocol as MQL5/Experts/MT5Ext.mq5 and serves synthetic,
+deterministic market data, so the EA client can be exercised without a MetaTrader
+terminal (e.g. on Linux or in CI). It also implements the optional protocol
+extensions of the client, such as framing and multiplexed requests.
+
+Usage:
+    async with ReferenceEAServer(framing=Framing.TERMINATOR) as server:
+        client = EAClient(EAClientConfig(rest_port=server.rest_port, stream_port=server.stream_port, framing=Framing.TERMINATOR))
+        print(await client.get_last_tick_info("EURUSD"))
+"""
+
+import asyncio
+from typing import Callable, Dict, List, Optional, Sequence, Union
+import numpy as np
+from .binary import BINARY_CAPABILITY, BINARY_SUB_COMMAND, encode_binary_reply
+from .compression import COMPRESSION_CAPABILITY, COMPRESSION_SUB_COMMAND, COMPRESSION_THRESHOLD, compress_reply
+from .history import PAGED_CAPABILITY, PAGED_SUB_COMMAND
+from .framing import Framing, FramedReader, MESSAGE_TERMINATOR, encode_frame
+from .multiplex import CORRELATION_SEPARATOR, tag_message, untag_message
+from .parsers import TICK_DTYPE, RATE_DTYPE, POSITION_DTYPE
+from .utils import timeframe_seconds
+
+BASE_TIME = 1700000000  # 2023-11-14 22:13:20 UTC
+
+# Position of the start offset in the parts of paged requests, e.g. 'F021^P4^EURUSD^<start>^<count>'
+PAGED_START = {'F021': 3, 'F042': 4}
+
+Handler = Callable[[str, List[str]], Union[str, bytes]]
+
+
+def make_message(command: str, sub_command: str, parameters: Sequence[str]) -> str:
+    """ Builds a reply the way the EA's MakeMessage does. """
+    return f"{command}^{sub_command}^{'^'.join(parameters)}"
+
+
+def _fmt(value: float) -> str:
+    """ Formats a price like DoubleToString(value, 5). """
+    return f"{value:.5f}"
+
+
+class ReferenceEAServer:
+    """
+    Asyncio stand-in for the MT5Ext EA.
+
+    With Framing.NONE each REST socket serves one request and is then closed, like
+    the EA. With any other framing sockets are kept alive, and requests tagged with
+    a correlation ID are served concurrently and answered with the same tag.
+
+    Attributes:
+        host (str): The address to listen on.
+        rest_port (int): The REST port, 0 picks a free port on start().
+        stream_port (int): The streaming port, 0 picks a free port on start().
+        framing (Framing): How message boundaries are marked on the wire.
+        symbols (List[str]): Instruments known to the server.
+        now (int): The server clock in epoch seconds, tests may move it forward.
+        latency (float): Seconds to wait before answering each request.
+        command_latency (Dict[str, float]): Per-command latency overriding `latency`, keyed by command code.
+        handlers (Dict[str, Handler]): Request handlers keyed by command code.
+        connections (int): Number of REST sockets accepted.
+        requests (int): Number of REST requests served.
+        max_concurrent (int): Highest number of requests served at the same time.
+        stream_requests (List[str]): Messages received from stream clients, e.g. 'F020^2^EURUSD' subscriptions.
+        binary (bool): Whether the server offers the binary wire format, False behaves like an EA without it.
+        binary_handlers (Dict[str, Handler]): Handlers of binary requests keyed by command code, returning binary replies.
+        compression (bool): Whether the server offers zlib compression of marked requests.
+        compression_threshold (int): Smallest reply compressed, in bytes.
+        paging (bool): Whether the server offers paged F021 and F042 requests, False behaves like the shipped EA,
+            which always sends the newest records.
+    """
+
+    def __init__(self, host: str = '127.0.0.1', rest_port: int = 0, stream_port: int = 0, framing: Framing = Framing.NONE,
+                 terminator: bytes = MESSAGE_TERMINATOR, symbols: Sequence[str] = ('EURUSD', 'GBPUSD', 'USDJPY'),
+                 latency: float = 0.0, debug: bool = False, binary: bool = True, compression: bool = True,
+                 compression_threshold: int = COMPRESSION_THRESHOLD, paging: bool = True) -> None:
+        self.host = host
+        self.rest_port = rest_port
+        self.stream_port = stream_port
+        self.framing = framing
+        self.terminator = terminator
+        self.symbols = list(symbols)
+        self.now = BASE_TIME
+        self.latency = latency
+        self.command_latency: Dict[str, float] = {}
+        self.debug = debug
+        self.binary = binary
+        self.compression = compression
+        self.compression_threshold = compression_threshold
+        self.paging = paging
+
+        self.connections = 0
+        self.requests = 0
+        self.max_concurrent = 0
+        self.global_variables: Dict[str, float] = {}
+        self.stream_clients: List[asyncio.StreamWriter] = []
+        self.stream_requests: List[str] = []
+
+        self._concurrent = 0
+        self._rest_server: Optional[asyncio.AbstractServer] = None
+        self._stream_server: Optional[asyncio.AbstractServer] = None
+        self.handlers: Dict[str, Handler] = {
+            'F000': self._check_connection,
+            'F001': self._static_account_info,
+            'F002': self._dynamic_account_info,
+            'F003': self._instrument_info,
+            'F005': lambda sub, params: make_message('F005', '1', [str(self.now)]),
+            'F006': lambda sub, params: make_message('F006', '1', ['1', 'MT5Ext', 'Demo']),
+            'F007': lambda sub, params: make_message('F007', '1', [str(len(self.symbols))] + self.symbols),
+            'F008': lambda sub, params: make_message('F008', '1', [params[0], 'OK']),
+            'F011': lambda sub, params: make_message('F011', '1', ['1']),
+            'F012': lambda sub, params: make_message('F012', '1', ['0']),
+            'F020': self._last_tick,
+            'F021': self._last_ticks,
+            'F041': self._actual_bar,
+            'F042': self._last_bars,
+            'F045': self._specific_bar,
+            'F060': self._pending_orders,
+            'F061': self._open_positions,
+            'F063': self._closed_positions,
+            'F065': self._deleted_orders,
+            'F070': lambda sub, params: make_message('F070', '1', ['100001']),
+            'F080': self._set_global_variable,
+            'F081': lambda sub, params: make_message('F081', '1', [repr(self.global_variables.get(params[0], 0.0))]),
+        }
+        self.binary_handlers: Dict[str, Handler] = {
+            'F021': self._last_ticks_binary,
+            'F042': self._last_bars_binary,
+            'F061': self._open_positions_binary,
+        }
+        for command in ('F071', 'F072', 'F073', 'F074', 'F075', 'F076', 'F077', 'F078', 'F079', 'F084', 'F091'):
+            self.handlers[command] = lambda sub, params, command=command: make_message(command, '1', ['OK'])
+
+    async def __aenter__(self) -> "ReferenceEAServer":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.stop()
+
+    async def start(self) -> None:
+        """ Starts listening on the REST and streaming ports. """
+        self._rest_server = await asyncio.start_server(self._serve_rest, self.host, self.rest_port)
+        self._stream_server = await asyncio.start_server(self._serve_stream, self.host, self.stream_port)
+        self.rest_port = self._rest_server.sockets[0].getsockname()[1]
+        self.stream_port = self._stream_server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        """ Closes the listening sockets and every connected stream client. """
+        for writer in self.stream_clients:
+            writer.close()
+        self.stream_clients.clear()
+        for server in (self._rest_server, self._stream_server):
+            if server is not None:
+                server.close()
+                await server.wait_closed()
+
+    # ------------------------------------------------------------------
+    # Transport
+    # ------------------------------------------------------------------
+
+    def handle_request(self, request: str) -> Union[str, bytes]:
+        """
+        Dispatches a request like the EA's ProcessClient.
+
+        :param request: The request, e.g. 'F020^2^EURUSD'.
+        :return: The reply message, bytes for binary or compressed requests.
+        """
+        parts = request.split('^')
+        while len(parts) > 2 and parts[-1] == '':
+            parts.pop()
+        if len(parts) < 2:
+            return make_message('F999', '1', ['INVALID_REQUEST'])
+        if self.compression and parts[1].startswith(COMPRESSION_SUB_COMMAND):
+            parts[1] = parts[1][len(COMPRESSION_SUB_COMMAND):]
+            reply = self.handle_request('^'.join(parts))
+            return compress_reply(reply if isinstance(reply, bytes) else reply.encode(), self.compression_threshold)
+        paged = ()
+        if self.paging and parts[1].startswith(PAGED_SUB_COMMAND) and parts[0] in PAGED_START:
+            # The start offset is passed to the handler, which then reads the parameters of the unpaged form
+            parts[1] = parts[1][len(PAGED_SUB_COMMAND):]
+            paged = (int(parts.pop(PAGED_START[parts[0]])),)
+        handler = self.handlers.get(parts[0])
+        if self.binary and parts[1].startswith(BINARY_SUB_COMMAND) and parts[0] in self.binary_handlers:
+            return self.binary_handlers[parts[0]](parts[1][len(BINARY_SUB_COMMAND):], parts[2:], *paged)
+        if handler is None:
+            return make_message('F999', '1', ['UNKNOWN_REQUEST'])
+        return handler(parts[1], parts[2:], *paged)
+
+    async def _reply(self, request: bytes) -> bytes:
+        self.requests += 1
+        self._concurrent += 1
+        self.max_concurrent = max(self.max_concurrent, self._concurrent)
+        try:
+            message = request.decode()
+            latency = self.command_latency.get(message[:4], self.latency)
+            if latency:
+                await asyncio.sleep(latency)
+            reply = self.handle_request(message)
+            return reply if isinstance(reply, bytes) else reply.encode()
+        finally:
+            self._concurrent -= 1
+
+    async def _serve_rest(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        try:
+            if self.framing == Framing.NONE:
+                request = await reader.read(4098)
+                if request:
+                    writer.write(await self._reply(request))
+                    await writer.drain()
+                return
+
+            tasks = set()
+            async for request in FramedReader(self.framing, self.terminator).iter_messages(reader):
+                if CORRELATION_SEPARATOR in request.split(b'^', 1)[0]:
+                    task = asyncio.get_running_loop().create_task(self._reply_tagged(request, writer))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+                else:
+                    writer.write(encode_frame(await self._reply(request), self.framing, self.terminator))
+                    await writer.drain()
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _reply_tagged(self, request: bytes, writer: asyncio.StreamWriter) -> None:
+        correlation_id, payload = untag_message(request)
+        reply = await self._reply(payload)
+        writer.write(encode_frame(tag_message(correlation_id, reply), self.framing, self.terminator))
+        await writer.drain()
+
+    async def _serve_stream(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.stream_clients.append(writer)
+        try:
+            if self.framing == Framing.NONE:
+                await reader.read()
+            else:
+                async for frame in FramedReader(self.framing, self.terminator).iter_messages(reader):
+                    self.stream_requests.append(frame.decode())
+        except ConnectionError:
+            pass
+        finally:
+            if writer in self.stream_clients:
+                self.stream_clients.remove(writer)
+            writer.close()
+
+    def drop_stream_clients(self) -> None:
+        """ Aborts every stream socket, like a restart of the EA. """
+        for writer in self.stream_clients:
+            writer.transport.abort()
+        self.stream_clients.clear()
+
+    async def broadcast(self, message: str) -> None:
+        """ Sends a message to every connected stream client, like the EA's BroadcastStreamData. """
+        frame = encode_frame(message.encode(), self.framing, self.terminator)
+        for writer in list(self.stream_clients):
+            writer.write(frame)
+        for writer in list(self.stream_clients):
+            try:
+                await writer.drain()
+            except ConnectionError:
+                self.stream_clients.remove(writer)
+
+    def tick_message(self, symbol: str, index: int = 0) -> str:
+        """ Builds a stream tick message for a symbol, see GetLatestTick in stream-handlers.mqh. """
+        time_msc, bid, ask = self._tick(symbol, index)
+        return make_message('F020', '6', [symbol, str(time_msc // 1000), _fmt(bid), _fmt(ask), _fmt(0.0), '0'])
+
+    # ------------------------------------------------------------------
+    # Synthetic market data
+    # ------------------------------------------------------------------
+
+    def _base_price(self, symbol: str) -> float:
+        index = self.symbols.index(symbol) if symbol in self.symbols else len(self.symbols)
+        return 150.0 if symbol.endswith('JPY') else 1.1 + 0.1 * index
+
+    def _tick(self, symbol: str, index: int) -> tuple:
+        """ Returns (time_msc, bid, ask) of the tick `index` ticks before now. """
+        time_msc = self.now * 1000 - index * 250
+        bid = self._base_price(symbol) + 0.00001 * ((time_msc // 250) % 97)
+        return time_msc, bid, bid + 0.00012
+
+    def _bar(self, symbol: str, timeframe: int, index: int) -> List[str]:
+        """ Returns [time, open, high, low, close, volume] of the bar `index` bars before the current one. """
+        open_time, open_price, high, low, close_price, volume = self._bar_values(symbol, timeframe, index)
+        return [str(open_time), _fmt(open_price), _fmt(high), _fmt(low), _fmt(close_price), str(volume)]
+
+    def _bar_values(self, symbol: str, timeframe: int, index: int) -> tuple:
+        """ Returns (time, open, high, low, close, volume) of the bar `index` bars before the current one. """
+        seconds = timeframe_seconds(timeframe)
+        open_time = self.now - self.now % seconds - index * seconds
+        step = open_time // seconds
+        open_price = self._base_price(symbol) + 0.0001 * (step % 89)
+        close_price = open_price + 0.00005 * ((self.now if index == 0 else open_time) % 7)
+        high = max(open_price, close_price) + 0.0002
+        low = min(open_price, close_price) - 0.0002
+        return open_time, open_price, high, low, close_price, 100 + step % 50
+
+    def _check_connection(self, sub: str, params: List[str]) -> str:
+        # Binary and compressed replies may contain the terminator, so neither is offered with Framing.TERMINATOR
+        offered = [capability for capability, enabled in ((BINARY_CAPABILITY, self.binary), (COMPRESSION_CAPABILITY, self.compression))
+                   if enabled and capability in params and self.framing != Framing.TERMINATOR]
+        if self.paging and PAGED_CAPABILITY in params:
+            offered.append(PAGED_CAPABILITY)
+        return make_message('F000', '1', ['OK'] + offered)
+
+    def _static_account_info(self, sub: str, params: List[str]) -> str:
+        return make_message('F001', '10', ['Reference', '1000001', 'USD', '0', '100', 'true', '200', '50.00', '30.00', 'QuantsPub'])
+
+    def _dynamic_account_info(self, sub: str, params: List[str]) -> str:
+        return make_message('F002', '6', ['10000.00', '10025.50', '25.50', '120.00', '8354.58', '9905.50'])
+
+    def _instrument_info(self, sub: str, params: List[str]) -> str:
+        digits = '3' if params[0].endswith('JPY') else '5'
+        point = '0.00100' if digits == '3' else '0.00001'
+        return make_message('F003', '3', [digits, '100.00', '0.01', '0.01', point, point, '1.00', '-6.50', '1.20', '0', '100000.00'])
+
+    def _last_tick(self, sub: str, params: List[str]) -> str:
+        time_msc, bid, ask = self._tick(params[0], 0)
+        return make_message('F020', '1', [str(time_msc // 1000), _fmt(bid), _fmt(ask), _fmt(0.0), '0', _fmt(ask - bid), str(time_msc)])
+
+    def _last_ticks(self, sub: str, params: List[str], start: int = 0) -> str:
+        # Like GetLastXTickFromNow, ticks are sent with their time in seconds
+        symbol, count = params[0], int(params[1])
+        records = []
+        for index in range(start + count - 1, start - 1, -1):
+            time_msc, bid, ask = self._tick(symbol, index)
+            records.append(f"{time_msc // 1000}${_fmt(ask)}${_fmt(bid)}${_fmt(0.0)}$0")
+        return make_message('F021', '1', records)
+
+    def _actual_bar(self, sub: str, params: List[str]) -> str:
+        return make_message('F041', '1', self._bar(params[0], int(params[1]), 0))
+
+    def _last_bars(self, sub: str, params: List[str], start: int = 0) -> str:
+        # [instrument, timeframe, 0, count], like GetLastXBarsFromNow the bars are copied from the current one unless paged
+        symbol, timeframe, count = params[0], int(params[1]), int(params[-1])
+        records = ['$'.join(self._bar(symbol, timeframe, index)) for index in range(start + count - 1, start - 1, -1)]
+        return make_message('F042', '1', records)
+
+    def _specific_bar(self, sub: str, params: List[str]) -> str:
+        index, timeframe = int(params[1]), int(params[2])
+        records = ['$'.join([symbol] + self._bar(symbol, timeframe, index)) for symbol in params[0].split('$')]
+        return make_message('F045', '1', records)
+
+    def _pending_orders(self, sub: str, params: List[str]) -> str:
+        records = [f"{200000 + i}${symbol}$buy_limit$7${0.1 * (i + 1):.2f}${_fmt(self._base_price(symbol) - 0.002)}$0.00000$0.00000$ref"
+                   for i, symbol in enumerate(self.symbols)]
+        return make_message('F060', '1', records)
+
+    def _open_positions(self, sub: str, params: List[str]) -> str:
+        records = [f"{100000 + i}${symbol}${300000 + i}$buy$7${0.1 * (i + 1):.2f}${_fmt(self._base_price(symbol))}${self.now - 3600 * (i + 1)}"
+                   f"$0.00000$0.00000$ref${1.5 * (i + 1):.2f}$-0.10$-0.70"
+                   for i, symbol in enumerate(self.symbols)]
+        return make_message('F061', '1', records)
+
+    def _closed_positions(self, sub: str, params: List[str]) -> str:
+        records = [f"{400000 + i}${symbol}${500000 + i}$sell$7$0.10${_fmt(self._base_price(symbol))}${self.now - 7200 * (i + 1)}"
+                   f"$0.00000$0.00000${_fmt(self._base_price(symbol) - 0.001)}${self.now - 3600 * (i + 1)}$ref$10.00$0.00$-0.70"
+                   for i, symbol in enumerate(self.symbols)]
+        return make_message('F063', '1', records)
+
+    def _deleted_orders(self, sub: str, params: List[str]) -> str:
+        records = [f"{600000 + i}${symbol}$sell_stop$7$0.10${_fmt(self._base_price(symbol))}${self.now - 7200 * (i + 1)}"
+                   f"$0.00000$0.00000${_fmt(self._base_price(symbol))}${self.now - 3600 * (i + 1)}$ref"
+                   for i, symbol in enumerate(self.symbols)]
+        return make_message('F065', '1', records)
+
+    def _set_global_variable(self, sub: str, params: List[str]) -> str:
+        self.global_variables[params[0]] = float(params[1])
+        return make_message('F080', '1', ['OK'])
+
+    # ------------------------------------------------------------------
+    # Binary replies, the reference encoding of WireFormat.BINARY
+    # ------------------------------------------------------------------
+
+    def _last_ticks_binary(self, sub: str, params: List[str], start: int = 0) -> bytes:
+        symbol, count = params[0], int(params[1])
+        ticks = np.zeros(count, dtype=TICK_DTYPE)
+        for row, index in enumerate(range(start + count - 1, start - 1, -1)):
+            time_msc, bid, ask = self._tick(symbol, index)
+            ticks[row] = (time_msc // 1000, bid, ask, 0.0, 0, time_msc // 1000 * 1000, 0, 0.0)
+        return encode_binary_reply('F021', ticks)
+
+    def _last_bars_binary(self, sub: str, params: List[str], start: int = 0) -> bytes:
+        symbol, timeframe, count = params[0], int(params[1]), int(params[-1])
+        rates = np.zeros(count, dtype=RATE_DTYPE)
+        for row, index in enumerate(range(start + count - 1, start - 1, -1)):
+            open_time, open_price, high, low, close_price, volume = self._bar_values(symbol, timeframe, index)
+            rates[row] = (open_time, open_price, high, low, close_price, volume, 0, 0)
+        return encode_binary_reply('F042', rates)
+
+    def _open_positions_binary(self, sub: str, params: List[str]) -> bytes:
+        positions = np.array([(100000 + i, symbol, 300000 + i, 'buy', 7, 0.1 * (i + 1), self._base_price(symbol),
+                               self.now - 3600 * (i + 1), 0.0, 0.0, 'ref', 1.5 * (i + 1), -0.1, -0.7)
+                              for i, symbol in enumerate(self.symbols)], dtype=POSITION_DTYPE)
+        return encode_binary_reply('F061', positions)
@@ -0,0 +1,188 @@
+import threading
+import time
+from collections import deque
+from enum import Enum
+from typing import Any, Callable, Deque, Dict, Hashable, List, Optional
+
+
+class OverflowPolicy(Enum):
+    """Overflow policy of a StreamQueue.
+
+    Includes 4 policies: BLOCK, DROP_OLDEST, DROP_NEWEST and CONFLATE.
+
+    BLOCK: The producer waits for room, pushing back on the socket reader.
+    DROP_OLDEST: The oldest queued message is dropped to make room.
+    DROP_NEWEST: The incoming message is dropped.
+    CONFLATE: A queued message with the same key is replaced in place, otherwise the oldest message is dropped.
+    """
+    BLOCK = "block"
+    DROP_OLDEST = "drop_oldest"
+    DROP_NEWEST = "drop_newest"
+    CONFLATE = "conflate"
+
+    def to_str(self) -> str:
+        """Returns the string representation of the enum value."""
+        return self.value
+
+
+def stream_message_key(message: str) -> Hashable:
+    """
+    Default conflation key of a stream message.
+
+    Messages carrying an instrument, e.g. 'F020^6^EURUSD^...', are keyed on the
+    command and instrument, other messages on the command alone.
+    """
+    parts = message.split('^', 3)
+    if len(parts) > 2 and parts[2] and not parts[2][0].isdigit():
+        return parts[0], parts[2]
+    return parts[0]
+
+
+class QueueClosed(Exception):
+    """Raised by StreamQueue.get() once the queue is closed and drained."""
+
+
+class StreamQueue:
+    """
+    Bounded, thread-safe handoff queue between the stream reader and its consumers.
+
+    Attributes:
+        maxsize (int): Maximum number of queued messages.
+        policy (OverflowPolicy): What to do with a message when the queue is full.
+        key (Callable[[Any], Hashable]): Conflation key of a message, used by OverflowPolicy.CONFLATE.
+        dropped (int): Number of messages dropped because the queue was full.
+        conflated (int): Number of queued messages replaced by a newer message with the same key.
+    """
+    maxsize: int
+    policy: OverflowPolicy
+    dropped: int
+    conflated: int
+
+    def __init__(self, maxsize: int = 1024, policy: OverflowPolicy = OverflowPolicy.BLOCK, key: Optional[Callable[[Any], Hashable]] = None) -> None:
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1.")
+        self.maxsize = maxsize
+        self.policy = policy
+        self.key = key or stream_message_key
+        self.dropped = 0
+        self.conflated = 0
+        self._items: Deque[Any] = deque()
+        self._keyed: Dict[Hashable, Any] = {}
+        self._closed = False
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._size()
+
+    def _size(self) -> int:
+        return len(self._keyed) if self.policy == OverflowPolicy.CONFLATE else len(self._items)
+
+    def put(self, item: Any, timeout: Optional[float] = None) -> bool:
+        """
+        Queues a message, applying the overflow policy when the queue is full.
+
+        :param item: The message.
+        :param timeout: Maximum seconds to wait for room with OverflowPolicy.BLOCK, None waits forever.
+        :return: True if the message was queued, False if it was dropped.
+        """
+        with self._lock:
+            if self._closed:
+                return False
+
+            if self.policy == OverflowPolicy.CONFLATE:
+                key = self.key(item)
+                if key in self._keyed:
+                    self._keyed[key] = item
+                    self.conflated += 1
+                    return True
+                if len(self._keyed) >= self.maxsize:
+                    del self._keyed[next(iter(self._keyed))]
+                    self.dropped += 1
+                self._keyed[key] = item
+                self._not_empty.notify()
+                return True
+
+            if len(self._items) >= self.maxsize:
+                if self.policy == OverflowPolicy.DROP_NEWEST:
+                    self.dropped += 1
+                    return False
+                if self.policy == OverflowPolicy.DROP_OLDEST:
+                    self._items.popleft()
+                    self.dropped += 1
+                else:
+                    if not self._not_full.wait_for(lambda: self._closed or len(self._items) < self.maxsize, timeout):
+                        self.dropped += 1
+                        return False
+                    if self._closed:
+                        return False
+            self._items.append(item)
+            self._not_empty.notify()
+            return True
+
+    def _pop(self) -> Any:
+        if self.policy == OverflowPolicy.CONFLATE:
+            key = next(iter(self._keyed))
+            return self._keyed.pop(key)
+        return self._items.popleft()
+
+    def get(self, timeout: Optional[float] = None) -> Any:
+        """
+        Takes the oldest message, waiting for one if the queue is empty.
+
+        :param timeout: Maximum seconds to wait, None waits forever.
+        :return: The message.
+        :raises TimeoutError: If no message arrived within the timeout.
+        :raises QueueClosed: If the queue is closed and empty.
+        """
+        with self._not_empty:
+            if not self._not_empty.wait_for(lambda: self._closed or self._size(), timeout):
+                raise TimeoutError("No stream message within timeout")
+            if not self._size():
+                raise QueueClosed()
+            item = self._pop()
+            self._not_full.notify()
+            return item
+
+    def get_many(self, max_items: int, timeout: Optional[float] = None, linger: float = 0.0) -> List[Any]:
+        """
+        Takes up to `max_items` of the oldest messages at once.
+
+        Waits for the first message like get(), then for up to `linger` seconds more
+        while the batch is not full.
+
+        :param max_items: Maximum number of messages returned.
+        :param timeout: Maximum seconds to wait for the first message, None waits forever.
+        :param linger: Maximum seconds to wait for further messages once the first one arrived.
+        :return: The messages, oldest first.
+        :raises TimeoutError: If no message arrived within the timeout.
+        :raises QueueClosed: If the queue is closed and empty.
+        """
+        with self._not_empty:
+            if not self._not_empty.wait_for(lambda: self._closed or self._size(), timeout):
+                raise TimeoutError("No stream message within timeout")
+            if not self._size():
+                raise QueueClosed()
+            if linger > 0 and self._size() < max_items:
+                deadline = time.monotonic() + linger
+                while not self._closed and self._size() < max_items:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._not_empty.wait(remaining)
+            items = [self._pop() for _ in range(min(max_items, self._size()))]
+            self._not_full.notify(len(items))
+            return items
+
+    def close(self) -> None:
+        """ Closes the queue, waking up every waiting producer and consumer. """
+        with self._lock:
+            self._closed = True
+            self._not_empty.notify_all()
+            self._not_full.notify_all()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
@@ -0,0 +1,76 @@
+import threading
+from typing import Dict, Iterable, List, Optional
+import numpy as np
+
+
+class SymbolRegistry:
+    """
+    Interning table assigning dense integer IDs to symbols.
+
+    IDs start at 0 and are never reused, so multi-symbol structures can be flat
+    lists or arrays indexed by ID, and hot paths can compare and hash small ints
+    instead of strings. Lookups by name and by ID are a dict access and a list
+    index. The process-wide registry is SYMBOLS.
+
+    Attributes:
+        names (List[str]): The symbol of each ID.
+    """
+    names: List[str]
+
+    def __init__(self) -> None:
+        self.names = []
+        self._ids: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self._ids
+
+    def intern(self, symbol: str) -> int:
+        """
+        Returns the ID of a symbol, assigning the next ID to a new symbol.
+
+        :param symbol: The symbol, e.g. 'EURUSD'.
+        :return: The ID.
+        """
+        sym_id = self._ids.get(symbol)
+        if sym_id is None:
+            with self._lock:
+                sym_id = self._ids.get(symbol)
+                if sym_id is None:
+                    sym_id = self._ids[symbol] = len(self.names)
+                    self.names.append(symbol)
+        return sym_id
+
+    def id(self, symbol: str) -> Optional[int]:
+        """ Returns the ID of a symbol, or None if the symbol was never interned. """
+        return self._ids.get(symbol)
+
+    def name(self, sym_id: int) -> str:
+        """ Returns the symbol of an ID. """
+        return self.names[sym_id]
+
+    def intern_many(self, symbols: Iterable[str]) -> np.ndarray:
+        """
+        Interns the symbols of a column, e.g. the 'symbol' field of SYMBOL_RATE_DTYPE.
+
+        :param symbols: The symbols.
+        :return: Their IDs as an int32 array.
+        """
+        symbols = np.asarray(symbols)
+        unique, inverse = np.unique(symbols, return_inverse=True)
+        return np.array([self.intern(str(symbol)) for symbol in unique], dtype=np.int32)[inverse]
+
+    def names_of(self, sym_ids: Iterable[int]) -> np.ndarray:
+        """
+        Returns the symbols of a column of IDs.
+
+        :param sym_ids: The IDs.
+        :return: The symbols as a string array.
+        """
+        return np.asarray(self.names, dtype=object)[np.asarray(sym_ids, dtype=np.intp)].astype(str)
+
+
+SYMBOLS = SymbolRegistry()
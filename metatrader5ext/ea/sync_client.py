@@ -0,0 +1,131 @@
+import asyncio
+import functools
+import inspect
+import threading
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterator, Optional
+from .client import EAClientConfig, EAClient
+
+
+class SyncEAClient:
+    """
+    Blocking facade over EAClient for synchronous code.
+
+    A single event loop runs in a daemon thread for the lifetime of the client and
+    every call submits the matching EAClient coroutine to it with
+    run_coroutine_threadsafe. Unlike one asyncio.run per call, the loop and hence the
+    pooled REST sockets survive between calls.
+
+    Every public coroutine method of EAClient is mirrored with the same signature,
+    other attributes (start_stream, stop_stream, ok, return_error, ...) are forwarded
+    to the wrapped client.
+
+    Usage:
+        with SyncEAClient(EAClientConfig()) as client:
+            client.check_connection()
+            client.get_last_tick_info('EURUSD')
+
+    Attributes:
+        client (EAClient): The wrapped asynchronous client.
+        timeout (Optional[float]): Seconds to wait for a call to complete, None waits forever.
+    """
+    client: EAClient
+    timeout: Optional[float]
+
+    def __init__(self, config: Optional[EAClientConfig] = None, timeout: Optional[float] = None) -> None:
+        self.client = EAClient(config or EAClientConfig())
+        self.timeout = timeout
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run_loop, name="SyncEAClient", daemon=True)
+        self._thread.start()
+
+    def _run_loop(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.client, name)
+
+    def __enter__(self) -> "SyncEAClient":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def run(self, awaitable: Awaitable, timeout: Optional[float] = None) -> Any:
+        """
+        Runs a coroutine on the client's event loop and waits for its result.
+
+        :param awaitable: The coroutine, e.g. client.client.get_instruments().
+        :param timeout: Seconds to wait, the client timeout by default.
+        :return: The result of the coroutine.
+        """
+        if self._loop.is_closed():
+            raise RuntimeError("SyncEAClient is closed.")
+        if threading.current_thread() is self._thread:
+            raise RuntimeError("SyncEAClient cannot be called from its own event loop, await the EAClient method instead.")
+        future = asyncio.run_coroutine_threadsafe(awaitable, self._loop)
+        try:
+            return future.result(self.timeout if timeout is None else timeout)
+        except TimeoutError:
+            future.cancel()
+            raise
+
+    def iterate(self, iterator: AsyncIterator) -> Iterator:
+        """
+        Iterates an async iterator of the client, e.g. client.client.iter_ticks(), fetching one item per call.
+
+        :param iterator: The async iterator.
+        :return: Its items.
+        """
+        async def step() -> Any:
+            return await iterator.__anext__()
+
+        async def close() -> None:
+            await iterator.aclose()
+
+        try:
+            while True:
+                try:
+                    yield self.run(step())
+                except StopAsyncIteration:
+                    return
+        finally:
+            if not self._loop.is_closed():
+                self.run(close())
+
+    def iter_ticks(self, *args, **kwargs) -> Iterator:
+        """ Same as EAClient.iter_ticks(), as a blocking generator. """
+        return self.iterate(self.client.iter_ticks(*args, **kwargs))
+
+    def iter_bars(self, *args, **kwargs) -> Iterator:
+        """ Same as EAClient.iter_bars(), as a blocking generator. """
+        return self.iterate(self.client.iter_bars(*args, **kwargs))
+
+    def close(self) -> None:
+        """ Closes the pooled sockets and stops the event loop. """
+        if self._loop.is_closed():
+            return
+        try:
+            self.run(self.client.close())
+        finally:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
+
+    @property
+    def closed(self) -> bool:
+        return self._loop.is_closed()
+
+
+def _sync_method(name: str) -> Callable:
+    method = getattr(EAClient, name)
+
+    @functools.wraps(method)
+    def wrapper(self: SyncEAClient, *args, **kwargs):
+        return self.run(getattr(self.client, name)(*args, **kwargs))
+    return wrapper
+
+
+for _name, _method in inspect.getmembers(EAClient, inspect.iscoroutinefunction):
+    if not _name.startswith('_') and _name not in SyncEAClient.__dict__:
+        setattr(SyncEAClient, _name, _sync_method(_name))
@@ -0,0 +1,71 @@
+"""
+Time model of the EA client.
+
+Times are returned as int epoch milliseconds in the broker's server time, as
+sent by the EA, and are only converted on demand, in bulk, over whole arrays.
+MetaTrader reports times in the time zone of the trade server, so the broker
+offset (see broker_offset_ms) is subtracted to obtain UTC.
+"""
+
+import time
+from typing import Optional, Sequence, Union
+import numpy as np
+
+MS_PER_SECOND = 1000
+OFFSET_RESOLUTION_MS = 15 * 60 * MS_PER_SECOND
+
+TimeValues = Union[Sequence[int], np.ndarray]
+
+
+def epoch_ms(value: str) -> int:
+    """ Converts a time in epoch seconds, as sent by the EA, into epoch milliseconds. """
+    return int(value) * MS_PER_SECOND
+
+
+def now_ms() -> int:
+    """ Returns the current UTC time in epoch milliseconds. """
+    return time.time_ns() // 1_000_000
+
+
+def broker_offset_ms(server_time_ms: int, utc_now_ms: Optional[int] = None, resolution_ms: int = OFFSET_RESOLUTION_MS) -> int:
+    """
+    Derives the offset of the broker's server time from UTC.
+
+    :param server_time_ms: The current server time, e.g. the timestamp returned by get_broker_server_time().
+    :param utc_now_ms: The current UTC time, now by default.
+    :param resolution_ms: The offset is rounded to this resolution (15 minutes, the finest time zone offset), absorbing latency and clock skew.
+    :return: The offset in milliseconds, server time minus UTC.
+    """
+    if utc_now_ms is None:
+        utc_now_ms = now_ms()
+    return round((server_time_ms - utc_now_ms) / resolution_ms) * resolution_ms
+
+
+def to_datetime64(values: TimeValues, offset_ms: int = 0, unit: str = 'ms') -> np.ndarray:
+    """
+    Converts epoch times into a datetime64[ms] array in one vectorised step.
+
+    :param values: Epoch times, e.g. a records column or the 'time' field of a TICK_DTYPE array.
+    :param offset_ms: The broker offset, subtracted to obtain UTC.
+    :param unit: The unit of the values, 'ms' or 's'.
+    :return: The times as datetime64[ms].
+    """
+    times = np.asarray(values, dtype=np.int64)
+    if unit == 's':
+        times = times * MS_PER_SECOND
+    elif unit != 'ms':
+        raise ValueError(f"Unknown time unit: {unit}")
+    if offset_ms:
+        times = times - offset_ms
+    return times.astype('datetime64[ms]')
+
+
+def to_polars_datetime(values: TimeValues, offset_ms: int = 0, unit: str = 'ms', name: str = 'time'):
+    """
+    Converts epoch times into a polars Datetime('ms', 'UTC') Series, see to_datetime64().
+
+    :return: The polars Series.
+    """
+    import polars as pl
+
+    return pl.Series(name, to_datetime64(values, offset_ms, unit)).dt.replace_time_zone('UTC')
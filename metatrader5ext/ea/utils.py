@@ -7,7 +7,7 @@ import logging
 import inspect
 
 from decimal import Decimal
-from nautilus_metatrader5.common import (
+from ..common import (
     UNSET_INTEGER,
     UNSET_DOUBLE,
     UNSET_LONG,
@@ -229,22 +229,18 @@ def MQL5Period(text):
     return "PERIOD_CURRENT"
 
 
-
-# def decode_string(self, encoded_bytes: bytes) -> str:
-#     """ Decodes the received bytes by reversing the shift encoding. """
-#     return ''.join(chr(b - 42) for b in encoded_bytes)
-    
-    # def uncompress_string(self, compressed_bytes: bytes) -> bytes:
-    #     """ Decompresses a run-length encoded byte sequence. """
-    #     uncompressed = bytearray()
-    #     i = 0
-    #     while i < len(compressed_bytes):
-    #         char = compressed_bytes[i]
-    #         if i + 1 < len(compressed_bytes) and isinstance(compressed_bytes[i+1], int):
-    #             count = compressed_bytes[i+1]
-    #             uncompressed.extend([char] * count)
-    #             i += 2
-    #         else:
-    #             uncompressed.append(char)
-    #             i += 1
-    #     return bytes(uncompressed)
\ No newline at end of file
+def timeframe_seconds(timeframe: int) -> int:
+    """
+    Returns the duration of an MT5 timeframe (e.g. 16385 for TIMEFRAME_H1) in seconds.
+
+    Months are counted as 30 days.
+    """
+    if timeframe == 49153:
+        return 30 * 86400
+    if timeframe == 32769:
+        return 7 * 86400
+    if timeframe & 0x4000:
+        return (timeframe & 0x3FFF) * 3600
+    if 0 < timeframe <= 30:
+        return timeframe * 60
+    raise ValueError(f"Unknown timeframe: {timeframe}")
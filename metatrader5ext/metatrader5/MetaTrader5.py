@@ -1,3 +1,4 @@
+import datetime
 import rpyc
 
 """
@@ -2644,6 +2645,58 @@ Display dataframe with ticks
         code=f'mt5.copy_ticks_range("{symbol}", {repr(date_from.astimezone())}, {repr(date_to.astimezone())}, {flags})'
         return rpyc.utils.classic.obtain(self.__conn.eval(code))
 
+    def iter_ticks_range(self,symbol, date_from, date_to, flags, chunk_size=100_000):
+        r'''
+# iter_ticks_range
+
+Same as `copy_ticks_range`, yielding the ticks in arrays of at most `chunk_size` ticks, oldest first.
+
+Each chunk is requested with `copy_ticks_from` from the time of the last tick received, so
+only one chunk is transferred and held at a time and the first ticks arrive as soon as the
+first chunk does. Ticks of the last second returned twice are dropped.
+
+`copy_ticks_from` starts at whole seconds, so a second holding more than `chunk_size` ticks
+is requested at once with `copy_ticks_range` and yielded in several chunks.
+
+```python
+for ticks in mt5.iter_ticks_range("AUDUSD", utc_from, utc_to, mt5.COPY_TICKS_ALL):
+    print(len(ticks))
+```
+        '''
+        from ..ea.history import trim_overlap
+
+        date_to_msc = int(date_to.timestamp() * 1000)
+        cursor = date_from
+        previous = None
+        while True:
+            ticks = self.copy_ticks_from(symbol, cursor, chunk_size, flags)
+            if ticks is None:
+                return
+            full = len(ticks) == chunk_size
+            second = None
+            if full and ticks['time'][0] == ticks['time'][-1]:
+                # The next chunk would start at the same second again, so the whole second is requested
+                second = datetime.datetime.fromtimestamp(int(ticks['time'][0]), tz=datetime.timezone.utc)
+                range_from = cursor if cursor.timestamp() > second.timestamp() else second
+                ticks = self.copy_ticks_range(symbol, range_from, second + datetime.timedelta(milliseconds=999), flags)
+                if ticks is None:
+                    return
+            ticks = ticks[ticks['time_msc'] <= date_to_msc]
+            if previous is not None:
+                ticks = trim_overlap(ticks, previous, 'time_msc')
+            for offset in range(0, len(ticks), chunk_size):
+                yield ticks[offset:offset + chunk_size]
+            if len(ticks):
+                previous = ticks
+            if second is not None:
+                cursor = second + datetime.timedelta(seconds=1)
+                if cursor.timestamp() * 1000 > date_to_msc:
+                    return
+                continue
+            if not len(ticks) or not full or ticks['time_msc'][-1] == date_to_msc:
+                return
+            cursor = datetime.datetime.fromtimestamp(int(ticks['time'][-1]), tz=datetime.timezone.utc)
+
     def orders_total(self,*args,**kwargs):
         r'''
 # orders_total
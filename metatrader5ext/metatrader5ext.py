@@ -5,11 +5,11 @@ import socket
 import sys
 import threading
 import numpy as np
-from datetime import datetime, timezone
 from typing import Any, Callable, List, Optional, Union
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from metatrader5ext.metatrader5 import RpycConfig, MetaTrader5
 from metatrader5ext.ea import EAClientConfig, EAClient
+from metatrader5ext.ea.timestamps import now_ms
 from metatrader5ext.common import Mode, PlatformType
 from metatrader5ext.errors import RPYC_SERVER_CONNECT_FAIL, ErrorInfo, TerminalError
 from metatrader5ext.logging import Logger as MTLogger
@@ -50,7 +50,7 @@ class MetaTrader5Ext:
         _mt5 (MetaTrader5.MetaTrader5, MetaTrader5, EAClient): MetaTrader5 instance.
         enable_stream (bool): Flag to enable or disable streaming.
         connected (bool): Connection status.
-        connection_time (Optional[float]): Time of the connection.
+        connection_time (Optional[int]): Time of the connection in UTC epoch milliseconds.
         client_id (Optional[int]): ID of the client.
         connected_server (Optional[str]): Server to which the client is connected.
     """
@@ -137,16 +137,7 @@ class MetaTrader5Ext:
 
     def _initialize_ea_client(self, config: MetaTrader5ExtConfig):
         self._is_stream = config.ea_client.enable_stream
-        self._ea_config = EAClientConfig(
-            host=config.ea_client.host,
-            rest_port=config.ea_client.rest_port,
-            stream_port=config.ea_client.stream_port,
-            encoding=config.ea_client.encoding,
-            use_socket=config.ea_client.use_socket,
-            enable_stream=config.ea_client.enable_stream,
-            callback=config.ea_client.callback,
-            debug=config.ea_client.debug,
-        )
+        self._ea_config = replace(config.ea_client)
         return EAClient(config=self._ea_config)
 
     def is_connected(self) -> bool:
@@ -253,7 +244,7 @@ class MetaTrader5Ext:
                 TERMINAL_CONNECT_FAIL = self.get_error()
                 raise TerminalError(TERMINAL_CONNECT_FAIL)
 
-            self.connection_time = datetime.now(timezone.utc).timestamp()
+            self.connection_time = now_ms()
             self.set_conn_state(MetaTrader5Ext.CONNECTED)
             self._terminal_version = self._mt5.version()
             if self._terminal_version is None:
@@ -339,7 +330,9 @@ class MetaTrader5Ext:
             **kwargs: Additional arguments for the callback.
         """
         if self._ea_client:
-            self._ea_client.start_stream(callback)
+            self._ea_client.subscribe_stream(symbols)
+            if not self._ea_client.running:
+                self._ea_client.start_stream(callback)
             self.logger.info(f"Subscribed to symbols: {symbols} with req_id: {req_id}")
 
     def unsubscribe(self, req_id: str, symbols: List[str]):
@@ -351,7 +344,9 @@ class MetaTrader5Ext:
             symbols (List[str]): List of symbols to unsubscribe from.
         """
         if self._ea_client:
-            self._ea_client.stop_stream()
+            self._ea_client.unsubscribe_stream(symbols)
+            if not self._ea_client.stream_subscriptions:
+                self._ea_client.stop_stream()
             self.logger.info(
                 f"Unsubscribed from symbols: {symbols} with req_id: {req_id}"
             )
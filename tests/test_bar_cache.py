@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+from metatrader5ext.ea import RATE_DTYPE, ReferenceEAServer
+from metatrader5ext.ea.bar_cache import BarCache
+from metatrader5ext.ea.commands import COMMANDS
+from test_client import make_client
+
+M1 = 1
+
+
+def make_rates(times, close=1.0):
+    rates = np.zeros(len(times), dtype=RATE_DTYPE)
+    rates['time'] = times
+    rates['close'] = close
+    return rates
+
+
+def test_merge_replaces_forming_bar_and_appends():
+    cache = BarCache()
+    cache.merge("EURUSD", M1, make_rates(range(0, 600, 60)), limit=10)
+    series = cache.merge("EURUSD", M1, make_rates([540, 600, 660], close=2.0), limit=10)
+    assert series.size == 12 and series.last_time == 660
+    assert list(series.bars['close'][-4:]) == [1.0, 2.0, 2.0, 2.0]
+    assert np.all(np.diff(series.bars['time']) == 60)
+
+
+def test_series_is_trimmed_to_its_limit():
+    cache = BarCache()
+    series = cache.merge("EURUSD", M1, make_rates(range(0, 300, 60)), limit=5)
+    series = cache.merge("EURUSD", M1, make_rates(range(300, 960, 60)), limit=5)
+    assert series.size == 5 and series.bars['time'][0] == 660
+
+
+def test_least_recently_used_series_is_evicted():
+    cache = BarCache(memory_budget=2 * 256 * RATE_DTYPE.itemsize)
+    for symbol in ("EURUSD", "GBPUSD"):
+        cache.merge(symbol, M1, make_rates([0]))
+    cache.get("EURUSD", M1)
+    cache.merge("USDJPY", M1, make_rates([0]))
+    assert cache.get("GBPUSD", M1) is None and cache.get("EURUSD", M1) is not None
+    assert cache.evictions == 1 and len(cache) == 2
+
+
+@pytest.mark.asyncio
+async def test_client_fetches_only_new_bars():
+    async with ReferenceEAServer() as server:
+        client = make_client(server, bar_cache_bytes=2 ** 20)
+        bars = await client.get_last_x_bars_from_now("EURUSD", M1, 500, as_array=True)
+        assert len(bars) == 500 and client.bar_cache.misses == 1
+
+        server.now += 5 * 60
+        requests = server.requests
+        bars = await client.get_last_x_bars_from_now("EURUSD", M1, 500, as_array=True)
+        assert server.requests - requests == 3
+        fresh = await client._execute(COMMANDS["get_last_x_bars_from_now"], "EURUSD", M1, 500, as_array=True)
+        assert np.array_equal(bars, fresh)
+        assert client.bar_cache.hits == 1
+
+        bar = await client.get_actual_bar_info("EURUSD", M1)
+        series = client.bar_cache.get("EURUSD", M1)
+        assert series.last_time * 1000 == bar['date'] and series.size == 505
+        await client.close()
+
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+from metatrader5ext.ea import POSITION_DTYPE, RATE_DTYPE, TICK_DTYPE, Framing, ReferenceEAServer, WireFormat
+from metatrader5ext.ea.binary import BINARY_SUB_COMMAND, decode_binary_reply, encode_binary_reply
+from metatrader5ext.ea.commands import COMMANDS
+from metatrader5ext.ea.utils import BadMessage
+from test_client import make_client
+
+
+def test_binary_reply_round_trip_without_copy():
+    ticks = np.zeros(3, dtype=TICK_DTYPE)
+    ticks['bid'] = [1.1234567891, 1.1, 1.2]
+    payload = encode_binary_reply('F021', ticks)
+    decoded = decode_binary_reply(payload, 'F021', TICK_DTYPE)
+    assert np.array_equal(decoded, ticks)
+    assert not decoded.flags.owndata
+    assert decode_binary_reply(b'F021^1^ERROR', 'F021', TICK_DTYPE) is None
+    with pytest.raises(BadMessage):
+        decode_binary_reply(payload[:-1], 'F021', TICK_DTYPE)
+    assert COMMANDS['get_last_x_bars_from_now'].encode_bytes(('EURUSD', 16385, 10), BINARY_SUB_COMMAND) == b'F042^B5^EURUSD^16385^0^10'
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("framing", [Framing.NONE, Framing.LENGTH_PREFIX])
+async def test_binary_arrays_match_text_arrays(framing):
+    async with ReferenceEAServer(framing=framing) as server:
+        text = make_client(server)
+        binary = make_client(server, wire_format=WireFormat.BINARY)
+
+        ticks = await binary.get_last_x_ticks_from_now("EURUSD", 200, as_array=True)
+        assert binary.wire_format == WireFormat.BINARY
+        expected = await text.get_last_x_ticks_from_now("EURUSD", 200, as_array=True)
+        assert ticks.dtype == TICK_DTYPE
+        assert np.array_equal(ticks['time_msc'], expected['time_msc'])
+        assert np.allclose(ticks['bid'], expected['bid'], atol=1e-5)
+
+        rates = await binary.get_last_x_bars_from_now("EURUSD", 16385, 20, as_array=True)
+        assert rates.dtype == RATE_DTYPE
+        assert np.array_equal(rates['time'], (await text.get_last_x_bars_from_now("EURUSD", 16385, 20, as_array=True))['time'])
+
+        positions = await binary.get_all_open_positions(as_array=True)
+        assert positions.dtype == POSITION_DTYPE
+        expected = await text.get_all_open_positions(as_array=True)
+        assert positions['symbol'].tolist() == expected['symbol'].tolist() == [symbol.encode() for symbol in server.symbols]
+        assert np.allclose(positions['volume'], expected['volume'])
+        await text.close()
+        await binary.close()
+
+
+@pytest.mark.asyncio
+async def test_binary_falls_back_to_text():
+    async with ReferenceEAServer(binary=False) as server:
+        client = make_client(server, wire_format=WireFormat.BINARY)
+        ticks = await client.get_last_x_ticks_from_now("EURUSD", 10, as_array=True)
+        assert client.wire_format == WireFormat.TEXT
+        assert len(ticks) == 10 and ticks.dtype == TICK_DTYPE
+
+    async with ReferenceEAServer(framing=Framing.TERMINATOR) as server:
+        client = make_client(server, wire_format=WireFormat.BINARY)
+        assert await client.negotiate() == {"PAGED"} and client.wire_format == WireFormat.TEXT
+        await client.close()
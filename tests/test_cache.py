@@ -0,0 +1,40 @@
+import pytest
+from metatrader5ext.ea import ReferenceEAServer
+from metatrader5ext.ea.cache import TTLCache
+from test_client import make_client
+
+
+def test_ttl_cache_expires_and_evicts():
+    now = [0.0]
+    cache = TTLCache(2, clock=lambda: now[0])
+    cache.set("a", 1, ttl=10)
+    cache.set("b", 2, ttl=1)
+    assert cache.get("a") == (True, 1)
+    cache.set("c", 3, ttl=20)
+    assert cache.get("b") == (False, None) and cache.evictions == 1
+    now[0] = 10.0
+    assert cache.get("a") == (False, None) and cache.expirations == 1
+    assert cache.get("c") == (True, 3)
+    assert (cache.hits, cache.misses) == (2, 2)
+    assert cache.invalidate(lambda key: key == "c") == 1 and len(cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_client_caches_slow_changing_replies():
+    async with ReferenceEAServer() as server:
+        client = make_client(server, cache_size=16, cache_ttls={"get_dynamic_account_info": 5.0})
+        info = await client.get_instrument_info("EURUSD")
+        info["digits"] = -1
+        assert (await client.get_instrument_info("EURUSD"))["digits"] == 5
+        await client.get_instrument_info("GBPUSD")
+        await client.get_dynamic_account_info()
+        await client.get_dynamic_account_info()
+        await client.get_last_tick_info("EURUSD")
+        await client.get_last_tick_info("EURUSD")
+        assert server.requests == 5
+        assert (client.cache.hits, client.cache.misses) == (2, 3)
+
+        assert client.invalidate_cache("get_instrument_info", "EURUSD") == 1
+        await client.get_instrument_info("EURUSD")
+        assert server.requests == 6
+        assert client.invalidate_cache() == 3
@@ -0,0 +1,59 @@
+import asyncio
+import pytest
+from metatrader5ext.ea import EAClient, EAClientConfig, Framing, ReferenceEAServer
+
+
+def make_client(server: ReferenceEAServer, **kwargs) -> EAClient:
+    return EAClient(EAClientConfig(rest_port=server.rest_port, stream_port=server.stream_port, framing=server.framing, **kwargs))
+
+
+@pytest.mark.asyncio
+async def test_client_against_reference_ea():
+    async with ReferenceEAServer() as server:
+        client = make_client(server)
+        assert await client.check_connection()
+        tick = await client.get_last_tick_info("EURUSD")
+        assert tick["instrument"] == "EURUSD"
+        assert tick["ask"] > tick["bid"]
+        positions = await client.get_all_open_positions()
+        assert [p["instrument"] for p in positions] == server.symbols
+        await client.close()
+
+
+@pytest.mark.asyncio
+async def test_multiplexed_requests_share_one_socket():
+    async with ReferenceEAServer(framing=Framing.TERMINATOR, latency=0.05) as server:
+        client = make_client(server, multiplex=True)
+        symbols = server.symbols * 17
+        ticks = await asyncio.gather(*(client.get_last_tick_info(symbol) for symbol in symbols))
+        assert [tick["instrument"] for tick in ticks] == symbols
+        assert server.connections == 1
+        assert server.max_concurrent > 1
+        await client.close()
+
+
+@pytest.mark.asyncio
+async def test_multiplexed_replies_matched_out_of_order():
+    async with ReferenceEAServer(framing=Framing.LENGTH_PREFIX) as server:
+        server.command_latency["F001"] = 0.1
+        client = make_client(server, multiplex=True)
+        completed = []
+
+        async def track(name, coro):
+            result = await coro
+            completed.append(name)
+            return result
+
+        static, dynamic = await asyncio.gather(
+            track("static", client.get_static_account_info()),
+            track("dynamic", client.get_dynamic_account_info()),
+        )
+        assert completed == ["dynamic", "static"]
+        assert static["company"] == "QuantsPub"
+        assert dynamic["balance"] == "10000.00"
+        await client.close()
+
+
+def test_multiplex_requires_framing():
+    with pytest.raises(ValueError):
+        EAClient(EAClientConfig(multiplex=True))
@@ -0,0 +1,31 @@
+import asyncio
+import pytest
+from metatrader5ext.ea import ReferenceEAServer
+from test_client import make_client
+
+
+@pytest.mark.asyncio
+async def test_identical_reads_share_one_round_trip():
+    async with ReferenceEAServer(latency=0.05) as server:
+        client = make_client(server)
+        results = await asyncio.gather(*(client.get_dynamic_account_info() for _ in range(10)), client.get_last_tick_info("EURUSD"))
+        assert server.requests == 2 and client.coalesced == 9
+        assert all(result == results[0] for result in results[:10]) and results[0] is not results[1]
+
+        await asyncio.gather(*(client.close_position_by_ticket(1) for _ in range(3)))
+        assert server.requests == 5
+        await client.close()
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_shared_request():
+    async with ReferenceEAServer(latency=0.05) as server:
+        client = make_client(server)
+        first = asyncio.ensure_future(client.get_instruments())
+        await asyncio.sleep(0.01)
+        second = asyncio.ensure_future(client.get_instruments())
+        await asyncio.sleep(0.01)
+        first.cancel()
+        assert await second == server.symbols
+        assert server.requests == 1 and not client._in_flight
+        await client.close()
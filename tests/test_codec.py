@@ -0,0 +1,66 @@
+import importlib.util
+import sys
+import numpy as np
+import pytest
+from metatrader5ext.ea import codec
+from metatrader5ext.ea.utils import BadMessage
+
+
+def load_pure_codec(monkeypatch):
+    """Loads a copy of the codec module with the compiled extension hidden."""
+    monkeypatch.setitem(sys.modules, "metatrader5ext.ea._codec", None)
+    spec = importlib.util.find_spec("metatrader5ext.ea.codec")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    assert not module.COMPILED
+    return module
+
+
+@pytest.fixture(params=["pure", "compiled"])
+def implementation(request, monkeypatch):
+    if request.param == "pure":
+        return load_pure_codec(monkeypatch)
+    if not codec.COMPILED:
+        pytest.skip("codec extension not built, run build.py")
+    return codec
+
+
+def test_messages(implementation):
+    assert implementation.make_message("F020", "2", ["EURUSD"]) == "F020^2^EURUSD"
+    assert implementation.make_message("F000", "1", []) == "F000^1^"
+    assert implementation.parse_response_message("F021^1^a$1^b$2^^") == {"command": "F021", "sub_command": "1", "data": ["a$1", "b$2"]}
+    assert implementation.parse_response_message("F011^1^") == {"command": "F011", "sub_command": "1", "data": []}
+    with pytest.raises(ValueError):
+        implementation.parse_response_message("F021^1^a^^b")
+    with pytest.raises(ValueError):
+        implementation.parse_response_message("F021")
+    assert implementation.split_records(["1$a", "2$b$c"]) == [["1", "a"], ["2", "b", "c"]]
+
+
+def test_parse_record_matrix(implementation):
+    values = implementation.parse_record_matrix(["1700000000123$1.10002$-0.5", "1700000000124$1e-3$7"], 3)
+    assert values.dtype == np.float64
+    assert values.tolist() == [[1700000000123, 1.10002, -0.5], [1700000000124, 0.001, 7]]
+    assert implementation.parse_record_matrix([], 3).shape == (0, 3)
+    for records in (["1$2"], ["1$2$3$4"], ["1$x$3"], ["1$2$3", "4$5"]):
+        with pytest.raises(BadMessage):
+            implementation.parse_record_matrix(records, 3)
+
+
+@pytest.mark.parametrize("records", [
+    ["0x10$2$3"], ["-0X1p3$2$3"], ["1$2$3 "], [" 1 $\t2\n$ 3"], ["1\v$2\f$3\r"], ["inf$-Infinity$nan"], ["nan(1)$+inf$-0"],
+    ["infin$2$3"], ["1$2$3\x00"], ["1$\x002$3"], ["1$2$3$"], ["  $2$3"], ["1$$3"], ["1$2", "3$4$5$6"], ["1e$2$3"], ["1_0$2$3"],
+])
+def test_parse_record_matrix_parity(records, monkeypatch):
+    if not codec.COMPILED:
+        pytest.skip("codec extension not built, run build.py")
+    results = []
+    for implementation in (load_pure_codec(monkeypatch), codec):
+        try:
+            results.append(implementation.parse_record_matrix(records, 3))
+        except BadMessage:
+            results.append(None)
+    pure, compiled = results
+    assert (pure is None) == (compiled is None)
+    if pure is not None:
+        assert np.array_equal(pure, compiled, equal_nan=True)
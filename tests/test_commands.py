@@ -0,0 +1,44 @@
+import inspect
+from datetime import datetime
+from metatrader5ext.ea import EAClient
+from metatrader5ext.ea.commands import COMMANDS, CommandSpec, ResponseKind
+
+
+def test_every_client_command_is_registered():
+    methods = {name for name, _ in inspect.getmembers(EAClient, inspect.iscoroutinefunction) if not name.startswith("_")}
+    assert set(COMMANDS) <= methods
+    helpers = ("send_message", "send_encoded", "send_raw_message", "negotiate", "sync_broker_offset", "close",
+               "get_last_ticks", "get_instruments_info", "get_bars")
+    assert {name for name in methods if name not in helpers} <= set(COMMANDS)
+
+
+def test_encoders():
+    assert COMMANDS["check_connection"].encode(()) == "F000^1^"
+    assert COMMANDS["get_last_x_bars_from_now"].encode(("EURUSD", 16385, 10)) == "F042^5^EURUSD^16385^0^10"
+    assert COMMANDS["get_specific_bar"].encode((["EURUSD", "GBPUSD"], 1, 16408)) == "F045^3^EURUSD$GBPUSD^1^16408"
+    assert COMMANDS["switch_auto_trading_on_off"].encode((False,)) == "F084^2^Off"
+    window = COMMANDS["get_all_closed_positions_within_window"].encode((datetime(2024, 1, 2, 3, 4, 5), datetime(2024, 2, 1)))
+    assert window == "F062^3^2024/01/02/03/04/05^2024/02/01/00/00/00"
+
+
+def test_byte_encoders_cache_hot_requests():
+    spec = CommandSpec("get thing", "F998", "2", (str, str), ResponseKind.VALUE)
+    assert spec.encode_bytes(("EURUSD", 1)) == b"F998^2^EURUSD^1"
+    assert spec.encode_bytes(("EURUSD", 1)) == b"F998^2^EURUSD^1"
+    assert spec.encode_bytes.cache_info().hits == 1
+    assert spec.encode_bytes(("EURUSD", 1.0)) == b"F998^2^EURUSD^1.0"
+    assert spec.encode_bytes(("EURUSD", 1), "ZB") == b"F998^ZB2^EURUSD^1"
+    assert COMMANDS["get_specific_bar"].encode_bytes((["EURUSD", "GBPUSD"], 1, 16408)) == b"F045^3^EURUSD$GBPUSD^1^16408"
+    assert COMMANDS["check_connection"].encode_bytes(()) == b"F000^1^"
+
+
+def test_generated_record_decoders():
+    spec = CommandSpec("get thing", "F999", "1", (str,), ResponseKind.RECORDS,
+                       fields=(("ticket", int), ("instrument", None), ("price", float)))
+    assert spec.decode(["1$EURUSD$1.5", "2$GBPUSD$1.25"], ()) == [
+        {"ticket": 1, "instrument": "EURUSD", "price": 1.5},
+        {"ticket": 2, "instrument": "GBPUSD", "price": 1.25},
+    ]
+    tick = COMMANDS["get_instrument_info"].decode(["5", "100", "0.01", "0.01", "0.00001", "0.00001", "1", "-1", "1", "0", "100000"], ("EURUSD",))
+    assert tick["instrument"] == "EURUSD"
+    assert tick["digits"] == 5 and tick["contract_size"] == 100000.0
@@ -0,0 +1,53 @@
+import zlib
+import pytest
+from metatrader5ext.ea import Framing, ReferenceEAServer, WireFormat
+from metatrader5ext.ea.compression import COMPRESSED_PREFIX, Inflater, compress_reply, decompress_reply
+from metatrader5ext.ea.utils import BadMessage
+from test_client import make_client
+
+
+def test_inflater_decompresses_incrementally_within_limit():
+    payload = b"F063^1^" + b"$".join(b"400000$EURUSD$500000$sell$7$0.10$1.10000" for _ in range(2000))
+    compressed = compress_reply(payload)
+    assert compressed.startswith(COMPRESSED_PREFIX) and len(compressed) < len(payload) // 10
+    assert compress_reply(b"F000^1^OK") == b"F000^1^OK"
+
+    inflater = Inflater(len(payload))
+    body = compressed[len(COMPRESSED_PREFIX):]
+    for start in range(0, len(body), 100):
+        inflater.feed(body[start:start + 100])
+    assert inflater.finish() == payload
+
+    with pytest.raises(BadMessage):
+        decompress_reply(compressed, len(payload) - 1)
+    with pytest.raises(BadMessage):
+        decompress_reply(compressed[:-10], len(payload))
+    with pytest.raises(BadMessage):
+        decompress_reply(COMPRESSED_PREFIX + b"not zlib", len(payload))
+    assert decompress_reply(b"F000^1^OK", 10) == b"F000^1^OK"
+    assert zlib.decompress(body) == payload
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("framing", [Framing.NONE, Framing.LENGTH_PREFIX])
+async def test_compressed_replies_match_plain_replies(framing):
+    async with ReferenceEAServer(framing=framing, symbols=[f"SYM{i}" for i in range(100)]) as server:
+        assert server.handle_request("F021^Z4^EURUSD^2000").startswith(COMPRESSED_PREFIX)
+        plain = make_client(server)
+        compressed = make_client(server, compression=True, wire_format=WireFormat.BINARY)
+
+        assert await compressed.get_all_closed_positions() == await plain.get_all_closed_positions()
+        assert compressed.capabilities == {"ZLIB", "BINARY", "PAGED"}
+        assert await compressed.get_last_x_ticks_from_now("EURUSD", 2000) == await plain.get_last_x_ticks_from_now("EURUSD", 2000)
+        ticks = await compressed.get_last_x_ticks_from_now("EURUSD", 2000, as_array=True)
+        assert ticks["time_msc"].tolist() == (await plain.get_last_x_ticks_from_now("EURUSD", 2000, as_array=True))["time_msc"].tolist()
+        await plain.close()
+        await compressed.close()
+
+
+@pytest.mark.asyncio
+async def test_compression_falls_back_without_ea_support():
+    async with ReferenceEAServer(compression=False) as server:
+        client = make_client(server, compression=True)
+        assert len(await client.get_last_x_ticks_from_now("EURUSD", 100)) == 100
+        assert client.capabilities == {"PAGED"}
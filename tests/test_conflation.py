@@ -0,0 +1,74 @@
+import socket
+import threading
+import time
+from metatrader5ext.ea import Connection, ConflatingSubscriber, Framing, StreamTick, parse_stream_tick
+from metatrader5ext.ea.symbols import SYMBOLS
+
+
+def test_parse_stream_tick_accepts_both_layouts():
+    assert parse_stream_tick("F020^6^1700000000^1.1^1.2^0.0^5", "EURUSD") == StreamTick("EURUSD", 1700000000000, 1.1, 1.2, 0.0, 5)
+    assert parse_stream_tick("F020^6^GBPUSD^1700000000^1.3^1.4^0.0^7") == StreamTick("GBPUSD", 1700000000000, 1.3, 1.4, 0.0, 7)
+    assert parse_stream_tick("F020^1^ERROR") is None
+    assert parse_stream_tick("F021^6^1700000000^1.1^1.2^1.0^1.2^5") is None
+
+
+def test_subscriber_keeps_latest_tick_per_symbol():
+    subscriber = ConflatingSubscriber(max_symbols=2)
+    for i in range(100):
+        subscriber.update(f"F020^6^EURUSD^{i}^1.1^1.2^0.0^0")
+    subscriber.update("F020^6^GBPUSD^5^1.3^1.4^0.0^0")
+    assert subscriber.wait(0) == {"EURUSD", "GBPUSD"}
+    assert subscriber.latest("EURUSD").time == 99_000
+    assert subscriber.conflated == 99
+    assert subscriber.wait(0) == set()
+
+    assert not subscriber.update("F020^6^USDJPY^1^150.0^150.1^0.0^0")
+    assert subscriber.skipped == 1
+    assert len(subscriber) == 2
+
+
+def test_subscriber_table_does_not_grow_with_symbol_ids():
+    SYMBOLS.intern_many([f"CONFLATED{i}" for i in range(500)])
+    subscriber = ConflatingSubscriber(max_symbols=2)
+    subscriber.update("F020^6^CONFLATED499^1^1.1^1.2^0.0^0")
+    subscriber.update("F020^6^CONFLATED498^2^1.3^1.4^0.0^0")
+    assert subscriber.wait_ids(0) == {SYMBOLS.id("CONFLATED499"), SYMBOLS.id("CONFLATED498")}
+    assert {symbol: tick.time for symbol, tick in subscriber.snapshot().items()} == {"CONFLATED499": 1000, "CONFLATED498": 2000}
+    assert len(subscriber._messages) == 2
+
+
+def test_connection_delivers_changed_symbols():
+    server = socket.create_server(("127.0.0.1", 0))
+    port = server.getsockname()[1]
+    messages = [f"F020^6^{'EURUSD' if i % 2 else 'GBPUSD'}^{i}^1.1^1.2^0.0^0" for i in range(200)]
+
+    def serve():
+        conn, _ = server.accept()
+        conn.sendall(b"".join(m.encode() + b"\r\n" for m in messages))
+        conn.close()
+
+    threading.Thread(target=serve, daemon=True).start()
+    latest = {}
+    calls = []
+    done = threading.Event()
+
+    def callback(ticks):
+        # A slow consumer: the first delivery blocks until the reader has stored every tick
+        if not calls:
+            deadline = time.monotonic() + 2
+            while connection.stream_subscriber.updates < len(messages) and time.monotonic() < deadline:
+                time.sleep(0.005)
+        calls.append(ticks)
+        latest.update(ticks)
+        if latest.get("EURUSD", StreamTick("", 0, 0, 0, 0, 0)).time == 199_000 and latest.get("GBPUSD", StreamTick("", 0, 0, 0, 0, 0)).time == 198_000:
+            done.set()
+
+    connection = Connection(stream_port=port, framing=Framing.TERMINATOR, stream_conflation_slots=16)
+    try:
+        connection.start_stream(callback)
+        assert done.wait(2)
+        assert connection.stream_subscriber.updates == len(messages)
+        assert len(calls) <= 3 and connection.stream_subscriber.conflated > 0
+    finally:
+        connection.stop_stream()
+        server.close()
@@ -0,0 +1,278 @@
+import asyncio
+import socket
+import pytest
+from metatrader5ext.ea import Connection, Framing, FrameBuffer, ReferenceEAServer, StreamDecoder
+from metatrader5ext.ea.utils import BadMessage
+
+
+async def _start_server(keep_alive: bool, payload: str = "OK"):
+    """
+    Starts a minimal EA stand-in answering every request with `<command>^1^<payload>`.
+
+    With keep_alive the server expects and sends `\\r\\n` terminated messages and serves
+    many requests per socket, otherwise it behaves like the EA: one reply, then close.
+    """
+    stats = {"connections": 0}
+
+    async def handle(reader, writer):
+        stats["connections"] += 1
+        while True:
+            request = await (reader.readuntil(b"\r\n") if keep_alive else reader.read(1024))
+            if not request:
+                break
+            command = request.decode().split("^")[0]
+            writer.write(f"{command}^1^{payload}".encode() + (b"\r\n" if keep_alive else b""))
+            await writer.drain()
+            if not keep_alive:
+                break
+        writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    return server, port, stats
+
+
+@pytest.mark.asyncio
+async def test_send_message_reuses_pooled_socket():
+    server, port, stats = await _start_server(keep_alive=True)
+    async with server:
+        connection = Connection(rest_port=port, framing=Framing.TERMINATOR)
+        for _ in range(5):
+            assert await connection.send_message("F000^1^") == "F000^1^OK"
+        assert stats["connections"] == 1
+        assert connection.pool.reused == 4
+        await connection.close()
+
+
+@pytest.mark.asyncio
+async def test_send_message_recovers_when_server_closes_socket():
+    server, port, stats = await _start_server(keep_alive=False)
+    async with server:
+        connection = Connection(rest_port=port)
+        for _ in range(3):
+            assert await connection.send_message("F000^1^") == "F000^1^OK"
+        assert stats["connections"] == 3
+        await connection.close()
+
+
+@pytest.mark.asyncio
+async def test_pool_limits_open_sockets():
+    server, port, stats = await _start_server(keep_alive=True)
+    async with server:
+        connection = Connection(rest_port=port, pool_size=2, framing=Framing.TERMINATOR)
+        responses = await asyncio.gather(*(connection.send_message("F000^1^") for _ in range(10)))
+        assert responses == ["F000^1^OK"] * 10
+        assert connection.pool.created <= 2
+        await connection.close()
+
+
+@pytest.mark.asyncio
+async def test_pool_evicts_idle_sockets():
+    server, port, stats = await _start_server(keep_alive=True)
+    async with server:
+        connection = Connection(rest_port=port, pool_idle_timeout=0.0, framing=Framing.TERMINATOR)
+        await connection.send_message("F000^1^")
+        await asyncio.sleep(0.01)
+        await connection.send_message("F000^1^")
+        assert stats["connections"] == 2
+        await connection.close()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("keep_alive, framing", [(False, Framing.NONE), (True, Framing.TERMINATOR)])
+async def test_send_message_reads_large_reply(keep_alive, framing):
+    ticks = "^".join(f"{1700000000 + i}$1.10001$1.10000$0.0$0" for i in range(2000))
+    server, port, stats = await _start_server(keep_alive=keep_alive, payload=ticks)
+    async with server:
+        connection = Connection(rest_port=port, framing=framing)
+        response = await connection.send_message("F021^4^EURUSD^2000")
+        assert response == f"F021^1^{ticks}"
+        assert len(connection.parse_response_message(response)["data"]) == 2000
+        await connection.close()
+
+
+def test_frame_buffer_splits_length_prefixed_messages():
+    buffer = FrameBuffer(Framing.LENGTH_PREFIX, initial_size=8)
+    stream = b"".join(len(m).to_bytes(4, "big") + m for m in (b"F020^6^a", b"F020^6^bc", b"F021^6^" + b"x" * 64))
+    frames = []
+    for i in range(0, len(stream), 5):
+        buffer.feed(stream[i:i + 5])
+        while (frame := buffer.next_frame()) is not None:
+            frames.append(bytes(frame))
+    assert frames == [b"F020^6^a", b"F020^6^bc", b"F021^6^" + b"x" * 64]
+    assert len(buffer) == 0
+
+
+def test_frame_buffer_enforces_max_length():
+    buffer = FrameBuffer(Framing.TERMINATOR, max_length=16)
+    buffer.feed(b"F021^4^" + b"9" * 32)
+    with pytest.raises(BadMessage):
+        buffer.next_frame()
+
+
+def test_stream_decoder_reassembles_split_and_batched_messages():
+    left, right = socket.socketpair()
+    try:
+        decoder = StreamDecoder(Framing.TERMINATOR, recv_size=16)
+        left.sendall(b"F020^6^1$1.1\r\nF020^6^2$1.2\r\nF0")
+        left.sendall(b"21^6^3$1.3$1.4$1.0$1.2$7\r\n")
+        left.close()
+        messages = []
+        while decoder.recv(right):
+            messages.extend(decoder.messages())
+        assert messages == ["F020^6^1$1.1", "F020^6^2$1.2", "F021^6^3$1.3$1.4$1.0$1.2$7"]
+    finally:
+        right.close()
+
+
+def test_stream_decoder_splits_unframed_messages():
+    left, right = socket.socketpair()
+    try:
+        decoder = StreamDecoder(Framing.NONE)
+        left.sendall(b"F020^6^1700000000^1.1^1.2^0.0^0F020^6^1700000001^1.1^1.2^0.0^0F02")
+        decoder.recv(right)
+        assert list(decoder.messages()) == ["F020^6^1700000000^1.1^1.2^0.0^0"]
+        left.sendall(b"1^6^1700000000^1.1^1.2^1.0^1.1^7")
+        while not decoder.idle(right):
+            decoder.recv(right)
+        assert list(decoder.messages(final=True)) == ["F020^6^1700000001^1.1^1.2^0.0^0", "F021^6^1700000000^1.1^1.2^1.0^1.1^7"]
+        assert not decoder.idle(right) and not len(decoder.buffer)
+    finally:
+        left.close()
+        right.close()
+
+
+async def _start_stream_server(messages):
+    """Starts a stream server that pushes `\\r\\n` terminated messages, then closes."""
+    async def handle(reader, writer):
+        writer.write(b"".join(m.encode() + b"\r\n" for m in messages))
+        await writer.drain()
+        writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    return server, server.sockets[0].getsockname()[1]
+
+
+@pytest.mark.asyncio
+async def test_stream_async_iterator():
+    messages = [f"F020^6^{1700000000 + i}$1.1$1.2$0.0$0" for i in range(100)]
+    server, port = await _start_stream_server(messages)
+    async with server:
+        connection = Connection(stream_port=port, framing=Framing.TERMINATOR)
+        received = [message async for message in connection.stream()]
+        assert received == messages
+        assert not connection.running
+
+
+@pytest.mark.asyncio
+async def test_unframed_stream_async_iterator():
+    messages = [f"F020^6^{1700000000 + i}^1.1^1.2^0.0^0" for i in range(100)]
+
+    async def handle(reader, writer):
+        writer.write("".join(messages[:50]).encode())
+        await writer.drain()
+        await asyncio.sleep(0.05)
+        writer.write("".join(messages[50:]).encode())
+        await writer.drain()
+        writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    async with server:
+        connection = Connection(stream_port=server.sockets[0].getsockname()[1])
+        assert [message async for message in connection.stream()] == messages
+
+
+@pytest.mark.asyncio
+async def test_start_stream_async_awaits_coroutine_callback():
+    messages = ["F020^6^1$1.1", "F020^6^2$1.2"]
+    server, port = await _start_stream_server(messages)
+    async with server:
+        connection = Connection(stream_port=port, framing=Framing.TERMINATOR)
+        received = []
+
+        async def callback(message):
+            await asyncio.sleep(0)
+            received.append(message)
+
+        await connection.start_stream_async(callback)
+        assert received == messages
+
+
+@pytest.mark.asyncio
+async def test_stream_reconnects_and_resubscribes():
+    async with ReferenceEAServer(framing=Framing.TERMINATOR) as server:
+        connection = Connection(stream_port=server.stream_port, framing=Framing.TERMINATOR, stream_reconnect_delay=0.01)
+        received = []
+        connection.subscribe_stream(["EURUSD", "GBPUSD"])
+        connection.start_stream(received.append)
+        try:
+            await _wait_for(lambda: len(server.stream_clients) == 1 and len(server.stream_requests) == 2)
+            server.drop_stream_clients()
+            await _wait_for(lambda: connection.stream_reconnects == 1 and len(server.stream_clients) == 1)
+            await server.broadcast(server.tick_message("EURUSD"))
+            await _wait_for(lambda: received)
+            assert connection.running
+            assert server.stream_requests == ["F020^2^EURUSD", "F020^2^GBPUSD"] * 2
+        finally:
+            connection.stop_stream()
+
+
+@pytest.mark.asyncio
+async def test_stream_reconnects_when_idle():
+    async with ReferenceEAServer(framing=Framing.TERMINATOR) as server:
+        connection = Connection(stream_port=server.stream_port, framing=Framing.TERMINATOR,
+                                stream_reconnect_delay=0.01, stream_idle_timeout=0.05)
+        connection.start_stream()
+        try:
+            await _wait_for(lambda: connection.stream_reconnects >= 2)
+            assert connection.running
+        finally:
+            connection.stop_stream()
+
+
+@pytest.mark.asyncio
+async def test_stream_survives_bad_data_and_callback_errors():
+    writers = []
+
+    async def handle(reader, writer):
+        writers.append(writer)
+        writer.write(b"\xff\xfe\r\n" if len(writers) == 1 else b"F020^6^1$1.1\r\nF020^6^2$1.2\r\n")
+        await writer.drain()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    async with server:
+        connection = Connection(stream_port=server.sockets[0].getsockname()[1], framing=Framing.TERMINATOR, stream_reconnect_delay=0.01)
+        received = []
+
+        def callback(message):
+            received.append(message)
+            if len(received) == 1:
+                raise ValueError("callback error")
+
+        connection.start_stream(callback)
+        try:
+            await _wait_for(lambda: len(received) == 2)
+            assert connection.running and connection.stream_reconnects == 1
+        finally:
+            connection.stop_stream()
+            for writer in writers:
+                writer.close()
+
+
+@pytest.mark.asyncio
+async def test_stream_stops_running_without_reconnect():
+    server, port = await _start_stream_server(["F020^6^1$1.1"])
+    async with server:
+        connection = Connection(stream_port=port, framing=Framing.TERMINATOR, stream_reconnect=False)
+        received = []
+        connection.start_stream(received.append)
+        await _wait_for(lambda: not connection.running)
+        assert received == ["F020^6^1$1.1"]
+
+
+async def _wait_for(predicate, timeout=2.0):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not predicate():
+        assert loop.time() < deadline, "condition not met in time"
+        await asyncio.sleep(0.01)
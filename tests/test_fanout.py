@@ -0,0 +1,50 @@
+import asyncio
+import pytest
+from metatrader5ext.ea import ReferenceEAServer
+from metatrader5ext.ea.fanout import chunk_instruments, fan_out
+from test_client import make_client
+
+
+@pytest.mark.asyncio
+async def test_fan_out_limits_concurrency_and_captures_errors():
+    running = peak = 0
+
+    async def call(item):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.001)
+        running -= 1
+        if item == 3:
+            raise ValueError("bad item")
+        return None if item == 4 else item * 2
+
+    results, errors = await fan_out(call, range(20), 5)
+    assert peak == 5
+    assert list(results) == [item for item in range(20) if item not in (3, 4)]
+    assert set(errors) == {3, 4} and errors[3] == "bad item"
+
+
+def test_chunk_instruments():
+    chunks = chunk_instruments([f"SYMBOL{i:04d}" for i in range(1000)], max_length=100)
+    assert all(len("$".join(chunk)) <= 100 for chunk in chunks)
+    assert sum(chunks, []) == [f"SYMBOL{i:04d}" for i in range(1000)]
+
+
+@pytest.mark.asyncio
+async def test_batch_methods_return_columns():
+    symbols = [f"SYM{i:03d}" for i in range(300)]
+    async with ReferenceEAServer(symbols=symbols) as server:
+        client = make_client(server, batch_concurrency=8)
+        ticks = await client.get_last_ticks(symbols)
+        assert ticks.columns["instrument"] == symbols and not ticks.errors and len(ticks) == 300
+        assert server.max_concurrent <= 8
+
+        bars = await client.get_bars(symbols, 1, 16385)
+        assert bars.columns["instrument"] == symbols and not bars.errors
+        assert server.requests < 300 + 10
+
+        server.handlers["F003"] = lambda sub, params: "F999^1^UNKNOWN_SYMBOL" if params[0] == "SYM001" else "F003^1^5^1^1^1^0.00001^0.00001^1^0^0^0^100000"
+        info = await client.get_instruments_info(symbols[:3])
+        assert info.columns["instrument"] == ["SYM000", "SYM002"] and set(info.errors) == {"SYM001"}
+        await client.close()
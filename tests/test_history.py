@@ -0,0 +1,103 @@
+import asyncio
+import datetime
+import numpy as np
+import pytest
+from metatrader5ext.ea import EAClientConfig, ReferenceEAServer, SyncEAClient, WireFormat
+from metatrader5ext.ea.history import history_pages, trim_overlap
+from metatrader5ext.ea.parsers import TICK_DTYPE
+from metatrader5ext.metatrader5.MetaTrader5 import MetaTrader5
+from test_bar_cache import make_rates
+from test_client import make_client
+
+M1 = 1
+
+
+def test_history_pages_are_oldest_first():
+    assert history_pages(25, 10) == [(15, 10), (5, 10), (0, 5)]
+    assert history_pages(0, 10) == []
+
+
+def test_trim_overlap_drops_shifted_records():
+    previous = make_rates(range(0, 600, 60))
+    assert len(trim_overlap(make_rates(range(600, 900, 60)), previous)) == 5
+    trimmed = trim_overlap(make_rates(range(480, 780, 60)), previous)
+    assert list(trimmed['time']) == [600, 660, 720]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("wire_format", [WireFormat.TEXT, WireFormat.BINARY])
+async def test_iter_ticks_matches_one_request(wire_format):
+    async with ReferenceEAServer() as server:
+        client = make_client(server, wire_format=wire_format)
+        pages = [page async for page in client.iter_ticks("EURUSD", 2500, chunk_size=1000)]
+        assert [len(page) for page in pages] == [1000, 1000, 500]
+        ticks = await client.get_last_x_ticks_from_now("EURUSD", 2500, as_array=True)
+        assert np.array_equal(np.concatenate(pages), ticks)
+        await client.close()
+
+
+@pytest.mark.asyncio
+async def test_iter_ticks_falls_back_without_ea_support():
+    async with ReferenceEAServer(paging=False) as server:
+        client = make_client(server)
+        pages = [page async for page in client.iter_ticks("EURUSD", 2500, chunk_size=1000)]
+        assert [len(page) for page in pages] == [1000, 1000, 500]
+        ticks = await client.get_last_x_ticks_from_now("EURUSD", 2500, as_array=True)
+        assert np.array_equal(np.concatenate(pages), ticks)
+        assert server.requests == 3
+        await client.close()
+
+
+@pytest.mark.asyncio
+async def test_iter_bars_skips_bars_shifted_by_new_bars():
+    async with ReferenceEAServer() as server:
+        client = make_client(server)
+        pages = []
+        async for page in client.iter_bars("EURUSD", M1, 300, chunk_size=100, as_polars=True):
+            pages.append(page)
+            server.now += 60
+        times = np.concatenate([page["time"].to_numpy() for page in pages])
+        assert np.all(np.diff(times) == 60) and len(times) == 300
+        await client.close()
+
+
+@pytest.mark.asyncio
+async def test_sync_iteration_stops_early():
+    async with ReferenceEAServer(latency=0.01) as server:
+        config = EAClientConfig(rest_port=server.rest_port, stream_port=server.stream_port, framing=server.framing)
+
+        def run():
+            with SyncEAClient(config, timeout=5) as client:
+                for page in client.iter_ticks("EURUSD", 10_000, chunk_size=1000):
+                    return len(page)
+
+        assert await asyncio.to_thread(run) == 1000
+        assert server.requests <= 4
+
+
+class FakeTerminal:
+    """ copy_ticks_from / copy_ticks_range over a fixed tick history, copy_ticks_from starting at whole seconds like MT5. """
+    iter_ticks_range = MetaTrader5.iter_ticks_range
+
+    def __init__(self, ticks):
+        self.ticks = ticks
+
+    def copy_ticks_from(self, symbol, date_from, count, flags):
+        return self.ticks[self.ticks['time'] >= int(date_from.timestamp())][:count]
+
+    def copy_ticks_range(self, symbol, date_from, date_to, flags):
+        time_msc = self.ticks['time_msc']
+        return self.ticks[(time_msc >= int(date_from.timestamp() * 1000)) & (time_msc <= int(date_to.timestamp() * 1000))]
+
+
+def test_iter_ticks_range_pages_through_busy_seconds():
+    time_msc = [100_000 + 100 * i for i in range(5)] + [101_000 + 10 * i for i in range(7)] + [102_000, 102_500, 103_000, 104_000]
+    ticks = np.zeros(len(time_msc), dtype=TICK_DTYPE)
+    ticks['time_msc'] = time_msc
+    ticks['time'] = ticks['time_msc'] // 1000
+    ticks['bid'] = np.arange(len(ticks))
+    utc = datetime.timezone.utc
+    chunks = list(FakeTerminal(ticks).iter_ticks_range("EURUSD", datetime.datetime.fromtimestamp(100, utc),
+                                                       datetime.datetime.fromtimestamp(103, utc), 0, chunk_size=3))
+    assert all(len(chunk) <= 3 for chunk in chunks)
+    assert np.array_equal(np.concatenate(chunks), ticks[:-1])
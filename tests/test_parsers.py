@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+from metatrader5ext.ea import RATE_DTYPE, TICK_DTYPE, ReferenceEAServer, parse_rates, parse_ticks
+from metatrader5ext.ea.utils import BadMessage
+from test_client import make_client
+
+
+def test_parse_ticks_matches_copy_ticks_layout():
+    ticks = parse_ticks(["1700000000$1.10002$1.10000$0.00000$3", "1700000001$1.10004$1.10001$0.00000$0"])
+    assert ticks.dtype == TICK_DTYPE
+    assert ticks["time"].tolist() == [1700000000, 1700000001]
+    assert ticks["time_msc"].tolist() == [1700000000000, 1700000001000]
+    assert ticks["ask"].tolist() == [1.10002, 1.10004]
+    assert ticks["bid"].tolist() == [1.10000, 1.10001]
+    assert ticks["volume"].tolist() == [3, 0]
+
+
+def test_parse_rates_rejects_malformed_records():
+    assert len(parse_rates([])) == 0
+    with pytest.raises(BadMessage):
+        parse_rates(["1700000000$1.1$1.2$1.0$1.1"])
+    with pytest.raises(BadMessage):
+        parse_rates(["1700000000$1.1$1.2$x$1.1$5"])
+
+
+@pytest.mark.asyncio
+async def test_client_returns_arrays_matching_dict_records():
+    async with ReferenceEAServer() as server:
+        client = make_client(server)
+        ticks = await client.get_last_x_ticks_from_now("EURUSD", 50, as_array=True)
+        records = await client.get_last_x_ticks_from_now("EURUSD", 50)
+        assert ticks["time_msc"].tolist() == [r["date"] for r in records]
+        assert ticks["bid"].tolist() == [r["bid"] for r in records]
+
+        rates = await client.get_last_x_bars_from_now("EURUSD", 16385, 20, as_array=True)
+        assert rates.dtype == RATE_DTYPE
+        assert np.all(np.diff(rates["time"]) == 3600)
+
+        bars = await client.get_specific_bar(server.symbols, 1, 16385, as_array=True)
+        assert bars["symbol"].tolist() == server.symbols
+        assert (bars["high"] >= bars["low"]).all()
+        await client.close()
@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+from metatrader5ext.ea import RATE_DTYPE, PriceMode, ReferenceEAServer, WireFormat, from_points, to_points
+from test_client import make_client
+
+
+def test_points_round_trip_is_exact():
+    prices = np.array([1.10002, 1.1, 0.3 + 0.6])
+    points = to_points(prices, 5)
+    assert points.dtype == np.int64 and points.tolist() == [110002, 110000, 90000]
+    assert from_points(points, 5).tolist() == [1.10002, 1.1, 0.9]
+    assert to_points([150.123, 1.23456], np.array([3, 5])).tolist() == [150123, 123456]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("wire_format", [WireFormat.TEXT, WireFormat.BINARY])
+async def test_array_replies_in_points(wire_format):
+    async with ReferenceEAServer() as server:
+        floats = make_client(server)
+        points = make_client(server, price_mode=PriceMode.POINTS, wire_format=wire_format)
+
+        ticks = await points.get_last_x_ticks_from_now("USDJPY", 50, as_array=True)
+        assert ticks["bid"].dtype == np.int64
+        expected = await floats.get_last_x_ticks_from_now("USDJPY", 50, as_array=True)
+        assert ticks["bid"].tolist() == np.rint(expected["bid"] * 1000).astype(np.int64).tolist()
+        assert np.array_equal(ticks["time_msc"], expected["time_msc"])
+        assert points.price_digits == {"USDJPY": 3}
+
+        rates = await points.get_last_x_bars_from_now("EURUSD", 16385, 10, as_array=True)
+        assert rates["close"].dtype == np.int64 and rates["tick_volume"].dtype == RATE_DTYPE["tick_volume"]
+        bars = await points.get_specific_bar(["EURUSD", "USDJPY"], 1, 16385, as_array=True)
+        assert bars["open"].tolist() == to_points((await floats.get_specific_bar(["EURUSD", "USDJPY"], 1, 16385, as_array=True))["open"], np.array([5, 3])).tolist()
+        await floats.close()
+        await points.close()
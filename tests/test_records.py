@@ -0,0 +1,38 @@
+import pytest
+from metatrader5ext.ea import LazyRecord, ReferenceEAServer, materialize
+from metatrader5ext.ea.records import RecordLayout
+from metatrader5ext.ea.utils import BadMessage
+from test_client import make_client
+
+
+def test_lazy_record_decodes_on_access():
+    calls = []
+
+    def to_float(value):
+        calls.append(value)
+        return float(value)
+
+    record = LazyRecord(RecordLayout((("ticket", int), ("instrument", None), ("volume", to_float))), "1$EURUSD$0.10")
+    assert record["volume"] == 0.1
+    assert record["volume"] == 0.1
+    assert calls == ["0.10"]
+    assert list(record) == ["ticket", "instrument", "volume"] and len(record) == 3
+    assert record == {"ticket": 1, "instrument": "EURUSD", "volume": 0.1}
+    assert record.get("missing") is None
+    with pytest.raises(BadMessage):
+        LazyRecord(RecordLayout((("ticket", int), ("volume", float))), "1")["volume"]
+
+
+@pytest.mark.asyncio
+async def test_lazy_records_match_eager_records():
+    async with ReferenceEAServer() as server:
+        eager = make_client(server)
+        lazy = make_client(server, lazy_records=True)
+        positions = await lazy.get_all_closed_positions()
+        assert all(isinstance(position, LazyRecord) for position in positions)
+        assert [position["ticket"] for position in positions] == [position["ticket"] for position in await eager.get_all_closed_positions()]
+        assert materialize(positions) == await eager.get_all_closed_positions()
+
+        bar = await lazy.get_actual_bar_info("EURUSD", 16385)
+        assert type(materialize(bar)) is dict
+        assert materialize(bar) == await eager.get_actual_bar_info("EURUSD", 16385)
@@ -0,0 +1,138 @@
+import socket
+import threading
+import time
+import pytest
+from metatrader5ext.ea import SYMBOLS, Connection, Framing, OverflowPolicy, StreamQueue, tick_columns
+from metatrader5ext.ea.stream_queue import QueueClosed
+
+
+def test_drop_oldest_keeps_newest_messages():
+    queue = StreamQueue(3, OverflowPolicy.DROP_OLDEST)
+    for i in range(5):
+        assert queue.put(i)
+    assert queue.dropped == 2
+    assert [queue.get() for _ in range(3)] == [2, 3, 4]
+
+
+def test_drop_newest_keeps_oldest_messages():
+    queue = StreamQueue(3, OverflowPolicy.DROP_NEWEST)
+    assert [queue.put(i) for i in range(5)] == [True, True, True, False, False]
+    assert queue.dropped == 2
+    assert [queue.get() for _ in range(3)] == [0, 1, 2]
+
+
+def test_conflate_replaces_pending_message_with_same_key():
+    queue = StreamQueue(8, OverflowPolicy.CONFLATE)
+    queue.put("F020^6^EURUSD^1^1.10")
+    queue.put("F020^6^GBPUSD^1^1.20")
+    queue.put("F020^6^EURUSD^2^1.11")
+    assert queue.conflated == 1
+    assert len(queue) == 2
+    assert queue.get() == "F020^6^EURUSD^2^1.11"
+    assert queue.get() == "F020^6^GBPUSD^1^1.20"
+
+
+def test_block_waits_for_consumer():
+    queue = StreamQueue(1, OverflowPolicy.BLOCK)
+    queue.put("a")
+    assert not queue.put("b", timeout=0.01)
+    consumer = threading.Timer(0.05, queue.get)
+    consumer.start()
+    started = time.monotonic()
+    assert queue.put("c")
+    assert time.monotonic() - started >= 0.04
+    assert queue.get() == "c"
+
+
+def test_close_wakes_consumer():
+    queue = StreamQueue(1)
+    threading.Timer(0.02, queue.close).start()
+    with pytest.raises(QueueClosed):
+        queue.get(timeout=1)
+
+
+def test_connection_dispatches_stream_through_queue():
+    server = socket.create_server(("127.0.0.1", 0))
+    port = server.getsockname()[1]
+    messages = [f"F020^6^EURUSD^{i}^1.1" for i in range(50)]
+
+    def serve():
+        conn, _ = server.accept()
+        conn.sendall(b"".join(m.encode() + b"\r\n" for m in messages))
+        conn.close()
+
+    threading.Thread(target=serve, daemon=True).start()
+    received = []
+    done = threading.Event()
+
+    def callback(message):
+        received.append(message)
+        if len(received) == len(messages):
+            done.set()
+
+    connection = Connection(stream_port=port, framing=Framing.TERMINATOR, stream_queue_size=8)
+    try:
+        connection.start_stream(callback)
+        assert done.wait(2)
+        assert received == messages
+        assert connection.stream_queue.dropped == 0
+    finally:
+        connection.stop_stream()
+        server.close()
+
+
+def test_get_many_takes_batches_up_to_max_items():
+    queue = StreamQueue(16)
+    for i in range(5):
+        queue.put(i)
+    assert queue.get_many(3) == [0, 1, 2]
+    assert queue.get_many(3) == [3, 4]
+    with pytest.raises(TimeoutError):
+        queue.get_many(3, timeout=0.01)
+
+
+def test_get_many_lingers_for_batch_to_fill():
+    queue = StreamQueue(16)
+    queue.put(0)
+    threading.Timer(0.02, queue.put, args=(1,)).start()
+    assert queue.get_many(2, linger=1.0) == [0, 1]
+
+
+def test_tick_columns():
+    columns = tick_columns(["F020^6^EURUSD^1^1.1^1.2^0.0^3", "F020^1^ERROR", "F020^6^2^1.3^1.4^0.0^4"], "GBPUSD")
+    assert columns == {
+        "symbol": ["EURUSD", "GBPUSD"], "sym_id": [SYMBOLS.id("EURUSD"), SYMBOLS.id("GBPUSD")], "time": [1000, 2000], "bid": [1.1, 1.3],
+        "ask": [1.2, 1.4], "last": [0.0, 0.0], "volume": [3, 4],
+    }
+
+
+@pytest.mark.parametrize("queue_size", [0, 64])
+def test_connection_delivers_stream_in_batches(queue_size):
+    server = socket.create_server(("127.0.0.1", 0))
+    port = server.getsockname()[1]
+    messages = [f"F020^6^EURUSD^{i}^1.1^1.2^0.0^0" for i in range(50)]
+
+    def serve():
+        conn, _ = server.accept()
+        conn.sendall(b"".join(m.encode() + b"\r\n" for m in messages))
+        conn.close()
+
+    threading.Thread(target=serve, daemon=True).start()
+    batches = []
+    done = threading.Event()
+
+    def callback(batch):
+        batches.append(batch)
+        if sum(len(b["time"]) for b in batches) == len(messages):
+            done.set()
+
+    connection = Connection(stream_port=port, framing=Framing.TERMINATOR, stream_queue_size=queue_size,
+                            stream_batch_size=16, stream_batch_interval=0.01, stream_batch_columns=True)
+    try:
+        connection.start_stream(callback)
+        assert done.wait(2)
+        assert all(len(b["time"]) <= 16 for b in batches)
+        assert [t for b in batches for t in b["time"]] == list(range(0, 50_000, 1000))
+    finally:
+        connection.stop_stream()
+        server.close()
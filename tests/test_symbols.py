@@ -0,0 +1,26 @@
+import numpy as np
+from metatrader5ext.ea import SYMBOLS, ConflatingSubscriber, SymbolRegistry, Symbol, parse_symbol_rates
+
+
+def test_registry_assigns_dense_ids():
+    registry = SymbolRegistry()
+    assert registry.intern("EURUSD") == 0 and registry.intern("GBPUSD") == 1 and registry.intern("EURUSD") == 0
+    assert registry.id("USDJPY") is None and len(registry) == 2
+    ids = registry.intern_many(np.array(["GBPUSD", "USDJPY", "GBPUSD"]))
+    assert ids.tolist() == [1, 2, 1]
+    assert registry.names_of(ids).tolist() == ["GBPUSD", "USDJPY", "GBPUSD"]
+    assert registry.name(2) == "USDJPY"
+
+
+def test_library_structures_carry_symbol_ids():
+    assert Symbol(symbol="AUDUSD").sym_id == SYMBOLS.id("AUDUSD")
+    rates = parse_symbol_rates(["EURUSD$1$1.1$1.2$1.0$1.1$5", "NZDUSD$1$0.6$0.7$0.5$0.6$5"])
+    assert rates["sym_id"].tolist() == [SYMBOLS.id("EURUSD"), SYMBOLS.id("NZDUSD")]
+
+    subscriber = ConflatingSubscriber(max_symbols=2)
+    subscriber.update("F020^6^EURUSD^1^1.1^1.2^0.0^0")
+    subscriber.update("F020^6^CADJPY^1^110.0^110.1^0.0^0")
+    assert not subscriber.update("F020^6^CHFJPY^1^160.0^160.1^0.0^0")
+    assert subscriber.wait_ids(0) == {SYMBOLS.id("EURUSD"), SYMBOLS.id("CADJPY")}
+    assert subscriber.latest_id(SYMBOLS.id("CADJPY")).bid == 110.0
+    assert subscriber.latest("CHFJPY") is None and SYMBOLS.id("CHFJPY") is None
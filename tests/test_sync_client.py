@@ -0,0 +1,28 @@
+import asyncio
+import inspect
+import pytest
+from metatrader5ext.ea import EAClient, EAClientConfig, Framing, ReferenceEAServer, SyncEAClient
+
+
+def test_sync_client_mirrors_every_coroutine_method():
+    for name, method in inspect.getmembers(EAClient, inspect.iscoroutinefunction):
+        if not name.startswith("_"):
+            assert not inspect.iscoroutinefunction(getattr(SyncEAClient, name)), name
+    assert inspect.signature(SyncEAClient.get_last_tick_info) == inspect.signature(EAClient.get_last_tick_info)
+
+
+@pytest.mark.asyncio
+async def test_sync_client_reuses_pooled_socket():
+    async with ReferenceEAServer(framing=Framing.TERMINATOR) as server:
+        config = EAClientConfig(rest_port=server.rest_port, stream_port=server.stream_port, framing=server.framing)
+
+        def run():
+            with SyncEAClient(config, timeout=5) as client:
+                assert client.check_connection()
+                ticks = [client.get_last_tick_info(symbol) for symbol in server.symbols]
+                return client, ticks
+
+        client, ticks = await asyncio.to_thread(run)
+        assert [tick["instrument"] for tick in ticks] == server.symbols
+        assert server.connections == 1
+        assert client.closed
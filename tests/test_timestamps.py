@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+from metatrader5ext.ea import ReferenceEAServer, broker_offset_ms, to_datetime64, to_polars_datetime
+from metatrader5ext.ea.commands import COMMANDS
+from metatrader5ext.ea.reference_server import BASE_TIME
+from test_client import make_client
+
+
+def test_tick_records_convert_seconds_from_the_ea():
+    ticks = COMMANDS["get_last_x_ticks_from_now"].decode(["1700000000$1.10002$1.10000$0.00000$3"], ("EURUSD", 1))
+    assert ticks[0]["date"] == 1_700_000_000_000
+
+
+def test_vectorised_conversion_applies_broker_offset():
+    offset = broker_offset_ms(1_700_007_205_000, utc_now_ms=1_700_000_000_000)
+    assert offset == 2 * 3600 * 1000
+    times = to_datetime64([1_700_007_200_000, 1_700_007_200_500], offset)
+    assert times.dtype == np.dtype('datetime64[ms]')
+    assert times[0] == np.datetime64('2023-11-14T22:13:20.000')
+    assert np.array_equal(to_datetime64([1_700_000_000], unit='s'), to_datetime64([1_700_000_000_000]))
+    series = to_polars_datetime([1_700_007_200_500], offset)
+    assert str(series.dtype) == "Datetime(time_unit='ms', time_zone='UTC')"
+
+
+@pytest.mark.asyncio
+async def test_record_times_are_epoch_milliseconds():
+    async with ReferenceEAServer() as server:
+        client = make_client(server)
+        tick = await client.get_last_tick_info("EURUSD")
+        assert tick["date"] == BASE_TIME * 1000
+        ticks = await client.get_last_x_ticks_from_now("EURUSD", 8)
+        assert ticks[-1]["date"] == BASE_TIME * 1000 and ticks[0]["date"] == (BASE_TIME - 2) * 1000
+        bars = await client.get_last_x_bars_from_now("EURUSD", 16385, 3)
+        assert all(bar["date"] % 3_600_000 == 0 for bar in bars)
+        server_time = await client.get_broker_server_time()
+        assert server_time["timestamp"] == BASE_TIME * 1000 and server_time["hour"] == 22
+        await client.sync_broker_offset()
+        assert client.broker_offset % (15 * 60 * 1000) == 0